@@ -1,6 +1,5 @@
 import sqlite3
 import os
-import shutil
 from datetime import datetime
 
 DB_PATH = "database.db"
@@ -61,7 +60,13 @@ def main():
     backup_path = os.path.join(BACKUP_DIR, backup_filename)
 
     try:
-        shutil.copy2(DB_PATH, backup_path)
+        src_conn = sqlite3.connect(DB_PATH)
+        dst_conn = sqlite3.connect(backup_path)
+        try:
+            src_conn.backup(dst_conn)
+        finally:
+            dst_conn.close()
+            src_conn.close()
         print(f"Резервная копия сохранена: {backup_path}")
     except Exception as e:
         print(f"ОШИБКА при создании резервной копии: {e}")
@@ -71,7 +76,7 @@ def main():
     print("\n" + "-" * 50)
     print("Начинаю очистку базы данных...")
 
-    tables_to_clear = ["contractors", "invoices", "acts"]
+    tables_to_clear = ["contractors", "invoices", "acts", "import_rows", "imports"]
     if not keep_employees:
         tables_to_clear.append("employees")
     if not keep_stop_words:
@@ -87,7 +92,15 @@ def main():
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
 
+        existing_tables = {
+            row[0]
+            for row in cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type='table'"
+            )
+        }
         for table in tables_to_clear:
+            if table not in existing_tables:
+                continue
             cursor.execute(f"DELETE FROM {table}")
             print(f"  - Таблица '{table}' очищена")
 
@@ -0,0 +1,4 @@
+@echo off
+chcp 65001 >NUL
+cd /d "%~dp0"
+uv run python import_files.py %*
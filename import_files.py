@@ -0,0 +1,166 @@
+import argparse
+import os
+import sys
+import time
+
+EXIT_OK = 0
+EXIT_FILE_ERRORS = 1
+EXIT_FAILED = 2
+
+IMPORT_EXTENSIONS = (".xlsx", ".zip")
+
+
+def list_import_files(directory, recursive=False):
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.startswith("~$") or not name.lower().endswith(IMPORT_EXTENSIONS):
+                continue
+            paths.append(os.path.join(root, name))
+        if not recursive:
+            break
+    return paths
+
+
+def read_import_files(paths):
+    from src.main import expand_import_upload
+
+    entries = []
+    for path in paths:
+        with open(path, "rb") as f:
+            entries.extend(expand_import_upload(os.path.basename(path), f))
+    return entries
+
+
+def print_file_summary(summary):
+    name = summary["filename"]
+    if not summary["success"]:
+        print(f"  [ОШИБКА] {name}: {summary['error']}")
+    elif summary.get("already_imported"):
+        print(f"  [ПРОПУЩЕН] {name}: файл уже был загружен")
+    else:
+        print(
+            f"  [OK] {name} ({summary['source']}): строк {summary['rows']}, "
+            f"добавлено {summary['added']}, дубликатов {summary['skipped_duplicate']}"
+        )
+
+
+def run(directory, source="auto", reimport=False, batch_size=10, recursive=False):
+    from src.main import get_session, run_import_batch
+
+    if not os.path.isdir(directory):
+        print(f"ОШИБКА: папка {directory} не найдена")
+        return EXIT_FAILED
+
+    paths = list_import_files(directory, recursive)
+    if not paths:
+        print(f"В папке {directory} нет файлов .xlsx или .zip")
+        return EXIT_OK
+
+    print(f"Найдено файлов: {len(paths)}")
+    started = time.perf_counter()
+    rows_total = 0
+    totals = {}
+    failed = 0
+
+    for start in range(0, len(paths), batch_size):
+        chunk = paths[start : start + batch_size]
+        try:
+            entries = read_import_files(chunk)
+        except Exception as e:
+            print(f"ОШИБКА при чтении файлов: {e}")
+            failed += len(chunk)
+            continue
+        if not entries:
+            continue
+
+        session = get_session()
+        try:
+            result = run_import_batch(session, entries, source, reimport)
+        finally:
+            session.close()
+
+        if "error" in result:
+            print(f"ОШИБКА пакета ({len(entries)} файлов): {result['error']}")
+            failed += len(entries)
+            continue
+
+        for summary in result["files"]:
+            print_file_summary(summary)
+            if not summary["success"]:
+                failed += 1
+            elif not summary.get("already_imported"):
+                rows_total += summary["rows"]
+        for key, value in result["totals"].items():
+            totals[key] = totals.get(key, 0) + value
+
+    elapsed = time.perf_counter() - started
+    rate = rows_total / elapsed if elapsed > 0 else 0
+    print("\n" + "-" * 50)
+    print(f"Обработано строк: {rows_total} за {elapsed:.1f} с ({rate:.0f} строк/с)")
+    for key, value in totals.items():
+        print(f"  {key}: {value}")
+    if failed:
+        print(f"Файлов с ошибками: {failed}")
+        return EXIT_FILE_ERRORS
+    return EXIT_OK
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Импорт файлов 1С/СБИС из папки без запуска веб-сервера"
+    )
+    parser.add_argument("directory", help="папка с файлами .xlsx или .zip")
+    parser.add_argument(
+        "--source",
+        default="auto",
+        choices=["auto", "1c", "sbis", "sbis-force-inn"],
+        help="тип импорта (по умолчанию определяется по заголовкам)",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="число процессов для разбора файлов",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=10,
+        help="число файлов в одной транзакции",
+    )
+    parser.add_argument(
+        "--recursive", action="store_true", help="обходить вложенные папки"
+    )
+    parser.add_argument(
+        "--reimport",
+        action="store_true",
+        help="обрабатывать файлы, уже загруженные ранее",
+    )
+    args = parser.parse_args(argv)
+
+    if args.processes:
+        os.environ["IMPORT_PARSE_PROCESSES"] = str(args.processes)
+
+    from src.database import init_db
+    from src.main import shutdown_import_executor
+
+    try:
+        init_db()
+        return run(
+            args.directory,
+            args.source,
+            args.reimport,
+            max(args.batch_size, 1),
+            args.recursive,
+        )
+    except Exception as e:
+        print(f"ОШИБКА импорта: {e}")
+        return EXIT_FAILED
+    finally:
+        shutdown_import_executor()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
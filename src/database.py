@@ -7,11 +7,16 @@ from sqlalchemy import (
     Date,
     DateTime,
     ForeignKey,
+    Index,
     Text,
+    event,
     inspect,
+    text,
 )
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+from sqlalchemy.pool import QueuePool
 import os
+import threading
 
 Base = declarative_base()
 
@@ -21,7 +26,7 @@ class Contractor(Base):
     id = Column(Integer, primary_key=True)
     created_at = Column(DateTime, default=datetime.now)
     name = Column(Text, unique=True)
-    inn = Column(Text)
+    inn = Column(Text, index=True)
 
     invoices = relationship("Invoice", back_populates="contractor")
     acts = relationship("Act", back_populates="contractor")
@@ -37,6 +42,10 @@ class Employee(Base):
     department = Column(Text, nullable=True)
     position = Column(Text, nullable=True)
 
+    __table_args__ = (
+        Index("ix_employees_last_name_first_name", "last_name", "first_name"),
+    )
+
 
 class StopWord(Base):
     __tablename__ = "stop_words"
@@ -59,20 +68,24 @@ class Invoice(Base):
     number = Column(Text)
     date = Column(Date)
     amount = Column(Float)
-    contractor_id = Column(Integer, ForeignKey("contractors.id"))
+    contractor_id = Column(Integer, ForeignKey("contractors.id"), index=True)
     organization_group = Column(Text)
     responsible_import = Column(Text)
     comment = Column(Text)
     justification = Column(Text, nullable=True)
     deadline = Column(Date, nullable=True)
     deadline_days = Column(Integer, nullable=True)
-    payment_date = Column(Date, nullable=True)
+    payment_date = Column(Date, nullable=True, index=True)
     motivated_person = Column(Text, nullable=True)
     status = Column(Text, default="Не оплачен")
 
     contractor = relationship("Contractor", back_populates="invoices")
     acts = relationship("Act", back_populates="invoice")
 
+    __table_args__ = (
+        Index("ix_invoices_number_date_amount", "number", "date", "amount"),
+    )
+
 
 class Act(Base):
     __tablename__ = "acts"
@@ -80,53 +93,280 @@ class Act(Base):
     created_at = Column(DateTime, default=datetime.now)
     number = Column(Text)
     filename = Column(Text)
-    signing_date = Column(DateTime)
+    signing_date = Column(DateTime, index=True)
     amount = Column(Float)
-    contractor_id = Column(Integer, ForeignKey("contractors.id"))
-    invoice_id = Column(Integer, ForeignKey("invoices.id"), nullable=True)
+    contractor_id = Column(Integer, ForeignKey("contractors.id"), index=True)
+    invoice_id = Column(Integer, ForeignKey("invoices.id"), nullable=True, index=True)
     responsible_manager = Column(Text, nullable=True)
 
     contractor = relationship("Contractor", back_populates="acts")
     invoice = relationship("Invoice", back_populates="acts")
 
+    __table_args__ = (
+        Index("ix_acts_number_signing_date_amount", "number", "signing_date", "amount"),
+    )
+
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, default=datetime.now)
+    source = Column(Text)
+    filename = Column(Text)
+    status = Column(Text, default="queued")
+    rows_total = Column(Integer, nullable=True)
+    rows_processed = Column(Integer, default=0)
+    counters = Column(Text, nullable=True)
+    import_id = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class ImportFile(Base):
+    __tablename__ = "imports"
+    __table_args__ = (
+        Index("ix_imports_source_content_hash", "source", "content_hash"),
+    )
+    id = Column(Integer, primary_key=True)
+    content_hash = Column(Text, nullable=False)
+    source = Column(Text, nullable=False)
+    filename = Column(Text, nullable=True)
+    rows_total = Column(Integer, default=0)
+    rows_added = Column(Integer, default=0)
+    date_from = Column(DateTime, nullable=True)
+    date_to = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.now)
+    checkpoint_row = Column(Integer, nullable=True)
+    checkpoint_counters = Column(Text, nullable=True)
+
+
+class ImportRow(Base):
+    __tablename__ = "import_rows"
+    __table_args__ = (
+        Index("ix_import_rows_import_id_row_index", "import_id", "row_index"),
+    )
+    id = Column(Integer, primary_key=True)
+    import_id = Column(Integer, ForeignKey("imports.id"), nullable=False)
+    row_index = Column(Integer, nullable=False)
+    outcome = Column(Text, nullable=False)
+    reasons = Column(Text, default="")
+    details = Column(Text, nullable=True)
+
 
 def get_db_path():
     return os.path.join(os.path.dirname(os.path.dirname(__file__)), "database.db")
 
 
+POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+POOL_MAX_OVERFLOW = int(os.environ.get("DB_POOL_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT", "30"))
+MIGRATION_BATCH_SIZE = int(os.environ.get("DB_MIGRATION_BATCH_SIZE", "5000"))
+
+SQLITE_PRAGMAS = {
+    "busy_timeout": os.environ.get("SQLITE_BUSY_TIMEOUT", "5000"),
+    "journal_mode": os.environ.get("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)),
+    "cache_size": os.environ.get("SQLITE_CACHE_SIZE", "-65536"),
+    "temp_store": os.environ.get("SQLITE_TEMP_STORE", "MEMORY"),
+}
+
+_engine = None
+_session_factory = None
+_engine_lock = threading.Lock()
+
+
 def get_engine():
-    db_path = get_db_path()
-    return create_engine(f"sqlite:///{db_path}")
+    global _engine, _session_factory
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                db_path = get_db_path()
+                _engine = create_engine(
+                    f"sqlite:///{db_path}",
+                    connect_args={"check_same_thread": False},
+                    poolclass=QueuePool,
+                    pool_size=POOL_SIZE,
+                    max_overflow=POOL_MAX_OVERFLOW,
+                    pool_timeout=POOL_TIMEOUT,
+                )
+                event.listen(_engine, "connect", _on_connect)
+                _session_factory = sessionmaker(bind=_engine)
+    return _engine
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas=None):
+    if pragmas is None:
+        pragmas = SQLITE_PRAGMAS
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            if value is None or str(value).strip() == "":
+                continue
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def _on_connect(dbapi_connection, connection_record):
+    apply_sqlite_pragmas(dbapi_connection)
+
+
+def dispose_engine():
+    global _engine, _session_factory
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+        _engine = None
+        _session_factory = None
 
 
 def get_session():
-    engine = get_engine()
-    Session = sessionmaker(bind=engine)
-    return Session()
+    get_engine()
+    return _session_factory()
+
+
+def get_db():
+    session = get_session()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def _m001_invoice_justification(engine):
+    columns = [col["name"] for col in inspect(engine).get_columns("invoices")]
+    if "justification" not in columns:
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE invoices ADD COLUMN justification TEXT"))
+
+
+def _m002_secondary_indexes(engine):
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            with engine.begin() as conn:
+                index.create(conn, checkfirst=True)
+    with engine.begin() as conn:
+        conn.execute(text("PRAGMA optimize"))
+
+
+def _m003_import_jobs(engine):
+    ImportJob.__table__.create(engine, checkfirst=True)
+
+
+def _m004_imports_ledger(engine):
+    ImportFile.__table__.create(engine, checkfirst=True)
+
+
+def _m005_import_rows(engine):
+    ImportRow.__table__.create(engine, checkfirst=True)
+    columns = [col["name"] for col in inspect(engine).get_columns("import_jobs")]
+    if "import_id" not in columns:
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE import_jobs ADD COLUMN import_id INTEGER"))
+
+
+def _m006_import_checkpoints(engine):
+    columns = [col["name"] for col in inspect(engine).get_columns("imports")]
+    with engine.begin() as conn:
+        if "checkpoint_row" not in columns:
+            conn.execute(text("ALTER TABLE imports ADD COLUMN checkpoint_row INTEGER"))
+        if "checkpoint_counters" not in columns:
+            conn.execute(
+                text("ALTER TABLE imports ADD COLUMN checkpoint_counters TEXT")
+            )
+
+
+def backfill_in_batches(
+    engine,
+    table: str,
+    set_clause: str,
+    where_clause: str,
+    params: dict = None,
+    batch_size: int = None,
+) -> int:
+    batch_size = batch_size or MIGRATION_BATCH_SIZE
+    statement = text(
+        f"UPDATE {table} SET {set_clause} WHERE rowid IN "
+        f"(SELECT rowid FROM {table} WHERE {where_clause} LIMIT :batch_size)"
+    )
+    total = 0
+    while True:
+        with engine.begin() as conn:
+            updated = conn.execute(
+                statement, {**(params or {}), "batch_size": batch_size}
+            ).rowcount
+        if not updated:
+            return total
+        total += updated
+
+
+def _m007_compact_import_rows(engine):
+    columns = [col["name"] for col in inspect(engine).get_columns("import_rows")]
+    for field in ("doc_type", "doc_status"):
+        if field in columns:
+            backfill_in_batches(
+                engine,
+                "import_rows",
+                f"details = json_set(coalesce(details, '{{}}'), '$.{field}', {field})",
+                f"reasons LIKE :reason "
+                f"AND json_type(coalesce(details, '{{}}'), '$.{field}') IS NULL",
+                params={"reason": f"%,{field},%"},
+            )
+    with engine.begin() as conn:
+        for column in columns:
+            if column not in ImportRow.__table__.columns:
+                conn.execute(text(f"ALTER TABLE import_rows DROP COLUMN {column}"))
+
+
+MIGRATIONS = [
+    (1, _m001_invoice_justification),
+    (2, _m002_secondary_indexes),
+    (3, _m003_import_jobs),
+    (4, _m004_imports_ledger),
+    (5, _m005_import_rows),
+    (6, _m006_import_checkpoints),
+    (7, _m007_compact_import_rows),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(engine) -> int:
+    with engine.connect() as conn:
+        return conn.execute(text("PRAGMA user_version")).scalar()
+
+
+def _set_schema_version(engine, version: int):
+    with engine.begin() as conn:
+        conn.execute(text(f"PRAGMA user_version = {int(version)}"))
 
 
 def init_db():
     engine = get_engine()
+    if get_schema_version(engine) >= SCHEMA_VERSION:
+        return
+    is_new = not inspect(engine).has_table("invoices")
     Base.metadata.create_all(engine)
-    _migrate(engine)
+    if is_new:
+        _set_schema_version(engine, SCHEMA_VERSION)
+    else:
+        _migrate(engine)
 
 
 def _migrate(engine):
-    from sqlalchemy import text
-
-    insp = inspect(engine)
-    if insp.has_table("invoices"):
-        columns = [col["name"] for col in insp.get_columns("invoices")]
-        if "justification" not in columns:
-            with engine.begin() as conn:
-                conn.execute(text("ALTER TABLE invoices ADD COLUMN justification TEXT"))
+    current = get_schema_version(engine)
+    for version, migration in MIGRATIONS:
+        if version > current:
+            migration(engine)
+            _set_schema_version(engine, version)
 
 
 def clear_db(keep_employees: bool = False, keep_stop_words: bool = False):
     engine = get_engine()
     Base.metadata.bind = engine
 
-    tables_to_clear = [Invoice, Act, Contractor]
+    tables_to_clear = [Invoice, Act, Contractor, ImportRow, ImportFile]
 
     if not keep_stop_words:
         tables_to_clear.append(StopWord)
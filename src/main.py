@@ -1,17 +1,48 @@
+import base64
 import os
 import re
+import hashlib
+import json
+import logging
+import multiprocessing
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, date, timedelta
-from typing import Optional, Dict, Any
+from io import BytesIO
+from typing import Optional, Dict, Any, List
 from functools import lru_cache
+from itertools import islice
 
-from fastapi import FastAPI, Request, Form, UploadFile, File, Body
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import FastAPI, Request, Form, UploadFile, File, Body, Depends
+from fastapi.responses import HTMLResponse, RedirectResponse, Response
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from sqlalchemy.orm import joinedload
+from sqlalchemy import (
+    Boolean,
+    Date,
+    DateTime,
+    and_,
+    bindparam,
+    case,
+    func,
+    insert,
+    or_,
+    select,
+    type_coerce,
+    update,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, joinedload
 from openpyxl import load_workbook
+import orjson
 
 from .database import (
+    get_db,
     get_session,
     init_db,
     Contractor,
@@ -20,10 +51,15 @@ from .database import (
     Invoice,
     Act,
     Settings,
+    ImportJob,
+    ImportFile,
+    ImportRow,
 )
 
 from workalendar.europe import Russia
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI()
 
 
@@ -98,35 +134,70 @@ if not os.path.exists(HTML_DIR):
 @app.on_event("startup")
 def startup():
     init_db()
+    fail_interrupted_imports()
+    start_import_watcher()
+
+
+@app.on_event("shutdown")
+def shutdown():
+    stop_import_watcher()
+    shutdown_import_executor()
+
+
+CONTRACTOR_NAME_CACHE_SIZE = int(os.environ.get("CONTRACTOR_NAME_CACHE_SIZE", "65536"))
+
+CONTRACTOR_LEGAL_FORMS = [
+    "ооо",
+    "ип",
+    "ао",
+    "зао",
+    "оао",
+    "пао",
+    "нко",
+    "ано",
+    "фгуп",
+    "муп",
+]
+
+_NAME_PUNCTUATION_RE = re.compile(r'["""\'\",;]')
+_NAME_SPACES_RE = re.compile(r"\s+")
+_NAME_PARENTHESES_RE = re.compile(r"\s*\([^)]*\)\s*")
+_NAME_LEGAL_FORM_RE = re.compile(
+    r"(" + "|".join(re.escape(form) for form in CONTRACTOR_LEGAL_FORMS) + r")(?:\s|$)"
+)
 
 
+@lru_cache(maxsize=CONTRACTOR_NAME_CACHE_SIZE)
 def normalize_contractor_name(name: str) -> str:
     if not name:
         return name
     name = name.strip()
 
-    name = re.sub(r'["""\'\",;]', " ", name)
-    name = re.sub(r"\s+", " ", name)
+    name = _NAME_PUNCTUATION_RE.sub(" ", name)
+    name = _NAME_SPACES_RE.sub(" ", name)
 
-    name = re.sub(r"\s*\([^)]*\)\s*", " ", name)
+    name = _NAME_PARENTHESES_RE.sub(" ", name)
 
     name = name.lower()
 
-    legal_forms = ["ооо", "ип", "ао", "зао", "оао", "пао", "нко", "ано", "фгуп", "муп"]
-
-    legal_forms_pattern = (
-        r"(" + "|".join(re.escape(form) for form in legal_forms) + r")(?:\s|$)"
-    )
-    match = re.search(legal_forms_pattern, name)
+    match = _NAME_LEGAL_FORM_RE.search(name)
     if match:
         legal_form = match.group(1)
         name = name.replace(legal_form, "").strip() + " " + legal_form
     else:
-        name = re.sub(r"\s+", " ", name).strip()
+        name = _NAME_SPACES_RE.sub(" ", name).strip()
 
     return name.strip()
 
 
+def normalize_contractor_names(names) -> list:
+    names = list(names)
+    normalized = {
+        name: normalize_contractor_name(name) for name in dict.fromkeys(names)
+    }
+    return [normalized[name] for name in names]
+
+
 def format_contractor_name(name: str) -> str:
     if not name:
         return name
@@ -154,6 +225,131 @@ def format_contractor_name(name: str) -> str:
     return " ".join(non_legal_parts + result_parts)
 
 
+def parse_xlsx_bytes(data: bytes) -> list:
+    return list(iter_xlsx_rows(BytesIO(data)))
+
+
+def open_import_rows(fileobj):
+    if isinstance(fileobj, list):
+        return iter(fileobj), len(fileobj)
+    wb = load_workbook(fileobj, read_only=True, data_only=True)
+    return iter_workbook_rows(wb), wb.active.max_row
+
+
+def iter_row_chunks(rows, size: int):
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_dated_rows(rows, index, parse_column, on_chunk):
+    for chunk in iter_row_chunks(rows, IMPORT_KEYS_CHUNK_SIZE):
+        values = parse_column(
+            row[index] if index is not None else None for row in chunk
+        )
+        on_chunk(chunk, values)
+        yield from zip(chunk, values)
+
+
+def date_bounds(values) -> list:
+    known = [value for value in values if value]
+    return [min(known), max(known)] if known else []
+
+
+def iter_xlsx_rows(fileobj):
+    yield from iter_workbook_rows(
+        load_workbook(fileobj, read_only=True, data_only=True)
+    )
+
+
+def iter_workbook_rows(wb):
+    try:
+        width = 0
+        for row in wb.active.iter_rows(values_only=True):
+            if len(row) < width:
+                row = row + (None,) * (width - len(row))
+            else:
+                width = len(row)
+            yield row
+    finally:
+        wb.close()
+
+
+DATETIME_FORMATS = [
+    "%d.%m.%Y %H:%M",
+    "%d.%m.%Y %H:%M:%S",
+    "%d.%m.%y %H:%M",
+    "%d.%m.%y %H:%M:%S",
+    "%H:%M %d.%m.%Y",
+    "%H:%M:%S %d.%m.%Y",
+    "%H:%M %d.%m.%y",
+    "%H:%M:%S %d.%m.%y",
+    "%d.%m.%Y",
+    "%Y-%m-%d",
+    "%d/%m/%Y",
+    "%d-%m-%Y",
+    "%Y/%m/%d",
+]
+
+EXCEL_EPOCH = datetime(1899, 12, 30)
+
+_DATETIME_FIELDS = {
+    "%d": r"(?P<day>\d{1,2})",
+    "%m": r"(?P<month>\d{1,2})",
+    "%Y": r"(?P<year>\d{4})",
+    "%y": r"(?P<short_year>\d{2})",
+    "%H": r"(?P<hour>\d{1,2})",
+    "%M": r"(?P<minute>\d{1,2})",
+    "%S": r"(?P<second>\d{1,2})",
+}
+
+
+def _compile_datetime_format(fmt: str):
+    pattern = ""
+    for part in re.split(r"(%[a-zA-Z])", fmt):
+        if part in _DATETIME_FIELDS:
+            pattern += _DATETIME_FIELDS[part]
+        else:
+            pattern += "".join(r"\s+" if ch == " " else re.escape(ch) for ch in part)
+    return re.compile(pattern)
+
+
+_DATETIME_FORMAT_PATTERNS = [
+    (fmt, _compile_datetime_format(fmt)) for fmt in DATETIME_FORMATS
+]
+
+
+def _datetime_from_match(match) -> datetime:
+    fields = match.groupdict()
+    if fields.get("year"):
+        year = int(fields["year"])
+    else:
+        year = int(fields["short_year"])
+        year += 2000 if year < 69 else 1900
+    return datetime(
+        year,
+        int(fields["month"]),
+        int(fields["day"]),
+        int(fields.get("hour") or 0),
+        int(fields.get("minute") or 0),
+        int(fields.get("second") or 0),
+    )
+
+
+@lru_cache(maxsize=4096)
+def _excel_day_to_datetime(day: int) -> datetime:
+    return EXCEL_EPOCH + timedelta(days=day)
+
+
+def excel_serial_to_datetime(value) -> Optional[datetime]:
+    try:
+        return _excel_day_to_datetime(int(value))
+    except (ValueError, OverflowError):
+        return None
+
+
 def parse_datetime(value) -> Optional[datetime]:
     if value is None or value == "":
         return None
@@ -162,28 +358,10 @@ def parse_datetime(value) -> Optional[datetime]:
     if isinstance(value, date):
         return datetime.combine(value, datetime.min.time())
     if isinstance(value, (int, float)):
-        try:
-            return datetime(1899, 12, 30) + timedelta(days=int(value))
-        except (ValueError, OverflowError):
-            return None
+        return excel_serial_to_datetime(value)
     if isinstance(value, str):
         value = value.strip()
-        formats_with_time = [
-            "%d.%m.%Y %H:%M",
-            "%d.%m.%Y %H:%M:%S",
-            "%d.%m.%y %H:%M",
-            "%d.%m.%y %H:%M:%S",
-            "%H:%M %d.%m.%Y",
-            "%H:%M:%S %d.%m.%Y",
-            "%H:%M %d.%m.%y",
-            "%H:%M:%S %d.%m.%y",
-            "%d.%m.%Y",
-            "%Y-%m-%d",
-            "%d/%m/%Y",
-            "%d-%m-%Y",
-            "%Y/%m/%d",
-        ]
-        for fmt in formats_with_time:
+        for fmt in DATETIME_FORMATS:
             try:
                 return datetime.strptime(value, fmt)
             except ValueError:
@@ -191,11 +369,43 @@ def parse_datetime(value) -> Optional[datetime]:
     return None
 
 
+def parse_datetime_column(values) -> list:
+    result = []
+    pattern = None
+    for value in values:
+        if not isinstance(value, str) or value == "":
+            result.append(parse_datetime(value))
+            continue
+        value = value.strip()
+        if pattern is not None:
+            match = pattern.fullmatch(value)
+            if match:
+                try:
+                    result.append(_datetime_from_match(match))
+                    continue
+                except ValueError:
+                    pass
+        parsed = None
+        for fmt, fmt_pattern in _DATETIME_FORMAT_PATTERNS:
+            try:
+                parsed = datetime.strptime(value, fmt)
+            except ValueError:
+                continue
+            pattern = fmt_pattern
+            break
+        result.append(parsed)
+    return result
+
+
 def parse_date(value) -> Optional[date]:
     dt = parse_datetime(value)
     return dt.date() if dt else None
 
 
+def parse_date_column(values) -> list:
+    return [dt.date() if dt else None for dt in parse_datetime_column(values)]
+
+
 def parse_amount(value) -> Optional[float]:
     if value is None or value == "":
         return None
@@ -227,6 +437,173 @@ def get_or_create_contractor(
     return contractor
 
 
+IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", "500"))
+IMPORT_KEYS_CHUNK_SIZE = int(os.environ.get("IMPORT_KEYS_CHUNK_SIZE", "5000"))
+
+
+class ContractorResolver:
+    def __init__(self, session, force_update_inn: bool = False):
+        self.session = session
+        self.force_update_inn = force_update_inn
+        self._normalized = {}
+        self._contractors = {}
+        self._loaded = set()
+        self._dirty = set()
+
+    def normalize(self, raw_name: str) -> str:
+        normalized = self._normalized.get(raw_name)
+        if normalized is None:
+            normalized = normalize_contractor_name(raw_name)
+            self._normalized[raw_name] = normalized
+        return normalized
+
+    def _load(self, names) -> None:
+        names = [name for name in dict.fromkeys(names) if name not in self._loaded]
+        for start in range(0, len(names), IMPORT_BATCH_SIZE):
+            chunk = names[start : start + IMPORT_BATCH_SIZE]
+            rows = self.session.execute(
+                select(Contractor.id, Contractor.name, Contractor.inn).where(
+                    Contractor.name.in_(chunk)
+                )
+            )
+            for contractor_id, name, inn in rows:
+                self._contractors[name] = {"id": contractor_id, "inn": inn}
+            self._loaded.update(chunk)
+
+    def prefetch(self, raw_names) -> None:
+        raw_names = [name for name in raw_names if name not in self._normalized]
+        self._normalized.update(zip(raw_names, normalize_contractor_names(raw_names)))
+        self._load(self._normalized.values())
+
+    def update_inn(self, raw_name: str, inn: str) -> bool:
+        name = self.normalize(raw_name)
+        self._load([name])
+        contractor = self._contractors.get(name)
+        if not contractor or not inn or not inn.strip():
+            return False
+        if contractor["inn"] == inn.strip():
+            return False
+        contractor["inn"] = inn.strip()
+        self._dirty.add(name)
+        return True
+
+    def _apply_inn(self, name: str, inn: str) -> None:
+        if not inn or not inn.strip():
+            return
+        contractor = self._contractors[name]
+        current = contractor["inn"]
+        if self.force_update_inn or not current or not current.strip():
+            if current != inn.strip():
+                contractor["inn"] = inn.strip()
+                self._dirty.add(name)
+
+    def resolve(self, entries) -> dict:
+        entries = [(self.normalize(raw_name), inn) for raw_name, inn in entries]
+        self._load(name for name, _ in entries)
+
+        created = {}
+        for name, inn in entries:
+            if name not in self._contractors and name not in created:
+                created[name] = inn
+        if created:
+            self.session.execute(
+                sqlite_insert(Contractor.__table__).on_conflict_do_nothing(
+                    index_elements=["name"]
+                ),
+                [{"name": name, "inn": inn} for name, inn in created.items()],
+            )
+            self._loaded.difference_update(created)
+            self._load(created)
+
+        first_seen = set(created)
+        for name, inn in entries:
+            if name in first_seen:
+                first_seen.discard(name)
+                continue
+            self._apply_inn(name, inn)
+
+        self.flush()
+        return {
+            raw_name: self._contractors[name]["id"]
+            for raw_name, name in self._normalized.items()
+            if name in self._contractors
+        }
+
+    def flush(self) -> None:
+        if not self._dirty:
+            return
+        self.session.execute(
+            update(Contractor.__table__)
+            .where(Contractor.__table__.c.id == bindparam("contractor_id"))
+            .values(inn=bindparam("new_inn")),
+            [
+                {
+                    "contractor_id": self._contractors[name]["id"],
+                    "new_inn": self._contractors[name]["inn"],
+                }
+                for name in self._dirty
+            ],
+        )
+        self._dirty.clear()
+
+
+def bulk_insert_rows(session, model, rows: list):
+    for start in range(0, len(rows), IMPORT_BATCH_SIZE):
+        session.execute(
+            insert(model.__table__), rows[start : start + IMPORT_BATCH_SIZE]
+        )
+
+
+def write_import_rows(session, model, pending: list, resolver=None) -> None:
+    if resolver is None:
+        resolver = ContractorResolver(session)
+    contractor_ids = resolver.resolve(
+        [(row["contractor_name"], row.pop("contractor_inn")) for row in pending]
+    )
+    for row in pending:
+        row["contractor_id"] = contractor_ids[row.pop("contractor_name")]
+    bulk_insert_rows(session, model, pending)
+
+
+class ImportBatch:
+    def __init__(self):
+        self.keys = {Invoice: set(), Act: set()}
+        self.writes = []
+
+    def add(self, model, pending: list, keys: set, resolver=None) -> None:
+        self.keys[model] = keys
+        self.writes.append((model, pending, resolver))
+
+    def write(self, session) -> None:
+        for model, pending, resolver in self.writes:
+            write_import_rows(session, model, pending, resolver=resolver)
+
+
+def load_invoice_keys(session, dates) -> set:
+    known = [d for d in dates if d]
+    conditions = []
+    if known:
+        conditions.append(Invoice.date.between(min(known), max(known)))
+    if len(known) < len(dates):
+        conditions.append(Invoice.date.is_(None))
+    if not conditions:
+        return set()
+    rows = session.query(Invoice.number, Invoice.date, Invoice.amount).filter(
+        or_(*conditions)
+    )
+    return {tuple(row) for row in rows}
+
+
+def load_act_keys(session, signing_dates) -> set:
+    signing_dates = [d for d in signing_dates if d]
+    if not signing_dates:
+        return set()
+    rows = session.query(Act.number, Act.signing_date, Act.amount).filter(
+        Act.signing_date.between(min(signing_dates), max(signing_dates))
+    )
+    return {tuple(row) for row in rows}
+
+
 def get_or_create_employee(session, full_name: str) -> Employee:
     if not full_name:
         return None
@@ -260,14 +637,43 @@ def get_rpo_surnames() -> set:
         session.close()
 
 
+class KeywordMatcher:
+    def __init__(self, words):
+        self.words = list(dict.fromkeys(w for w in words if w))
+        self._order = {w: i for i, w in enumerate(self.words)}
+        self._prefixes = {
+            w: [p for p in self.words if w.startswith(p)] for w in self.words
+        }
+        longest_first = sorted(self.words, key=len, reverse=True)
+        self._pattern = (
+            re.compile("(?=(" + "|".join(map(re.escape, longest_first)) + "))")
+            if longest_first
+            else None
+        )
+
+    def search(self, text: str) -> bool:
+        if not text or self._pattern is None:
+            return False
+        return self._pattern.search(text) is not None
+
+    def find_all(self, text: str) -> list:
+        if not text or self._pattern is None:
+            return []
+        found = set()
+        for match in self._pattern.finditer(text):
+            found.update(self._prefixes[match.group(1)])
+        return sorted(found, key=self._order.__getitem__)
+
+
+@lru_cache(maxsize=16)
+def get_keyword_matcher(words: tuple) -> KeywordMatcher:
+    return KeywordMatcher(words)
+
+
 def check_employee_in_comment(comment: str, surnames: set) -> bool:
     if not comment:
         return False
-    comment_lower = comment.lower()
-    for surname in surnames:
-        if surname in comment_lower:
-            return True
-    return False
+    return get_keyword_matcher(tuple(sorted(surnames))).search(comment.lower())
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -276,98 +682,337 @@ def dashboard(request: Request):
 
 
 @app.get("/unlinked-acts", response_class=HTMLResponse)
-def unlinked_acts(request: Request):
-    session = get_session()
-    try:
-        employees = (
-            session.query(Employee)
-            .order_by(Employee.last_name, Employee.first_name)
-            .all()
-        )
-        contractors = session.query(Contractor).order_by(Contractor.name).all()
+def unlinked_acts(request: Request, session: Session = Depends(get_db)):
+    employees = (
+        session.query(Employee).order_by(Employee.last_name, Employee.first_name).all()
+    )
+    contractors = session.query(Contractor).order_by(Contractor.name).all()
 
-        return templates.TemplateResponse(
-            "unlinked_acts.html",
-            {
-                "request": request,
-                "employees": employees,
-                "contractors": contractors,
-            },
-        )
-    finally:
-        session.close()
+    return templates.TemplateResponse(
+        "unlinked_acts.html",
+        {
+            "request": request,
+            "employees": employees,
+            "contractors": contractors,
+        },
+    )
 
 
 @app.get("/linked-acts", response_class=HTMLResponse)
-def linked_acts_page(request: Request):
-    session = get_session()
-    try:
-        employees = (
-            session.query(Employee)
-            .order_by(Employee.last_name, Employee.first_name)
-            .all()
-        )
-        contractors = session.query(Contractor).order_by(Contractor.name).all()
-        return templates.TemplateResponse(
-            "linked_acts.html",
-            {"request": request, "employees": employees, "contractors": contractors},
-        )
-    finally:
-        session.close()
+def linked_acts_page(request: Request, session: Session = Depends(get_db)):
+    employees = (
+        session.query(Employee).order_by(Employee.last_name, Employee.first_name).all()
+    )
+    contractors = session.query(Contractor).order_by(Contractor.name).all()
+    return templates.TemplateResponse(
+        "linked_acts.html",
+        {"request": request, "employees": employees, "contractors": contractors},
+    )
 
 
 @app.get("/import", response_class=HTMLResponse)
-def import_page(request: Request):
-    session = get_session()
-    try:
-        stop_words = session.query(StopWord).all()
-        return templates.TemplateResponse(
-            "import.html", {"request": request, "stop_words": stop_words}
-        )
-    finally:
-        session.close()
+def import_page(request: Request, session: Session = Depends(get_db)):
+    stop_words = session.query(StopWord).all()
+    return templates.TemplateResponse(
+        "import.html", {"request": request, "stop_words": stop_words}
+    )
 
 
 @app.post("/stop-words/add")
-def add_stop_word(word: str = Form(...)):
-    session = get_session()
-    try:
-        existing = session.query(StopWord).filter(StopWord.word == word).first()
-        if not existing:
-            sw = StopWord(word=word)
-            session.add(sw)
-            session.commit()
-        return RedirectResponse("/import", status_code=303)
-    finally:
-        session.close()
+def add_stop_word(word: str = Form(...), session: Session = Depends(get_db)):
+    existing = session.query(StopWord).filter(StopWord.word == word).first()
+    if not existing:
+        sw = StopWord(word=word)
+        session.add(sw)
+        session.commit()
+    return RedirectResponse("/import", status_code=303)
 
 
 @app.post("/stop-words/delete/{word_id}")
-def delete_stop_word(word_id: int):
-    session = get_session()
-    try:
-        sw = session.query(StopWord).filter(StopWord.id == word_id).first()
-        if sw:
-            session.delete(sw)
-            session.commit()
-        return RedirectResponse("/import", status_code=303)
-    finally:
-        session.close()
+def delete_stop_word(word_id: int, session: Session = Depends(get_db)):
+    sw = session.query(StopWord).filter(StopWord.id == word_id).first()
+    if sw:
+        session.delete(sw)
+        session.commit()
+    return RedirectResponse("/import", status_code=303)
+
+
+IMPORT_COUNTERS = {
+    "1c": (
+        "added",
+        "skipped_zero",
+        "skipped_delete",
+        "skipped_responsible",
+        "skipped_stopwords",
+        "skipped_duplicate",
+    ),
+    "sbis": (
+        "added",
+        "skipped_status",
+        "skipped_type",
+        "skipped_empty",
+        "skipped_duplicate",
+    ),
+}
+IMPORT_COUNTERS["sbis-force-inn"] = IMPORT_COUNTERS["sbis"]
+
+IMPORT_ROW_OUTCOMES = {
+    "imported": "Импортирован",
+    "skipped": "Пропущен",
+    "error": "Ошибка",
+}
+
+IMPORT_ROWS_STORE_IMPORTED = os.environ.get("IMPORT_ROWS_STORE_IMPORTED", "0") == "1"
+IMPORT_ROWS_KEEP_IMPORTS = int(os.environ.get("IMPORT_ROWS_KEEP_IMPORTS", "50"))
+
+IMPORT_ROW_REASONS = {
+    "zero_amount": ("Сумма = 0 или пустая", "Сумма = 0 или пустая"),
+    "delete_marker": (
+        "Удалить/заглушка",
+        "В комментарии есть 'удалить' или 'заглушка'",
+    ),
+    "rpo_responsible": (
+        "Ответственный из РПО",
+        "Ответственный '{responsible_surname}' найден в списке РПО",
+    ),
+    "rpo_comment": (
+        "Фамилия РПО в комментарии",
+        "Фамилия РПО найдена в комментарии: {surnames}",
+    ),
+    "not_rpo": (
+        "Не РПО/Продажи",
+        "Ответственный '{responsible_surname}' не относится к РПО/Продажи",
+    ),
+    "stop_words": ("Стоп-слова", "Найдены стоп-слова: {stop_words}"),
+    "duplicate_invoice": (
+        "Дубликат",
+        "Дубликат (счёт с такими реквизитами уже существует)",
+    ),
+    "doc_type": ("Тип документа", "Тип документа: {doc_type}"),
+    "doc_status": (
+        "Статус документа",
+        "Статус документа: '{doc_status}' (ожидается '{expected_status}')",
+    ),
+    "empty_signing_date": (
+        "Пустая дата подписания",
+        "Дата подписания (Завершено) пустая",
+    ),
+    "duplicate_act": (
+        "Дубликат",
+        "Дубликат (акт с такими реквизитами уже существует)",
+    ),
+    "duplicate_act_inn_updated": (
+        "Дубликат, ИНН обновлён",
+        "Дубликат (акт существует), ИНН контрагента обновлён",
+    ),
+    "row_error": ("Ошибка обработки строки", "Ошибка обработки строки: {error}"),
+}
+
+IMPORT_SOURCE_REASONS = {
+    "1c": (
+        "zero_amount",
+        "delete_marker",
+        "rpo_responsible",
+        "rpo_comment",
+        "not_rpo",
+        "stop_words",
+        "duplicate_invoice",
+        "row_error",
+    ),
+    "sbis": (
+        "doc_type",
+        "doc_status",
+        "zero_amount",
+        "empty_signing_date",
+        "duplicate_act",
+        "duplicate_act_inn_updated",
+        "row_error",
+    ),
+}
+IMPORT_SOURCE_REASONS["sbis-force-inn"] = IMPORT_SOURCE_REASONS["sbis"]
+
+IMPORT_LEDGER_FAMILIES = {
+    "1c": ["1c"],
+    "sbis": ["sbis", "sbis-force-inn"],
+    "sbis-force-inn": ["sbis", "sbis-force-inn"],
+}
+
+
+def file_content_hash(fileobj) -> str:
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(1024 * 1024), b""):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def find_imported_file(session, source: str, content_hash: str, completed: bool = True):
+    checkpoint = ImportFile.checkpoint_row
+    return (
+        session.query(ImportFile)
+        .filter(
+            ImportFile.source == source,
+            ImportFile.content_hash == content_hash,
+            checkpoint.is_(None) if completed else checkpoint.isnot(None),
+        )
+        .order_by(ImportFile.id.desc())
+        .first()
+    )
 
 
-@app.post("/import-1c")
-async def import_1c(file: UploadFile = File(...)):
-    session = get_session()
-    try:
-        content = await file.read()
-        temp_path = os.path.join(os.path.dirname(__file__), "temp_1c.xlsx")
-        with open(temp_path, "wb") as f:
-            f.write(content)
+def as_datetime(value) -> Optional[datetime]:
+    if not value or isinstance(value, datetime):
+        return value or None
+    return datetime.combine(value, datetime.min.time())
+
+
+def write_import_outcomes(session, import_id: int, outcomes: list) -> None:
+    rows = [
+        {
+            "import_id": import_id,
+            "row_index": outcome["row_index"],
+            "outcome": outcome["outcome"],
+            "reasons": f",{','.join(outcome['reasons'])},"
+            if outcome["reasons"]
+            else "",
+            "details": json.dumps(outcome["details"], ensure_ascii=False)
+            if outcome.get("details")
+            else None,
+        }
+        for outcome in outcomes
+        if IMPORT_ROWS_STORE_IMPORTED or outcome["outcome"] != "imported"
+    ]
+    bulk_insert_rows(session, ImportRow, rows)
+
+
+def prune_import_rows(session, keep: int) -> None:
+    if keep <= 0:
+        return
+    cutoff = (
+        session.query(ImportFile.id)
+        .order_by(ImportFile.id.desc())
+        .offset(keep - 1)
+        .limit(1)
+        .scalar()
+    )
+    if cutoff is None:
+        return
+    stale = session.query(ImportFile.id).filter(
+        ImportFile.id < cutoff, ImportFile.checkpoint_row.is_(None)
+    )
+    session.query(ImportRow).filter(ImportRow.import_id.in_(stale)).delete(
+        synchronize_session=False
+    )
+
+
+class ImportLedger:
+    def __init__(self, source: str, filename: Optional[str], content_hash: str):
+        self.source = source
+        self.filename = filename
+        self.content_hash = content_hash
+        self.overlaps = []
+        self.entry = None
+        self.chunk_size = 0
+        self.resume_id = None
+        self.resume_from = 0
+        self.resume_counters = {}
+
+    def resume(self, previous: ImportFile) -> None:
+        self.resume_id = previous.id
+        self.resume_from = previous.checkpoint_row
+        self.resume_counters = json.loads(previous.checkpoint_counters or "{}")
+
+    def _ensure_entry(self, session) -> ImportFile:
+        if self.entry is None and self.resume_id is not None:
+            self.entry = session.get(ImportFile, self.resume_id)
+        if self.entry is None:
+            self.entry = ImportFile(
+                content_hash=self.content_hash,
+                source=self.source,
+                filename=self.filename,
+            )
+            session.add(self.entry)
+            session.flush()
+        return self.entry
+
+    def checkpoint_due(self, rows_done: int) -> bool:
+        return bool(
+            self.chunk_size and (rows_done - self.resume_from) % self.chunk_size == 0
+        )
+
+    def checkpoint(self, session, rows_done: int, counters: dict, outcomes) -> None:
+        entry = self._ensure_entry(session)
+        write_import_outcomes(session, entry.id, outcomes)
+        entry.checkpoint_row = rows_done
+        entry.checkpoint_counters = json.dumps(counters)
+        entry.rows_added = counters["added"]
+        session.commit()
+
+    def record(
+        self, session, rows_total: int, rows_added: int, dates, outcomes=()
+    ) -> None:
+        dates = [as_datetime(d) for d in dates if d]
+        date_from = min(dates) if dates else None
+        date_to = max(dates) if dates else None
+
+        if dates:
+            previous = session.query(ImportFile).filter(
+                ImportFile.source.in_(IMPORT_LEDGER_FAMILIES[self.source]),
+                ImportFile.content_hash != self.content_hash,
+                ImportFile.date_from <= date_to,
+                ImportFile.date_to >= date_from,
+            )
+            self.overlaps = [
+                {
+                    "import_id": entry.id,
+                    "filename": entry.filename,
+                    "date_from": entry.date_from.strftime("%d.%m.%Y"),
+                    "date_to": entry.date_to.strftime("%d.%m.%Y"),
+                    "imported_at": entry.created_at.strftime("%d.%m.%Y %H:%M"),
+                }
+                for entry in previous.order_by(ImportFile.id)
+            ]
+
+        entry = self._ensure_entry(session)
+        entry.rows_total = rows_total
+        entry.rows_added = rows_added
+        entry.date_from = date_from
+        entry.date_to = date_to
+        entry.checkpoint_row = None
+        entry.checkpoint_counters = None
+        write_import_outcomes(session, entry.id, outcomes)
+        prune_import_rows(session, IMPORT_ROWS_KEEP_IMPORTS)
+
+
+class ImportCancelled(Exception):
+    pass
 
-        wb = load_workbook(temp_path)
-        ws = wb.active
 
-        headers = [cell.value for cell in ws[1]]
+class ImportProgress:
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+        self.status = "queued"
+        self.rows_total = None
+        self.rows_processed = 0
+        self.counters = {}
+        self.started_at = None
+        self.cancel_event = threading.Event()
+
+    def start(self, rows_total: int):
+        self.rows_total = rows_total
+
+    def tick(self, counters: dict):
+        if self.cancel_event.is_set():
+            raise ImportCancelled()
+        self.counters = counters
+        self.rows_processed += 1
+
+
+def run_import_1c(session, fileobj, progress=None, batch=None, ledger=None) -> dict:
+    try:
+        rows, sheet_rows = open_import_rows(fileobj)
+        headers = next(rows, None) or ()
         col_map = {}
         for i, h in enumerate(headers):
             if h:
@@ -389,519 +1034,980 @@ async def import_1c(file: UploadFile = File(...)):
 
         stop_words = [sw.word.lower() for sw in session.query(StopWord).all()]
         rpo_surnames = get_rpo_surnames()
+        comment_matcher = get_keyword_matcher(
+            tuple(stop_words) + tuple(sorted(rpo_surnames))
+        )
+        stop_words = set(stop_words)
 
-        added = 0
-        skipped_zero = 0
-        skipped_delete = 0
-        skipped_responsible = 0
-        skipped_stopwords = 0
-        skipped_duplicate = 0
+        counters = dict.fromkeys(IMPORT_COUNTERS["1c"], 0)
+        resume_from = 0
+        if ledger is not None:
+            counters.update(ledger.resume_counters)
+            resume_from = ledger.resume_from
 
-        rows_detail = []
+        outcomes = []
+        pending = []
 
-        for row in ws.iter_rows(min_row=2):
+        existing_keys = set(batch.keys[Invoice]) if batch is not None else set()
+        invoice_dates = []
+
+        def preload(chunk, dates):
+            existing_keys.update(load_invoice_keys(session, dates))
+            invoice_dates.extend(date_bounds(dates))
+
+        if progress:
+            progress.start(max(sheet_rows - 1 - resume_from, 0) if sheet_rows else None)
+
+        rows_total = 0
+        dated_rows = iter_dated_rows(
+            rows, col_map["Дата"] - 1, parse_date_column, preload
+        )
+        for position, (row, invoice_date) in enumerate(dated_rows):
+            rows_total = position + 1
+            if position < resume_from:
+                continue
+            if progress:
+                progress.tick(counters)
+            row_index = position + 2
             try:
-                number = str(row[col_map["Номер"] - 1].value or "").strip()
-                invoice_date = parse_date(row[col_map["Дата"] - 1].value)
-                amount = parse_amount(row[col_map["Сумма"] - 1].value)
-                contractor_name = str(
-                    row[col_map["Контрагент"] - 1].value or ""
-                ).strip()
-                responsible = str(row[col_map["Ответственный"] - 1].value or "").strip()
+                number = str(row[col_map["Номер"] - 1] or "").strip()
+                amount = parse_amount(row[col_map["Сумма"] - 1])
+                contractor_name = str(row[col_map["Контрагент"] - 1] or "").strip()
+                responsible = str(row[col_map["Ответственный"] - 1] or "").strip()
                 responsible_parts = responsible.split()
                 responsible_surname = (
                     responsible_parts[1] if len(responsible_parts) > 1 else ""
                 )
-                comment = str(row[col_map["Комментарий"] - 1].value or "").strip()
+                comment = str(row[col_map["Комментарий"] - 1] or "").strip()
                 comment_lower = comment.lower()
-                org_group = str(row[col_map["Организация"] - 1].value or "").strip()
-
-                row_info = {
-                    "number": number,
-                    "date": invoice_date.strftime("%d.%m.%Y") if invoice_date else "",
-                    "amount": amount,
-                    "contractor": contractor_name,
-                    "responsible": responsible,
-                    "comment": comment,
-                    "status": "Импортирован",
+                comment_words = comment_matcher.find_all(comment_lower)
+                org_group = str(row[col_map["Организация"] - 1] or "").strip()
+
+                outcome = {
+                    "row_index": row_index,
+                    "outcome": "imported",
                     "reasons": [],
+                    "details": {},
                 }
+                reasons = outcome["reasons"]
+                details = outcome["details"]
 
                 if not amount or amount == 0:
-                    row_info["status"] = "Пропущен"
-                    row_info["reasons"].append("Сумма = 0 или пустая")
-                    skipped_zero += 1
+                    outcome["outcome"] = "skipped"
+                    reasons.append("zero_amount")
+                    counters["skipped_zero"] += 1
 
                 if "удалить" in comment_lower or "заглушка" in comment_lower:
-                    if row_info["status"] == "Импортирован":
-                        row_info["status"] = "Пропущен"
-                    row_info["reasons"].append(
-                        "В комментарии есть 'удалить' или 'заглушка'"
-                    )
-                    skipped_delete += 1
+                    outcome["outcome"] = "skipped"
+                    reasons.append("delete_marker")
+                    counters["skipped_delete"] += 1
+
+                found_surnames = [w for w in comment_words if w in rpo_surnames]
 
                 keep = False
                 if responsible_surname.lower() in rpo_surnames:
                     keep = True
-                    row_info["reasons"].append(
-                        f"Ответственный '{responsible_surname}' найден в списке РПО"
-                    )
-                elif check_employee_in_comment(comment_lower, rpo_surnames):
+                    reasons.append("rpo_responsible")
+                    details["responsible_surname"] = responsible_surname
+                elif found_surnames:
                     keep = True
-                    row_info["reasons"].append("Фамилия РПО найдена в комментарии")
+                    reasons.append("rpo_comment")
+                    details["surnames"] = ", ".join(found_surnames)
 
                 if not keep:
-                    if row_info["status"] == "Импортирован":
-                        row_info["status"] = "Пропущен"
-                    row_info["reasons"].append(
-                        f"Ответственный '{responsible_surname}' не относится к РПО/Продажи"
-                    )
-                    skipped_responsible += 1
-
-                has_stop_word = False
-                found_stop_words = []
-                for sw in stop_words:
-                    if sw in comment_lower:
-                        has_stop_word = True
-                        found_stop_words.append(sw)
-                if has_stop_word:
-                    if row_info["status"] == "Импортирован":
-                        row_info["status"] = "Пропущен"
-                    row_info["reasons"].append(
-                        f"Найдены стоп-слова: {', '.join(found_stop_words)}"
-                    )
-                    skipped_stopwords += 1
-
-                existing = (
-                    session.query(Invoice)
-                    .filter(
-                        Invoice.number == number,
-                        Invoice.date == invoice_date,
-                        Invoice.amount == amount,
+                    outcome["outcome"] = "skipped"
+                    reasons.append("not_rpo")
+                    details["responsible_surname"] = responsible_surname
+                    counters["skipped_responsible"] += 1
+
+                found_stop_words = [w for w in comment_words if w in stop_words]
+                if found_stop_words:
+                    outcome["outcome"] = "skipped"
+                    reasons.append("stop_words")
+                    details["stop_words"] = ", ".join(found_stop_words)
+                    counters["skipped_stopwords"] += 1
+
+                key = (number, invoice_date, amount)
+                if key in existing_keys:
+                    outcome["outcome"] = "skipped"
+                    reasons.append("duplicate_invoice")
+                    counters["skipped_duplicate"] += 1
+
+                if outcome["outcome"] == "imported":
+                    pending.append(
+                        {
+                            "number": number,
+                            "date": invoice_date,
+                            "amount": amount,
+                            "contractor_name": contractor_name,
+                            "contractor_inn": None,
+                            "organization_group": org_group,
+                            "responsible_import": responsible,
+                            "comment": comment,
+                            "status": "Не оплачен",
+                        }
                     )
-                    .first()
+                    existing_keys.add(key)
+                    counters["added"] += 1
+
+                outcomes.append(outcome)
+
+            except Exception as e:
+                outcomes.append(
+                    {
+                        "row_index": row_index,
+                        "outcome": "error",
+                        "reasons": ["row_error"],
+                        "details": {"error": str(e)},
+                    }
                 )
 
-                if existing:
-                    if row_info["status"] == "Импортирован":
-                        row_info["status"] = "Пропущен"
-                    row_info["reasons"].append(
-                        "Дубликат (счёт с такими реквизитами уже существует)"
-                    )
-                    skipped_duplicate += 1
-
-                if row_info["status"] == "Импортирован":
-                    contractor = get_or_create_contractor(session, contractor_name)
-
-                    invoice = Invoice(
-                        number=number,
-                        date=invoice_date,
-                        amount=amount,
-                        contractor_id=contractor.id,
-                        organization_group=org_group,
-                        responsible_import=responsible,
-                        comment=comment,
-                        status="Не оплачен",
-                    )
-                    session.add(invoice)
-                    added += 1
+            if ledger is not None and ledger.checkpoint_due(position + 1):
+                write_import_rows(session, Invoice, pending)
+                ledger.checkpoint(session, position + 1, counters, outcomes)
+                pending, outcomes = [], []
 
-                rows_detail.append(row_info)
+        if ledger is not None:
+            ledger.record(
+                session, rows_total, counters["added"], invoice_dates, outcomes
+            )
+        if batch is not None:
+            batch.add(Invoice, pending, existing_keys)
+        else:
+            write_import_rows(session, Invoice, pending)
+            session.commit()
+
+        return {"success": True, **counters}
+    except ImportCancelled:
+        if batch is None:
+            session.rollback()
+        raise
+    except Exception as e:
+        if batch is not None:
+            raise
+        session.rollback()
+        return {"error": str(e)}
+
+
+SBIS_COLUMNS = [
+    ("doc_type", "Тип документа"),
+    ("package_type", "Тип пакета"),
+    ("status", "Статус"),
+    ("amount", "Сумма"),
+    ("number", "Номер"),
+    ("contractor", "Контрагент"),
+    ("filename", "Имя файла"),
+]
+
+SBIS_SIGNING_DATE_HEADER = "Завершено"
+
+SBIS_INN_HEADERS = ["ИНН/КПП", "ИНН / КПП", "ИНН"]
+
+SBIS_SUCCESS_STATUS = "Выполнение завершено успешно"
+
+SBIS_ROW_RULES = [
+    (
+        "skipped_type",
+        lambda record: record["doc_type"] == "ЭДОСч",
+        "doc_type",
+    ),
+    (
+        "skipped_status",
+        lambda record: record["status"] != SBIS_SUCCESS_STATUS,
+        "doc_status",
+    ),
+    (
+        "skipped_empty",
+        lambda record: not record["amount"] and record["package_type"] != "ДокОтгрИсх",
+        "zero_amount",
+    ),
+    (
+        "skipped_empty",
+        lambda record: not record["signing_date"],
+        "empty_signing_date",
+    ),
+]
+
+
+def resolve_sbis_columns(headers) -> dict:
+    col_map = {}
+    for i, h in enumerate(headers):
+        if h:
+            col_map[h.strip()] = i
+
+    columns = {field: col_map.get(header) for field, header in SBIS_COLUMNS}
+    columns["signing_date"] = col_map.get(SBIS_SIGNING_DATE_HEADER)
+
+    contractor_idx = columns["contractor"]
+    org_idx = col_map.get("Организация")
+    columns["inn"] = None
+    if contractor_idx is not None and org_idx is not None:
+        for i, h in enumerate(headers):
+            if h and h.strip() in SBIS_INN_HEADERS and contractor_idx < i < org_idx:
+                columns["inn"] = i
+                break
+    return columns
+
+
+def extract_sbis_row(row, columns: dict, signing_date) -> dict:
+    inn_kpp = ""
+    if columns["inn"] is not None:
+        inn_kpp = str(row[columns["inn"]] or "").strip()
+    return {
+        "doc_type": str(row[columns["doc_type"]] or "").strip(),
+        "package_type": str(row[columns["package_type"]] or "").strip(),
+        "status": str(row[columns["status"]] or "").strip(),
+        "amount": parse_amount(row[columns["amount"]]),
+        "number": str(row[columns["number"]] or "").strip(),
+        "contractor": str(row[columns["contractor"]] or "").strip(),
+        "inn": inn_kpp.split("/")[0] if inn_kpp else "",
+        "filename": str(row[columns["filename"]] or "").strip(),
+        "signing_date": signing_date,
+    }
+
+
+def run_import_sbis(
+    session,
+    fileobj,
+    progress=None,
+    force_inn: bool = False,
+    batch=None,
+    ledger=None,
+) -> dict:
+    try:
+        rows, sheet_rows = open_import_rows(fileobj)
+        columns = resolve_sbis_columns(next(rows, None) or ())
+        if columns["signing_date"] is None:
+            return {"error": f"Missing column: {SBIS_SIGNING_DATE_HEADER}"}
+        missing = [header for field, header in SBIS_COLUMNS if columns[field] is None]
+
+        counters = dict.fromkeys(IMPORT_COUNTERS["sbis"], 0)
+        resume_from = 0
+        if ledger is not None:
+            counters.update(ledger.resume_counters)
+            resume_from = ledger.resume_from
+
+        outcomes = []
+        pending = []
+
+        contractor_idx = columns["contractor"] if force_inn else None
+        existing_keys = set(batch.keys[Act]) if batch is not None else set()
+        resolver = ContractorResolver(session, force_update_inn=force_inn)
+        signing_dates = []
+
+        def preload(chunk, dates):
+            existing_keys.update(load_act_keys(session, dates))
+            signing_dates.extend(date_bounds(dates))
+            if contractor_idx is not None:
+                resolver.prefetch(
+                    {str(row[contractor_idx] or "").strip() for row in chunk}
+                )
+
+        if progress:
+            progress.start(max(sheet_rows - 1 - resume_from, 0) if sheet_rows else None)
+
+        rows_total = 0
+        dated_rows = iter_dated_rows(
+            rows, columns["signing_date"], parse_datetime_column, preload
+        )
+        for position, (row, signing_datetime) in enumerate(dated_rows):
+            rows_total = position + 1
+            if position < resume_from:
+                continue
+            if progress:
+                progress.tick(counters)
+            row_index = position + 2
+            try:
+                if missing:
+                    raise KeyError(missing[0])
+                record = extract_sbis_row(row, columns, signing_datetime)
+
+                reasons = []
+                for counter, predicate, reason in SBIS_ROW_RULES:
+                    if predicate(record):
+                        reasons.append(reason)
+                        counters[counter] += 1
+
+                number = record["number"]
+                amount = record["amount"]
+                key = (number, signing_datetime, amount)
+                if number and signing_datetime and amount and key in existing_keys:
+                    if force_inn and resolver.update_inn(
+                        record["contractor"], record["inn"]
+                    ):
+                        reasons.append("duplicate_act_inn_updated")
+                    else:
+                        reasons.append("duplicate_act")
+                    counters["skipped_duplicate"] += 1
+
+                details = {}
+                if "doc_type" in reasons:
+                    details["doc_type"] = record["doc_type"]
+                if "doc_status" in reasons:
+                    details["doc_status"] = record["status"]
+                outcomes.append(
+                    {
+                        "row_index": row_index,
+                        "outcome": "skipped" if reasons else "imported",
+                        "reasons": reasons,
+                        "details": details,
+                    }
+                )
+
+                if not reasons:
+                    pending.append(
+                        {
+                            "number": number,
+                            "filename": record["filename"],
+                            "signing_date": signing_datetime,
+                            "amount": amount,
+                            "contractor_name": record["contractor"],
+                            "contractor_inn": record["inn"],
+                        }
+                    )
+                    existing_keys.add(key)
+                    counters["added"] += 1
 
             except Exception as e:
-                row_info = {
-                    "number": "",
-                    "date": "",
-                    "amount": None,
-                    "contractor": "",
-                    "status": "Ошибка",
-                    "reasons": [f"Ошибка обработки строки: {str(e)}"],
-                }
-                rows_detail.append(row_info)
+                outcomes.append(
+                    {
+                        "row_index": row_index,
+                        "outcome": "error",
+                        "reasons": ["row_error"],
+                        "details": {"error": str(e)},
+                    }
+                )
 
-        session.commit()
-        os.remove(temp_path)
+            if ledger is not None and ledger.checkpoint_due(position + 1):
+                write_import_rows(session, Act, pending, resolver=resolver)
+                ledger.checkpoint(session, position + 1, counters, outcomes)
+                pending, outcomes = [], []
 
-        return {
-            "success": True,
-            "added": added,
-            "skipped_zero": skipped_zero,
-            "skipped_delete": skipped_delete,
-            "skipped_responsible": skipped_responsible,
-            "skipped_stopwords": skipped_stopwords,
-            "skipped_duplicate": skipped_duplicate,
-            "rows_detail": rows_detail,
-        }
+        if ledger is not None:
+            ledger.record(
+                session, rows_total, counters["added"], signing_dates, outcomes
+            )
+        if batch is not None:
+            batch.add(Act, pending, existing_keys, resolver)
+        else:
+            write_import_rows(session, Act, pending, resolver=resolver)
+            session.commit()
+
+        return {"success": True, **counters}
+    except ImportCancelled:
+        if batch is None:
+            session.rollback()
+        raise
     except Exception as e:
+        if batch is not None:
+            raise
         session.rollback()
         return {"error": str(e)}
-    finally:
-        session.close()
 
 
-@app.post("/import-sbis")
-async def import_sbis(file: UploadFile = File(...)):
-    session = get_session()
+def run_import_sbis_force_inn(
+    session, fileobj, progress=None, batch=None, ledger=None
+) -> dict:
+    return run_import_sbis(
+        session, fileobj, progress, force_inn=True, batch=batch, ledger=ledger
+    )
+
+
+IMPORT_SPOOL_MAX_SIZE = int(
+    os.environ.get("IMPORT_SPOOL_MAX_SIZE", str(8 * 1024 * 1024))
+)
+
+
+def spool_file(fileobj):
+    spooled = tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_MAX_SIZE)
     try:
-        content = await file.read()
-        temp_path = os.path.join(os.path.dirname(__file__), "temp_sbis.xlsx")
-        with open(temp_path, "wb") as f:
-            f.write(content)
+        fileobj.seek(0)
+        shutil.copyfileobj(fileobj, spooled)
+        spooled.seek(0)
+    except Exception:
+        spooled.close()
+        raise
+    return spooled
 
-        wb = load_workbook(temp_path)
-        ws = wb.active
 
-        headers = [cell.value for cell in ws[1]]
-        col_map = {}
-        for i, h in enumerate(headers):
-            if h:
-                col_map[h.strip()] = i + 1
+def rewind_upload(file: UploadFile):
+    file.file.seek(0)
+    return file.file
 
-        contractor_idx = col_map.get("Контрагент")
-        org_idx = col_map.get("Организация")
 
-        inn_col_idx = None
-        if contractor_idx and org_idx:
-            for i, h in enumerate(headers):
-                if h:
-                    h_stripped = h.strip()
-                    if h_stripped in ["ИНН/КПП", "ИНН / КПП", "ИНН"]:
-                        col_idx = i + 1
-                        if contractor_idx < col_idx < org_idx:
-                            inn_col_idx = col_idx
-                            break
+@app.post("/import-1c")
+def import_1c(
+    file: UploadFile = File(...),
+    reimport: bool = Form(False),
+    session: Session = Depends(get_db),
+):
+    with rewind_upload(file) as spooled:
+        return run_import(session, "1c", spooled, file.filename, reimport=reimport)
 
-        added = 0
-        skipped_status = 0
-        skipped_type = 0
-        skipped_empty = 0
-        skipped_duplicate = 0
 
-        rows_detail = []
+@app.post("/import-sbis")
+def import_sbis(
+    file: UploadFile = File(...),
+    reimport: bool = Form(False),
+    session: Session = Depends(get_db),
+):
+    with rewind_upload(file) as spooled:
+        return run_import(session, "sbis", spooled, file.filename, reimport=reimport)
 
-        for row in ws.iter_rows(min_row=2):
-            try:
-                doc_type = str(row[col_map["Тип документа"] - 1].value or "").strip()
-                package_type = str(row[col_map["Тип пакета"] - 1].value or "").strip()
-                status = str(row[col_map["Статус"] - 1].value or "").strip()
-                amount = parse_amount(row[col_map["Сумма"] - 1].value)
-                signing_datetime = parse_datetime(row[col_map["Завершено"] - 1].value)
-                number = str(row[col_map["Номер"] - 1].value or "").strip()
-                contractor_name = str(
-                    row[col_map["Контрагент"] - 1].value or ""
-                ).strip()
-                inn_kpp = ""
-                if inn_col_idx:
-                    inn_kpp = str(row[inn_col_idx - 1].value or "").strip()
-                inn = inn_kpp.split("/")[0] if inn_kpp else ""
-                filename = str(row[col_map["Имя файла"] - 1].value or "").strip()
-
-                row_info = {
-                    "number": number,
-                    "date": signing_datetime.strftime("%d.%m.%Y %H:%M")
-                    if signing_datetime
-                    else "",
-                    "amount": amount,
-                    "contractor": contractor_name,
-                    "inn": inn,
-                    "filename": filename,
-                    "doc_type": doc_type,
-                    "package_type": package_type,
-                    "status": status,
-                    "import_status": "Импортирован",
-                    "reasons": [],
-                }
 
-                if doc_type == "ЭДОСч":
-                    row_info["import_status"] = "Пропущен"
-                    row_info["reasons"].append(f"Тип документа: {doc_type}")
-                    skipped_type += 1
-                elif package_type == "ДокОтгрИсх":
-                    pass
+@app.post("/import-sbis-force-inn")
+def import_sbis_force_inn(
+    file: UploadFile = File(...),
+    reimport: bool = Form(False),
+    session: Session = Depends(get_db),
+):
+    with rewind_upload(file) as spooled:
+        return run_import(
+            session, "sbis-force-inn", spooled, file.filename, reimport=reimport
+        )
 
-                if status != "Выполнение завершено успешно":
-                    if row_info["import_status"] == "Импортирован":
-                        row_info["import_status"] = "Пропущен"
-                    row_info["reasons"].append(
-                        f"Статус документа: '{status}' (ожидается 'Выполнение завершено успешно')"
-                    )
-                    skipped_status += 1
 
-                if not amount or amount == 0:
-                    if package_type != "ДокОтгрИсх":
-                        if row_info["import_status"] == "Импортирован":
-                            row_info["import_status"] = "Пропущен"
-                        row_info["reasons"].append("Сумма = 0 или пустая")
-                        skipped_empty += 1
-
-                if not signing_datetime:
-                    if row_info["import_status"] == "Импортирован":
-                        row_info["import_status"] = "Пропущен"
-                    row_info["reasons"].append("Дата подписания (Завершено) пустая")
-                    skipped_empty += 1
-
-                is_duplicate = False
-                if number and signing_datetime and amount and amount != 0:
-                    existing = (
-                        session.query(Act)
-                        .filter(
-                            Act.number == number,
-                            Act.signing_date == signing_datetime,
-                            Act.amount == amount,
-                        )
-                        .first()
-                    )
-                    if existing:
-                        is_duplicate = True
-
-                if is_duplicate:
-                    if row_info["import_status"] == "Импортирован":
-                        row_info["import_status"] = "Пропущен"
-                    row_info["reasons"].append(
-                        "Дубликат (акт с такими реквизитами уже существует)"
-                    )
-                    skipped_duplicate += 1
+IMPORT_WORKERS = int(os.environ.get("IMPORT_WORKERS", "2"))
+IMPORT_COMMIT_CHUNK_SIZE = int(os.environ.get("IMPORT_COMMIT_CHUNK_SIZE", "0"))
+IMPORT_PARSE_PROCESSES = int(
+    os.environ.get("IMPORT_PARSE_PROCESSES", str(min(4, os.cpu_count() or 1)))
+)
 
-                if row_info["import_status"] == "Импортирован":
-                    contractor = get_or_create_contractor(session, contractor_name, inn)
+IMPORT_RUNNERS = {
+    "1c": run_import_1c,
+    "sbis": run_import_sbis,
+    "sbis-force-inn": run_import_sbis_force_inn,
+}
+
+_import_executor = None
+_import_executor_lock = threading.Lock()
+_parse_executor = None
+_active_imports: Dict[int, ImportProgress] = {}
+
+
+def run_import(
+    session,
+    source: str,
+    fileobj,
+    filename: Optional[str] = None,
+    progress=None,
+    batch=None,
+    content_hash: Optional[str] = None,
+    reimport: bool = False,
+    chunk_size: Optional[int] = None,
+) -> dict:
+    if content_hash is None:
+        content_hash = file_content_hash(fileobj)
+    if not reimport:
+        previous = find_imported_file(session, source, content_hash)
+        if previous:
+            return {
+                "success": True,
+                "already_imported": True,
+                "import_id": previous.id,
+                "imported_at": previous.created_at.strftime("%d.%m.%Y %H:%M"),
+                **dict.fromkeys(IMPORT_COUNTERS[source], 0),
+                "skipped_duplicate": previous.rows_total,
+            }
 
-                    act = Act(
-                        number=number,
-                        filename=filename,
-                        signing_date=signing_datetime,
-                        amount=amount,
-                        contractor_id=contractor.id,
-                    )
-                    session.add(act)
-                    added += 1
+    ledger = ImportLedger(source, filename, content_hash)
+    if batch is None:
+        if chunk_size is None:
+            chunk_size = IMPORT_COMMIT_CHUNK_SIZE
+        ledger.chunk_size = max(chunk_size, 0)
+        partial = find_imported_file(session, source, content_hash, completed=False)
+        if partial:
+            ledger.resume(partial)
+
+    result = IMPORT_RUNNERS[source](
+        session, fileobj, progress, batch=batch, ledger=ledger
+    )
+    if result.get("success"):
+        result["import_id"] = ledger.entry.id
+        result["overlaps"] = ledger.overlaps
+        if ledger.resume_from:
+            result["resumed_from"] = ledger.resume_from
+    return result
+
+
+def get_import_executor() -> ThreadPoolExecutor:
+    global _import_executor
+    with _import_executor_lock:
+        if _import_executor is None:
+            _import_executor = ThreadPoolExecutor(
+                max_workers=IMPORT_WORKERS, thread_name_prefix="import"
+            )
+        return _import_executor
 
-                rows_detail.append(row_info)
 
-            except Exception as e:
-                row_info = {
-                    "number": "",
-                    "date": "",
-                    "amount": None,
-                    "contractor": "",
-                    "inn": "",
-                    "filename": "",
-                    "doc_type": "",
-                    "status": "",
-                    "import_status": "Ошибка",
-                    "reasons": [f"Ошибка обработки строки: {str(e)}"],
-                }
-                rows_detail.append(row_info)
+def get_parse_executor() -> ProcessPoolExecutor:
+    global _parse_executor
+    with _import_executor_lock:
+        if _parse_executor is None:
+            _parse_executor = ProcessPoolExecutor(
+                max_workers=IMPORT_PARSE_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _parse_executor
 
-        session.commit()
-        os.remove(temp_path)
 
-        return {
-            "success": True,
-            "added": added,
-            "skipped_status": skipped_status,
-            "skipped_type": skipped_type,
-            "skipped_empty": skipped_empty,
-            "skipped_duplicate": skipped_duplicate,
-            "rows_detail": rows_detail,
-        }
-    except Exception as e:
-        session.rollback()
-        return {"error": str(e)}
+def reset_parse_executor():
+    global _parse_executor
+    with _import_executor_lock:
+        executor, _parse_executor = _parse_executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_import_executor():
+    global _import_executor, _parse_executor
+    for progress in list(_active_imports.values()):
+        progress.cancel_event.set()
+    with _import_executor_lock:
+        executor, _import_executor = _import_executor, None
+        parse_executor, _parse_executor = _parse_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+    if parse_executor is not None:
+        parse_executor.shutdown(wait=True, cancel_futures=True)
+
+
+def fail_interrupted_imports():
+    session = get_session()
+    try:
+        session.query(ImportJob).filter(
+            ImportJob.status.in_(["queued", "running"]),
+            ImportJob.id.notin_(list(_active_imports)),
+        ).update(
+            {
+                "status": "failed",
+                "error": "Импорт прерван перезапуском сервера",
+                "finished_at": datetime.now(),
+            },
+            synchronize_session=False,
+        )
+        session.commit()
     finally:
         session.close()
 
 
-@app.post("/import-sbis-force-inn")
-async def import_sbis_force_inn(file: UploadFile = File(...)):
+def _finish_import_job(session, job_id, progress, status, result=None, error=None):
+    progress.status = status
+    job = session.get(ImportJob, job_id)
+    if not job:
+        return
+    job.status = status
+    job.error = error
+    job.rows_total = progress.rows_total
+    job.rows_processed = progress.rows_processed
+    job.finished_at = datetime.now()
+    if result is not None:
+        result.pop("success", None)
+        job.import_id = result.pop("import_id", None)
+        job.counters = json.dumps(result, ensure_ascii=False)
+    else:
+        job.counters = json.dumps(progress.counters, ensure_ascii=False)
+    session.commit()
+
+
+def _run_import_job(
+    job_id: int,
+    source: str,
+    fileobj,
+    progress: ImportProgress,
+    reimport: bool = False,
+    chunk_size: Optional[int] = None,
+):
     session = get_session()
     try:
-        content = await file.read()
-        temp_path = os.path.join(os.path.dirname(__file__), "temp_sbis_force.xlsx")
-        with open(temp_path, "wb") as f:
-            f.write(content)
+        if progress.cancel_event.is_set():
+            raise ImportCancelled()
+        job = session.get(ImportJob, job_id)
+        job.status = progress.status = "running"
+        job.started_at = progress.started_at = datetime.now()
+        session.commit()
 
-        wb = load_workbook(temp_path)
-        ws = wb.active
+        result = run_import(
+            session,
+            source,
+            fileobj,
+            job.filename,
+            progress=progress,
+            reimport=reimport,
+            chunk_size=chunk_size,
+        )
+        if "error" in result:
+            _finish_import_job(
+                session, job_id, progress, "failed", error=result["error"]
+            )
+        else:
+            _finish_import_job(session, job_id, progress, "done", result=result)
+    except ImportCancelled:
+        session.rollback()
+        _finish_import_job(session, job_id, progress, "cancelled")
+    except Exception as e:
+        session.rollback()
+        _finish_import_job(session, job_id, progress, "failed", error=str(e))
+    finally:
+        fileobj.close()
+        session.close()
+        _active_imports.pop(job_id, None)
 
-        headers = [cell.value for cell in ws[1]]
-        col_map = {}
-        for i, h in enumerate(headers):
-            if h:
-                col_map[h.strip()] = i + 1
 
-        contractor_idx = col_map.get("Контрагент")
-        org_idx = col_map.get("Организация")
+def _rows_per_sec(rows_processed, started_at, finished_at=None) -> Optional[float]:
+    if not started_at or not rows_processed:
+        return None
+    elapsed = ((finished_at or datetime.now()) - started_at).total_seconds()
+    return round(rows_processed / elapsed, 1) if elapsed > 0 else None
+
+
+def create_import_job(session, source: str, filename: Optional[str]) -> int:
+    job = ImportJob(source=source, filename=filename, status="queued")
+    session.add(job)
+    session.commit()
+    return job.id
+
+
+def start_import_job(
+    job_id: int,
+    source: str,
+    fileobj,
+    reimport: bool = False,
+    chunk_size: Optional[int] = None,
+) -> None:
+    progress = ImportProgress(job_id)
+    _active_imports[job_id] = progress
+    get_import_executor().submit(
+        _run_import_job, job_id, source, fileobj, progress, reimport, chunk_size
+    )
 
-        inn_col_idx = None
-        if contractor_idx and org_idx:
-            for i, h in enumerate(headers):
-                if h:
-                    h_stripped = h.strip()
-                    if h_stripped in ["ИНН/КПП", "ИНН / КПП", "ИНН"]:
-                        col_idx = i + 1
-                        if contractor_idx < col_idx < org_idx:
-                            inn_col_idx = col_idx
-                            break
 
-        added = 0
-        skipped_status = 0
-        skipped_type = 0
-        skipped_empty = 0
-        skipped_duplicate = 0
+@app.post("/imports")
+def submit_import(
+    file: UploadFile = File(...),
+    source: str = Form(...),
+    reimport: bool = Form(False),
+    chunk_size: Optional[int] = Form(None),
+    session: Session = Depends(get_db),
+):
+    if source not in IMPORT_RUNNERS:
+        return {"success": False, "error": f"Неизвестный тип импорта: {source}"}
 
-        rows_detail = []
+    try:
+        spooled = spool_file(file.file)
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+    try:
+        job_id = create_import_job(session, source, file.filename)
+        start_import_job(job_id, source, spooled, reimport, chunk_size)
+        return {"success": True, "job_id": job_id}
+    except Exception as e:
+        session.rollback()
+        spooled.close()
+        return {"success": False, "error": str(e)}
 
-        for row in ws.iter_rows(min_row=2):
-            try:
-                doc_type = str(row[col_map["Тип документа"] - 1].value or "").strip()
-                package_type = str(row[col_map["Тип пакета"] - 1].value or "").strip()
-                status = str(row[col_map["Статус"] - 1].value or "").strip()
-                amount = parse_amount(row[col_map["Сумма"] - 1].value)
-                signing_datetime = parse_datetime(row[col_map["Завершено"] - 1].value)
-                number = str(row[col_map["Номер"] - 1].value or "").strip()
-                contractor_name = str(
-                    row[col_map["Контрагент"] - 1].value or ""
-                ).strip()
-                inn_kpp = ""
-                if inn_col_idx:
-                    inn_kpp = str(row[inn_col_idx - 1].value or "").strip()
-                inn = inn_kpp.split("/")[0] if inn_kpp else ""
-                filename = str(row[col_map["Имя файла"] - 1].value or "").strip()
-
-                row_info = {
-                    "number": number,
-                    "date": signing_datetime.strftime("%d.%m.%Y %H:%M")
-                    if signing_datetime
-                    else "",
-                    "amount": amount,
-                    "contractor": contractor_name,
-                    "inn": inn,
-                    "filename": filename,
-                    "doc_type": doc_type,
-                    "package_type": package_type,
-                    "status": status,
-                    "import_status": "Импортирован",
-                    "reasons": [],
-                }
 
-                if doc_type == "ЭДОСч":
-                    row_info["import_status"] = "Пропущен"
-                    row_info["reasons"].append(f"Тип документа: {doc_type}")
-                    skipped_type += 1
-                elif package_type == "ДокОтгрИсх":
-                    pass
+@app.get("/imports/{job_id}")
+def get_import_job(job_id: int, session: Session = Depends(get_db)):
+    progress = _active_imports.get(job_id)
+    if progress:
+        return {
+            "id": job_id,
+            "status": progress.status,
+            "rows_total": progress.rows_total,
+            "rows_processed": progress.rows_processed,
+            "rows_per_sec": _rows_per_sec(progress.rows_processed, progress.started_at),
+            "counters": dict(progress.counters),
+            "error": None,
+        }
 
-                if status != "Выполнение завершено успешно":
-                    if row_info["import_status"] == "Импортирован":
-                        row_info["import_status"] = "Пропущен"
-                    row_info["reasons"].append(
-                        f"Статус документа: '{status}' (ожидается 'Выполнение завершено успешно')"
-                    )
-                    skipped_status += 1
+    job = session.get(ImportJob, job_id)
+    if not job:
+        return {"success": False, "error": "Импорт не найден"}
+    return {
+        "id": job.id,
+        "source": job.source,
+        "filename": job.filename,
+        "status": job.status,
+        "rows_total": job.rows_total,
+        "rows_processed": job.rows_processed,
+        "rows_per_sec": _rows_per_sec(
+            job.rows_processed, job.started_at, job.finished_at
+        ),
+        "counters": json.loads(job.counters) if job.counters else {},
+        "import_id": job.import_id,
+        "error": job.error,
+    }
+
+
+@app.post("/imports/{job_id}/cancel")
+def cancel_import_job(job_id: int):
+    progress = _active_imports.get(job_id)
+    if not progress:
+        return {"success": False, "error": "Импорт не выполняется"}
+    progress.cancel_event.set()
+    return {"success": True}
+
+
+IMPORT_ROW_SORT_COLUMNS = {
+    "row": ImportRow.row_index,
+    "status": ImportRow.outcome,
+    "reasons": ImportRow.reasons,
+}
+
+
+def render_import_row(row: ImportRow) -> dict:
+    params = json.loads(row.details) if row.details else {}
+    params["expected_status"] = SBIS_SUCCESS_STATUS
+    codes = [code for code in row.reasons.split(",") if code]
+    return {
+        "row": row.row_index,
+        "outcome": row.outcome,
+        "status": IMPORT_ROW_OUTCOMES[row.outcome],
+        "reason_codes": codes,
+        "reasons": [IMPORT_ROW_REASONS[code][1].format(**params) for code in codes],
+    }
+
+
+def query_import_rows(
+    session,
+    entry: ImportFile,
+    offset: int = 0,
+    limit: int = 500,
+    status: Optional[str] = None,
+    reason: Optional[str] = None,
+    sort: Optional[str] = None,
+    desc: bool = False,
+) -> dict:
+    rows = session.query(ImportRow).filter(ImportRow.import_id == entry.id)
+    if status:
+        rows = rows.filter(ImportRow.outcome == status)
+    if reason:
+        rows = rows.filter(ImportRow.reasons.contains(f",{reason},", autoescape=True))
+
+    column = IMPORT_ROW_SORT_COLUMNS.get(sort, ImportRow.row_index)
+    offset = max(offset, 0)
+    limit = min(max(limit, 1), 5000)
+    page = (
+        rows.order_by(column.desc() if desc else column, ImportRow.row_index)
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
 
-                if not amount or amount == 0:
-                    if package_type != "ДокОтгрИсх":
-                        if row_info["import_status"] == "Импортирован":
-                            row_info["import_status"] = "Пропущен"
-                        row_info["reasons"].append("Сумма = 0 или пустая")
-                        skipped_empty += 1
-
-                if not signing_datetime:
-                    if row_info["import_status"] == "Импортирован":
-                        row_info["import_status"] = "Пропущен"
-                    row_info["reasons"].append("Дата подписания (Завершено) пустая")
-                    skipped_empty += 1
-
-                is_duplicate = False
-                if number and signing_datetime and amount and amount != 0:
-                    existing = (
-                        session.query(Act)
-                        .filter(
-                            Act.number == number,
-                            Act.signing_date == signing_datetime,
-                            Act.amount == amount,
-                        )
-                        .first()
-                    )
-                    if existing:
-                        is_duplicate = True
-
-                if is_duplicate:
-                    if row_info["import_status"] == "Импортирован":
-                        row_info["import_status"] = "Пропущен"
-
-                    normalized_name = normalize_contractor_name(contractor_name)
-                    contractor = (
-                        session.query(Contractor)
-                        .filter(Contractor.name == normalized_name)
-                        .first()
+    codes = IMPORT_SOURCE_REASONS[entry.source]
+    reason_counts = (
+        session.query(
+            *[
+                func.sum(
+                    case(
+                        (ImportRow.reasons.contains(f",{code},", autoescape=True), 1),
+                        else_=0,
                     )
+                )
+                for code in codes
+            ]
+        )
+        .filter(ImportRow.import_id == entry.id)
+        .one()
+    )
+    outcomes = dict(
+        session.query(ImportRow.outcome, func.count(ImportRow.id))
+        .filter(ImportRow.import_id == entry.id)
+        .group_by(ImportRow.outcome)
+        .all()
+    )
+    if entry.rows_added:
+        outcomes["imported"] = entry.rows_added
+
+    return {
+        "import_id": entry.id,
+        "source": entry.source,
+        "filename": entry.filename,
+        "total": rows.count(),
+        "offset": offset,
+        "limit": limit,
+        "rows": [render_import_row(row) for row in page],
+        "outcomes": outcomes,
+        "reasons": [
+            {"code": code, "label": IMPORT_ROW_REASONS[code][0], "count": count}
+            for code, count in zip(codes, reason_counts)
+            if count
+        ],
+    }
+
+
+@app.get("/import-files/{import_id}/rows")
+def get_import_file_rows(
+    import_id: int,
+    offset: int = 0,
+    limit: int = 500,
+    status: Optional[str] = None,
+    reason: Optional[str] = None,
+    sort: Optional[str] = None,
+    desc: bool = False,
+    session: Session = Depends(get_db),
+):
+    entry = session.get(ImportFile, import_id)
+    if not entry:
+        return {"success": False, "error": "Импорт не найден"}
+    return query_import_rows(session, entry, offset, limit, status, reason, sort, desc)
+
+
+@app.get("/imports/{job_id}/rows")
+def get_import_job_rows(
+    job_id: int,
+    offset: int = 0,
+    limit: int = 500,
+    status: Optional[str] = None,
+    reason: Optional[str] = None,
+    sort: Optional[str] = None,
+    desc: bool = False,
+    session: Session = Depends(get_db),
+):
+    job = session.get(ImportJob, job_id)
+    entry = session.get(ImportFile, job.import_id) if job and job.import_id else None
+    if not entry:
+        return {"success": False, "error": "Импорт не найден"}
+    return query_import_rows(session, entry, offset, limit, status, reason, sort, desc)
+
+
+def expand_import_upload(filename: str, fileobj) -> list:
+    if not (filename or "").lower().endswith(".zip"):
+        return [(filename, fileobj.read())]
+    entries = []
+    with zipfile.ZipFile(fileobj) as archive:
+        for info in archive.infolist():
+            name = info.filename
+            if info.is_dir() or name.startswith("__MACOSX/"):
+                continue
+            if not name.lower().endswith(".xlsx"):
+                continue
+            entries.append((f"{filename}/{name}", archive.read(info)))
+    return entries
 
-                    inn_updated = False
-                    if contractor and inn and inn.strip():
-                        if contractor.inn != inn.strip():
-                            contractor.inn = inn.strip()
-                            inn_updated = True
 
-                    if inn_updated:
-                        row_info["reasons"].append(
-                            "Дубликат (акт существует), ИНН контрагента обновлён"
-                        )
-                    else:
-                        row_info["reasons"].append(
-                            "Дубликат (акт с такими реквизитами уже существует)"
-                        )
-                    skipped_duplicate += 1
-
-                if row_info["import_status"] == "Импортирован":
-                    contractor = get_or_create_contractor(
-                        session, contractor_name, inn, force_update_inn=True
-                    )
+def parse_import_files(datas: list) -> list:
+    if IMPORT_PARSE_PROCESSES > 1 and len(datas) > 1:
+        executor = get_parse_executor()
+        futures = [executor.submit(parse_xlsx_bytes, data) for data in datas]
+    else:
+        futures = None
 
-                    act = Act(
-                        number=number,
-                        filename=filename,
-                        signing_date=signing_datetime,
-                        amount=amount,
-                        contractor_id=contractor.id,
-                    )
-                    session.add(act)
-                    added += 1
+    results = []
+    for i, data in enumerate(datas):
+        try:
+            if futures is not None:
+                results.append(futures[i].result())
+            else:
+                results.append(parse_xlsx_bytes(data))
+        except BrokenProcessPool as e:
+            reset_parse_executor()
+            results.append(e)
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def detect_import_source(headers) -> Optional[str]:
+    names = {str(h).strip() for h in headers if h}
+    if "Тип документа" in names:
+        return "sbis"
+    if "№ п/п" in names:
+        return "1c"
+    return None
 
-                rows_detail.append(row_info)
 
+def run_import_batch(
+    session, files: list, source: str = "auto", reimport: bool = False
+) -> dict:
+    parsed = parse_import_files([data for _, data in files])
+    batch = ImportBatch()
+    summaries = []
+    totals = {}
+    try:
+        for (filename, data), rows in zip(files, parsed):
+            if isinstance(rows, Exception):
+                summaries.append(
+                    {"filename": filename, "success": False, "error": str(rows)}
+                )
+                continue
+
+            file_source = source
+            if source == "auto":
+                file_source = detect_import_source(rows[0] if rows else ())
+            if file_source is None:
+                summaries.append(
+                    {
+                        "filename": filename,
+                        "success": False,
+                        "error": "Не удалось определить тип файла",
+                    }
+                )
+                continue
+
+            try:
+                result = run_import(
+                    session,
+                    file_source,
+                    rows,
+                    filename,
+                    batch=batch,
+                    content_hash=hashlib.sha256(data).hexdigest(),
+                    reimport=reimport,
+                )
             except Exception as e:
-                row_info = {
-                    "number": "",
-                    "date": "",
-                    "amount": None,
-                    "contractor": "",
-                    "inn": "",
-                    "filename": "",
-                    "doc_type": "",
-                    "status": "",
-                    "import_status": "Ошибка",
-                    "reasons": [f"Ошибка обработки строки: {str(e)}"],
+                session.rollback()
+                return {"error": f"{filename}: {e}"}
+            if "error" in result:
+                summaries.append(
+                    {"filename": filename, "success": False, "error": result["error"]}
+                )
+                continue
+
+            counters = {key: value for key, value in result.items() if key != "success"}
+            for key in IMPORT_COUNTERS[file_source]:
+                totals[key] = totals.get(key, 0) + counters[key]
+            summaries.append(
+                {
+                    "filename": filename,
+                    "success": True,
+                    "source": file_source,
+                    "rows": max(len(rows) - 1, 0),
+                    **counters,
                 }
-                rows_detail.append(row_info)
+            )
 
+        batch.write(session)
         session.commit()
-        os.remove(temp_path)
-
-        return {
-            "success": True,
-            "added": added,
-            "skipped_status": skipped_status,
-            "skipped_type": skipped_type,
-            "skipped_empty": skipped_empty,
-            "skipped_duplicate": skipped_duplicate,
-            "rows_detail": rows_detail,
-        }
     except Exception as e:
         session.rollback()
         return {"error": str(e)}
-    finally:
-        session.close()
+
+    return {"success": True, "files": summaries, "totals": totals}
+
+
+@app.post("/imports/batch")
+def import_batch(
+    files: List[UploadFile] = File(...),
+    source: str = Form("auto"),
+    reimport: bool = Form(False),
+    session: Session = Depends(get_db),
+):
+    if source != "auto" and source not in IMPORT_RUNNERS:
+        return {"success": False, "error": f"Неизвестный тип импорта: {source}"}
+
+    entries = []
+    try:
+        for file in files:
+            with rewind_upload(file) as spooled:
+                entries.extend(expand_import_upload(file.filename, spooled))
+    except zipfile.BadZipFile as e:
+        return {"success": False, "error": f"Некорректный ZIP-архив: {e}"}
+
+    if not entries:
+        return {"success": False, "error": "Нет файлов .xlsx для импорта"}
+    return run_import_batch(session, entries, source, reimport)
 
 
 @app.post("/invoice/update/{invoice_id}")
@@ -911,23 +2017,20 @@ def update_invoice(
     deadline: Optional[str] = Form(None),
     motivated_person: Optional[str] = Form(None),
     justification: Optional[str] = Form(None),
+    session: Session = Depends(get_db),
 ):
-    session = get_session()
-    try:
-        invoice = session.query(Invoice).filter(Invoice.id == invoice_id).first()
-        if invoice:
-            if payment_date:
-                invoice.payment_date = parse_date(payment_date)
-            if deadline:
-                invoice.deadline = parse_date(deadline)
-            if motivated_person is not None:
-                invoice.motivated_person = motivated_person
-            if justification is not None:
-                invoice.justification = justification
-            session.commit()
-        return {"success": True}
-    finally:
-        session.close()
+    invoice = session.query(Invoice).filter(Invoice.id == invoice_id).first()
+    if invoice:
+        if payment_date:
+            invoice.payment_date = parse_date(payment_date)
+        if deadline:
+            invoice.deadline = parse_date(deadline)
+        if motivated_person is not None:
+            invoice.motivated_person = motivated_person
+        if justification is not None:
+            invoice.justification = justification
+        session.commit()
+    return {"success": True}
 
 
 @app.post("/act/update/{act_id}")
@@ -936,60 +2039,50 @@ def update_act(
     responsible_manager: Optional[str] = Form(None),
     invoice_id: Optional[int] = Form(None),
     amount: Optional[float] = Form(None),
+    session: Session = Depends(get_db),
 ):
-    session = get_session()
-    try:
-        act = session.query(Act).filter(Act.id == act_id).first()
-        if act:
-            if responsible_manager is not None:
-                act.responsible_manager = responsible_manager
-            if invoice_id is not None:
-                if invoice_id == 0:
-                    act.invoice_id = None
-                else:
-                    act.invoice_id = invoice_id
-            if amount is not None:
-                if amount < 0:
-                    return {
-                        "success": False,
-                        "error": "Сумма не может быть отрицательной",
-                    }
-                act.amount = amount
-            session.commit()
-        return {"success": True}
-    finally:
-        session.close()
+    act = session.query(Act).filter(Act.id == act_id).first()
+    if act:
+        if responsible_manager is not None:
+            act.responsible_manager = responsible_manager
+        if invoice_id is not None:
+            if invoice_id == 0:
+                act.invoice_id = None
+            else:
+                act.invoice_id = invoice_id
+        if amount is not None:
+            if amount < 0:
+                return {
+                    "success": False,
+                    "error": "Сумма не может быть отрицательной",
+                }
+            act.amount = amount
+        session.commit()
+    return {"success": True}
 
 
 @app.post("/act/link/{act_id}")
-def link_act(act_id: int, invoice_id: int = Form(...)):
-    session = get_session()
-    try:
-        act = session.query(Act).filter(Act.id == act_id).first()
-        if act:
-            act.invoice_id = invoice_id
-            session.commit()
-        return RedirectResponse("/", status_code=303)
-    finally:
-        session.close()
+def link_act(
+    act_id: int, invoice_id: int = Form(...), session: Session = Depends(get_db)
+):
+    act = session.query(Act).filter(Act.id == act_id).first()
+    if act:
+        act.invoice_id = invoice_id
+        session.commit()
+    return RedirectResponse("/", status_code=303)
 
 
 @app.post("/act/unlink/{act_id}")
-def unlink_act(act_id: int):
-    session = get_session()
-    try:
-        act = session.query(Act).filter(Act.id == act_id).first()
-        if act:
-            act.invoice_id = None
-            session.commit()
-        return RedirectResponse("/", status_code=303)
-    finally:
-        session.close()
+def unlink_act(act_id: int, session: Session = Depends(get_db)):
+    act = session.query(Act).filter(Act.id == act_id).first()
+    if act:
+        act.invoice_id = None
+        session.commit()
+    return RedirectResponse("/", status_code=303)
 
 
 @app.post("/act/delete/{act_id}")
-def delete_act(act_id: int):
-    session = get_session()
+def delete_act(act_id: int, session: Session = Depends(get_db)):
     try:
         act = session.query(Act).filter(Act.id == act_id).first()
         if act:
@@ -1000,13 +2093,12 @@ def delete_act(act_id: int):
     except Exception as e:
         session.rollback()
         return {"error": str(e), "success": False}
-    finally:
-        session.close()
 
 
 @app.post("/acts/bulk-delete")
-def bulk_delete_acts(data: Dict[str, Any] = Body(...)):
-    session = get_session()
+def bulk_delete_acts(
+    data: Dict[str, Any] = Body(...), session: Session = Depends(get_db)
+):
     try:
         ids = data.get("ids", [])
         if not ids:
@@ -1024,13 +2116,10 @@ def bulk_delete_acts(data: Dict[str, Any] = Body(...)):
     except Exception as e:
         session.rollback()
         return {"error": str(e), "success": False}
-    finally:
-        session.close()
 
 
 @app.post("/invoice/delete/{invoice_id}")
-def delete_invoice(invoice_id: int):
-    session = get_session()
+def delete_invoice(invoice_id: int, session: Session = Depends(get_db)):
     try:
         invoice = session.query(Invoice).filter(Invoice.id == invoice_id).first()
         if invoice:
@@ -1041,13 +2130,12 @@ def delete_invoice(invoice_id: int):
     except Exception as e:
         session.rollback()
         return {"error": str(e), "success": False}
-    finally:
-        session.close()
 
 
 @app.post("/invoices/bulk-delete")
-def bulk_delete_invoices(data: Dict[str, Any] = Body(...)):
-    session = get_session()
+def bulk_delete_invoices(
+    data: Dict[str, Any] = Body(...), session: Session = Depends(get_db)
+):
     try:
         ids = data.get("ids", [])
         if not ids:
@@ -1065,8 +2153,97 @@ def bulk_delete_invoices(data: Dict[str, Any] = Body(...)):
     except Exception as e:
         session.rollback()
         return {"error": str(e), "success": False}
-    finally:
-        session.close()
+
+
+LIST_PAGE_MAX_LIMIT = 1000
+
+
+def encode_page_cursor(value, row_id: int) -> str:
+    if isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    raw = json.dumps([value, row_id], ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_page_cursor(cursor: str, column=None):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, row_id = json.loads(raw)
+        if value is not None and column is not None:
+            if isinstance(column.type, DateTime):
+                value = datetime.fromisoformat(value)
+            elif isinstance(column.type, Date):
+                value = date.fromisoformat(value)
+        return value, int(row_id)
+    except (ValueError, TypeError):
+        return None
+
+
+def keyset_after(column, id_column, value, row_id: int, descending: bool):
+    after_id = id_column < row_id if descending else id_column > row_id
+    if column is None:
+        return after_id
+    if isinstance(value, bool):
+        value = int(value)
+    if value is None:
+        same = and_(column.is_(None), after_id)
+        return same if descending else or_(same, column.isnot(None))
+    beyond = column < value if descending else column > value
+    condition = or_(beyond, and_(column == value, after_id))
+    return or_(condition, column.is_(None)) if descending else condition
+
+
+def keyset_page(query, column, id_column, descending: bool, limit=None, cursor=None):
+    width = len(query.column_descriptions)
+    key = id_column if column is None else column
+    query = query.add_columns(key.label("page_key"), id_column.label("page_id"))
+    if cursor:
+        decoded = decode_page_cursor(cursor, key)
+        if decoded is None:
+            return None
+        query = query.filter(keyset_after(column, id_column, *decoded, descending))
+    if column is not None:
+        query = query.order_by(column.desc() if descending else column)
+    query = query.order_by(id_column.desc() if descending else id_column)
+    if limit:
+        query = query.limit(limit + 1)
+    rows = query.all()
+    next_cursor = None
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_page_cursor(rows[-1].page_key, rows[-1].page_id)
+    items = [row[0] if width == 1 else tuple(row[:width]) for row in rows]
+    return items, next_cursor
+
+
+def page_limit(limit: Optional[int]) -> Optional[int]:
+    if limit is None:
+        return None
+    return min(max(limit, 1), LIST_PAGE_MAX_LIMIT)
+
+
+def list_page(items: list, next_cursor, total: int) -> dict:
+    return {"items": items, "next_cursor": next_cursor, "total": total}
+
+
+INVALID_CURSOR_ERROR = {"success": False, "error": "Некорректный курсор страницы"}
+
+
+def sql_date(column, fmt: str = "%d.%m.%Y"):
+    return func.coalesce(func.strftime(fmt, column), "")
+
+
+def project_rows(query, columns: dict):
+    return query.with_entities(*(expr.label(name) for name, expr in columns.items()))
+
+
+def projected_dicts(rows, columns: dict) -> list:
+    names = tuple(columns)
+    return [dict(zip(names, row)) for row in rows]
+
+
+def json_response(content) -> Response:
+    return Response(orjson.dumps(content), media_type="application/json")
 
 
 @app.get("/employees", response_class=HTMLResponse)
@@ -1075,23 +2252,32 @@ def employees_page(request: Request):
 
 
 @app.get("/employees/list")
-def list_employees():
-    session = get_session()
-    try:
-        employees = session.query(Employee).all()
-        return [
-            {
-                "id": e.id,
-                "last_name": e.last_name,
-                "first_name": e.first_name,
-                "middle_name": e.middle_name,
-                "department": e.department,
-                "position": e.position,
-            }
-            for e in employees
-        ]
-    finally:
-        session.close()
+def list_employees(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_db),
+):
+    limit = page_limit(limit)
+    query = session.query(Employee)
+    page = keyset_page(query, None, Employee.id, False, limit, cursor)
+    if page is None:
+        return INVALID_CURSOR_ERROR
+    employees, next_cursor = page
+    result = [
+        {
+            "id": e.id,
+            "last_name": e.last_name,
+            "first_name": e.first_name,
+            "middle_name": e.middle_name,
+            "department": e.department,
+            "position": e.position,
+        }
+        for e in employees
+    ]
+    if limit is None:
+        return result
+    total = query.with_entities(func.count(Employee.id)).scalar()
+    return list_page(result, next_cursor, total)
 
 
 @app.post("/employees/add")
@@ -1101,8 +2287,8 @@ def add_employee(
     middle_name: Optional[str] = Form(None),
     department: Optional[str] = Form(None),
     position: Optional[str] = Form(None),
+    session: Session = Depends(get_db),
 ):
-    session = get_session()
     try:
         existing = (
             session.query(Employee)
@@ -1129,13 +2315,10 @@ def add_employee(
     except Exception as e:
         session.rollback()
         return {"error": str(e), "success": False}
-    finally:
-        session.close()
 
 
 @app.post("/employees/delete/{employee_id}")
-def delete_employee(employee_id: int):
-    session = get_session()
+def delete_employee(employee_id: int, session: Session = Depends(get_db)):
     try:
         employee = session.query(Employee).filter(Employee.id == employee_id).first()
         if employee:
@@ -1146,13 +2329,12 @@ def delete_employee(employee_id: int):
     except Exception as e:
         session.rollback()
         return {"error": str(e), "success": False}
-    finally:
-        session.close()
 
 
 @app.post("/employees/bulk-delete")
-def bulk_delete_employees(data: Dict[str, Any] = Body(...)):
-    session = get_session()
+def bulk_delete_employees(
+    data: Dict[str, Any] = Body(...), session: Session = Depends(get_db)
+):
     try:
         ids = data.get("ids", [])
         if not ids:
@@ -1172,8 +2354,6 @@ def bulk_delete_employees(data: Dict[str, Any] = Body(...)):
     except Exception as e:
         session.rollback()
         return {"error": str(e), "success": False}
-    finally:
-        session.close()
 
 
 @app.post("/employees/update/{employee_id}")
@@ -1184,8 +2364,8 @@ def update_employee(
     middle_name: Optional[str] = Form(None),
     department: Optional[str] = Form(None),
     position: Optional[str] = Form(None),
+    session: Session = Depends(get_db),
 ):
-    session = get_session()
     try:
         employee = session.query(Employee).filter(Employee.id == employee_id).first()
 
@@ -1216,13 +2396,12 @@ def update_employee(
     except Exception as e:
         session.rollback()
         return {"error": str(e), "success": False}
-    finally:
-        session.close()
 
 
 @app.post("/employees/bulk-add")
-def bulk_add_employees(data: Dict[str, Any] = Body(...)):
-    session = get_session()
+def bulk_add_employees(
+    data: Dict[str, Any] = Body(...), session: Session = Depends(get_db)
+):
     try:
         employees_data = data.get("employees", [])
         added = 0
@@ -1264,33 +2443,27 @@ def bulk_add_employees(data: Dict[str, Any] = Body(...)):
     except Exception as e:
         session.rollback()
         return {"error": str(e), "success": False}
-    finally:
-        session.close()
 
 
 @app.get("/acts/free/{contractor_id}")
-def get_free_acts(contractor_id: int):
-    session = get_session()
-    try:
-        acts = (
-            session.query(Act)
-            .filter(Act.contractor_id == contractor_id, Act.invoice_id is None)
-            .all()
-        )
-        return [
-            {
-                "id": a.id,
-                "number": a.number,
-                "signing_date": a.signing_date.strftime("%d.%m.%Y %H:%M")
-                if a.signing_date
-                else "",
-                "amount": a.amount,
-                "responsible_manager": a.responsible_manager,
-            }
-            for a in acts
-        ]
-    finally:
-        session.close()
+def get_free_acts(contractor_id: int, session: Session = Depends(get_db)):
+    acts = (
+        session.query(Act)
+        .filter(Act.contractor_id == contractor_id, Act.invoice_id.is_(None))
+        .all()
+    )
+    return [
+        {
+            "id": a.id,
+            "number": a.number,
+            "signing_date": a.signing_date.strftime("%d.%m.%Y %H:%M")
+            if a.signing_date
+            else "",
+            "amount": a.amount,
+            "responsible_manager": a.responsible_manager,
+        }
+        for a in acts
+    ]
 
 
 @app.get("/acts/linked")
@@ -1301,84 +2474,80 @@ def get_linked_acts(
     date_to: Optional[str] = None,
     sort_by: Optional[str] = "signing_date",
     sort_dir: Optional[str] = "desc",
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_db),
 ):
-    session = get_session()
-    try:
-        query = (
-            session.query(Act)
-            .filter(Act.invoice_id.isnot(None))
-            .options(joinedload(Act.contractor), joinedload(Act.invoice))
+    limit = page_limit(limit)
+    query = session.query(Act).filter(Act.invoice_id.isnot(None))
+
+    if contractor_id == "none":
+        query = query.filter(Act.contractor_id.is_(None))
+    elif contractor_id and contractor_id.isdigit():
+        query = query.filter(Act.contractor_id == int(contractor_id))
+
+    if responsible_manager:
+        query = query.filter(Act.responsible_manager == responsible_manager)
+
+    if date_from:
+        from_date = parse_date(date_from)
+        if from_date:
+            query = query.filter(Act.signing_date >= from_date)
+
+    if date_to:
+        to_date = parse_date(date_to)
+        if to_date:
+            query = query.filter(Act.signing_date <= to_date)
+
+    sort_mapping = {
+        "signing_date": Act.signing_date,
+        "contractor_name": Contractor.name,
+        "contractor_inn": Contractor.inn,
+        "amount": Act.amount,
+        "responsible_manager": Act.responsible_manager,
+        "invoice_number": Invoice.number,
+    }
+
+    sort_column = sort_mapping.get(sort_by, Act.signing_date)
+
+    if sort_by in ["contractor_name", "contractor_inn"]:
+        query = query.join(Contractor, Act.contractor_id == Contractor.id)
+    elif sort_by == "invoice_number":
+        query = query.join(Invoice, Act.invoice_id == Invoice.id)
+
+    columns = {
+        "id": Act.id,
+        "number": Act.number,
+        "signing_date": sql_date(Act.signing_date),
+        "amount": Act.amount,
+        "contractor_id": Act.contractor_id,
+        "contractor_name": func.coalesce(Contractor.name, ""),
+        "contractor_inn": func.coalesce(Contractor.inn, ""),
+        "responsible_manager": Act.responsible_manager,
+        "invoice_id": Act.invoice_id,
+        "invoice_number": func.coalesce(Invoice.number, ""),
+        "invoice_date": sql_date(Invoice.date),
+    }
+    rows_query = project_rows(query, columns)
+    if sort_by not in ["contractor_name", "contractor_inn"]:
+        rows_query = rows_query.outerjoin(
+            Contractor, Act.contractor_id == Contractor.id
         )
+    if sort_by != "invoice_number":
+        rows_query = rows_query.outerjoin(Invoice, Act.invoice_id == Invoice.id)
 
-        if contractor_id == "none":
-            query = query.filter(Act.contractor_id.is_(None))
-        elif contractor_id and contractor_id.isdigit():
-            query = query.filter(Act.contractor_id == int(contractor_id))
-
-        if responsible_manager:
-            query = query.filter(Act.responsible_manager == responsible_manager)
-
-        if date_from:
-            from_date = parse_date(date_from)
-            if from_date:
-                query = query.filter(Act.signing_date >= from_date)
-
-        if date_to:
-            to_date = parse_date(date_to)
-            if to_date:
-                query = query.filter(Act.signing_date <= to_date)
-
-        sort_mapping = {
-            "signing_date": Act.signing_date,
-            "contractor_name": Contractor.name,
-            "contractor_inn": Contractor.inn,
-            "amount": Act.amount,
-            "responsible_manager": Act.responsible_manager,
-            "invoice_number": Invoice.number,
-        }
-
-        sort_column = sort_mapping.get(sort_by, Act.signing_date)
-
-        if sort_by in ["contractor_name", "contractor_inn"]:
-            query = query.join(Contractor, Act.contractor_id == Contractor.id)
-        elif sort_by == "invoice_number":
-            query = query.join(Invoice, Act.invoice_id == Invoice.id)
-
-        if sort_dir == "desc":
-            query = query.order_by(sort_column.desc())
-        else:
-            query = query.order_by(sort_column)
-
-        acts = query.all()
-
-        result = []
-        for act in acts:
-            contractor = act.contractor
-            invoice = act.invoice
-
-            result.append(
-                {
-                    "id": act.id,
-                    "number": act.number,
-                    "signing_date": act.signing_date.strftime("%d.%m.%Y")
-                    if act.signing_date
-                    else "",
-                    "amount": act.amount,
-                    "contractor_id": act.contractor_id,
-                    "contractor_name": contractor.name if contractor else "",
-                    "contractor_inn": contractor.inn if contractor else "",
-                    "responsible_manager": act.responsible_manager,
-                    "invoice_id": act.invoice_id,
-                    "invoice_number": invoice.number if invoice else "",
-                    "invoice_date": invoice.date.strftime("%d.%m.%Y")
-                    if invoice and invoice.date
-                    else "",
-                }
-            )
+    page = keyset_page(
+        rows_query, sort_column, Act.id, sort_dir == "desc", limit, cursor
+    )
+    if page is None:
+        return INVALID_CURSOR_ERROR
+    rows, next_cursor = page
 
-        return result
-    finally:
-        session.close()
+    result = projected_dicts(rows, columns)
+    if limit is None:
+        return json_response(result)
+    total = query.with_entities(func.count(Act.id)).scalar()
+    return json_response(list_page(result, next_cursor, total))
 
 
 @app.get("/acts/unlinked")
@@ -1389,142 +2558,99 @@ def get_unlinked_acts(
     date_to: Optional[str] = None,
     sort_by: Optional[str] = "signing_date",
     sort_dir: Optional[str] = "desc",
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_db),
 ):
-    session = get_session()
-    try:
-        query = (
-            session.query(Act)
-            .filter(Act.invoice_id.is_(None))
-            .options(joinedload(Act.contractor))
+    limit = page_limit(limit)
+    query = session.query(Act).filter(Act.invoice_id.is_(None))
+
+    if contractor_id == "none":
+        query = query.filter(Act.contractor_id.is_(None))
+    elif contractor_id and contractor_id.isdigit():
+        query = query.filter(Act.contractor_id == int(contractor_id))
+
+    if responsible_manager:
+        query = query.filter(Act.responsible_manager == responsible_manager)
+
+    if date_from:
+        from_date = parse_date(date_from)
+        if from_date:
+            query = query.filter(Act.signing_date >= from_date)
+
+    if date_to:
+        to_date = parse_date(date_to)
+        if to_date:
+            query = query.filter(Act.signing_date <= to_date)
+
+    has_available = type_coerce(
+        select(Invoice.id)
+        .where(
+            Invoice.contractor_id == Act.contractor_id,
+            Invoice.status != "Оплачен",
         )
+        .exists(),
+        Boolean,
+    )
 
-        if contractor_id == "none":
-            query = query.filter(Act.contractor_id.is_(None))
-        elif contractor_id and contractor_id.isdigit():
-            query = query.filter(Act.contractor_id == int(contractor_id))
-
-        if responsible_manager:
-            query = query.filter(Act.responsible_manager == responsible_manager)
-
-        if date_from:
-            from_date = parse_date(date_from)
-            if from_date:
-                query = query.filter(Act.signing_date >= from_date)
-
-        if date_to:
-            to_date = parse_date(date_to)
-            if to_date:
-                query = query.filter(Act.signing_date <= to_date)
-
-        sort_mapping = {
-            "signing_date": Act.signing_date,
-            "contractor_name": Contractor.name,
-            "contractor_inn": Contractor.inn,
-            "amount": Act.amount,
-            "responsible_manager": Act.responsible_manager,
-        }
-
-        sort_column = sort_mapping.get(sort_by, Act.signing_date)
-
-        if sort_by in ["contractor_name", "contractor_inn"]:
-            query = query.join(Contractor, Act.contractor_id == Contractor.id)
-
-        if sort_by == "has_available_invoices":
-            acts = query.all()
-            contractor_ids = [a.contractor_id for a in acts]
-            available_invoices = (
-                session.query(Invoice)
-                .filter(
-                    Invoice.contractor_id.in_(contractor_ids),
-                    Invoice.status != "Оплачен",
-                )
-                .all()
-            )
-            invoices_by_contractor = {}
-            for inv in available_invoices:
-                if inv.contractor_id not in invoices_by_contractor:
-                    invoices_by_contractor[inv.contractor_id] = []
-                invoices_by_contractor[inv.contractor_id].append(inv)
-
-            for act in acts:
-                act._has_available = (
-                    len(invoices_by_contractor.get(act.contractor_id, [])) > 0
-                )
-
-            acts.sort(
-                key=lambda x: getattr(x, "_has_available", False),
-                reverse=(sort_dir == "desc"),
-            )
-            result = []
-            for act in acts:
-                contractor = act.contractor
-
-                result.append(
-                    {
-                        "id": act.id,
-                        "number": act.number,
-                        "signing_date": act.signing_date.strftime("%d.%m.%Y")
-                        if act.signing_date
-                        else "",
-                        "amount": act.amount,
-                        "contractor_id": act.contractor_id,
-                        "contractor_name": contractor.name if contractor else "",
-                        "contractor_inn": contractor.inn if contractor else "",
-                        "responsible_manager": act.responsible_manager,
-                    }
-                )
-        else:
-            if sort_dir == "desc":
-                query = query.order_by(sort_column.desc())
-            else:
-                query = query.order_by(sort_column)
-
-            acts = query.all()
-
-            result = []
-            for act in acts:
-                contractor = act.contractor
+    sort_mapping = {
+        "signing_date": Act.signing_date,
+        "contractor_name": Contractor.name,
+        "contractor_inn": Contractor.inn,
+        "amount": Act.amount,
+        "responsible_manager": Act.responsible_manager,
+        "has_available_invoices": has_available,
+    }
+
+    sort_column = sort_mapping.get(sort_by, Act.signing_date)
+
+    if sort_by in ["contractor_name", "contractor_inn"]:
+        query = query.join(Contractor, Act.contractor_id == Contractor.id)
+
+    columns = {
+        "id": Act.id,
+        "number": Act.number,
+        "signing_date": sql_date(Act.signing_date),
+        "amount": Act.amount,
+        "contractor_id": Act.contractor_id,
+        "contractor_name": func.coalesce(Contractor.name, ""),
+        "contractor_inn": func.coalesce(Contractor.inn, ""),
+        "responsible_manager": Act.responsible_manager,
+        "has_available_invoices": has_available,
+    }
+    rows_query = project_rows(query, columns)
+    if sort_by not in ["contractor_name", "contractor_inn"]:
+        rows_query = rows_query.outerjoin(
+            Contractor, Act.contractor_id == Contractor.id
+        )
 
-                result.append(
-                    {
-                        "id": act.id,
-                        "number": act.number,
-                        "signing_date": act.signing_date.strftime("%d.%m.%Y")
-                        if act.signing_date
-                        else "",
-                        "amount": act.amount,
-                        "contractor_id": act.contractor_id,
-                        "contractor_name": contractor.name if contractor else "",
-                        "contractor_inn": contractor.inn if contractor else "",
-                        "responsible_manager": act.responsible_manager,
-                    }
-                )
+    page = keyset_page(
+        rows_query, sort_column, Act.id, sort_dir == "desc", limit, cursor
+    )
+    if page is None:
+        return INVALID_CURSOR_ERROR
+    rows, next_cursor = page
 
-        return result
-    finally:
-        session.close()
+    result = projected_dicts(rows, columns)
+    if limit is None:
+        return json_response(result)
+    total = query.with_entities(func.count(Act.id)).scalar()
+    return json_response(list_page(result, next_cursor, total))
 
 
 @app.get("/acts/by-invoice/{invoice_id}")
-def get_acts_by_invoice(invoice_id: int):
-    session = get_session()
-    try:
-        acts = session.query(Act).filter(Act.invoice_id == invoice_id).all()
-
-        return [
-            {
-                "id": a.id,
-                "number": a.number,
-                "signing_date": a.signing_date.strftime("%d.%m.%Y %H:%M")
-                if a.signing_date
-                else "",
-                "amount": a.amount,
-                "responsible_manager": a.responsible_manager,
-            }
-            for a in acts
-        ]
-    finally:
-        session.close()
+def get_acts_by_invoice(invoice_id: int, session: Session = Depends(get_db)):
+    columns = {
+        "id": Act.id,
+        "number": Act.number,
+        "signing_date": sql_date(Act.signing_date, "%d.%m.%Y %H:%M"),
+        "amount": Act.amount,
+        "responsible_manager": Act.responsible_manager,
+    }
+    rows = project_rows(
+        session.query(Act).filter(Act.invoice_id == invoice_id), columns
+    ).all()
+    return json_response(projected_dicts(rows, columns))
 
 
 @app.get("/contractor/add", response_class=HTMLResponse)
@@ -1533,27 +2659,26 @@ def add_contractor_page(request: Request):
 
 
 @app.get("/contractor/by-inn/{inn}")
-def get_contractor_by_inn(inn: str):
-    session = get_session()
-    try:
-        contractor = session.query(Contractor).filter(Contractor.inn == inn).first()
-        if contractor:
-            return {
-                "found": True,
-                "contractor": {
-                    "id": contractor.id,
-                    "name": contractor.name,
-                    "inn": contractor.inn,
-                },
-            }
-        return {"found": False}
-    finally:
-        session.close()
+def get_contractor_by_inn(inn: str, session: Session = Depends(get_db)):
+    contractor = session.query(Contractor).filter(Contractor.inn == inn).first()
+    if contractor:
+        return {
+            "found": True,
+            "contractor": {
+                "id": contractor.id,
+                "name": contractor.name,
+                "inn": contractor.inn,
+            },
+        }
+    return {"found": False}
 
 
 @app.post("/contractor/add")
-def add_contractor(name: str = Form(...), inn: Optional[str] = Form(None)):
-    session = get_session()
+def add_contractor(
+    name: str = Form(...),
+    inn: Optional[str] = Form(None),
+    session: Session = Depends(get_db),
+):
     try:
         normalized_name = normalize_contractor_name(name)
         existing = (
@@ -1583,32 +2708,26 @@ def add_contractor(name: str = Form(...), inn: Optional[str] = Form(None)):
     except Exception as e:
         session.rollback()
         return {"success": False, "error": str(e)}
-    finally:
-        session.close()
 
 
 @app.get("/act/add", response_class=HTMLResponse)
-def add_act_page(request: Request):
-    session = get_session()
-    try:
-        employees = session.query(Employee).order_by(Employee.last_name).all()
-        invoices = (
-            session.query(Invoice, Contractor)
-            .join(Contractor, Invoice.contractor_id == Contractor.id)
-            .order_by(Invoice.date.desc())
-            .all()
-        )
-        invoices_list = [
-            {
-                "id": inv.id,
-                "number": inv.number,
-                "date": inv.date.strftime("%d.%m.%Y") if inv.date else "",
-                "contractor_name": contractor.name,
-            }
-            for inv, contractor in invoices
-        ]
-    finally:
-        session.close()
+def add_act_page(request: Request, session: Session = Depends(get_db)):
+    employees = session.query(Employee).order_by(Employee.last_name).all()
+    invoices = (
+        session.query(Invoice, Contractor)
+        .join(Contractor, Invoice.contractor_id == Contractor.id)
+        .order_by(Invoice.date.desc())
+        .all()
+    )
+    invoices_list = [
+        {
+            "id": inv.id,
+            "number": inv.number,
+            "date": inv.date.strftime("%d.%m.%Y") if inv.date else "",
+            "contractor_name": contractor.name,
+        }
+        for inv, contractor in invoices
+    ]
     return templates.TemplateResponse(
         "act_add.html",
         {"request": request, "employees": employees, "invoices": invoices_list},
@@ -1616,25 +2735,21 @@ def add_act_page(request: Request):
 
 
 @app.get("/contractor/by-name/{name}")
-def get_contractor_by_name(name: str):
-    session = get_session()
-    try:
-        normalized_name = normalize_contractor_name(name)
-        contractor = (
-            session.query(Contractor).filter(Contractor.name == normalized_name).first()
-        )
-        if contractor:
-            return {
-                "found": True,
-                "contractor": {
-                    "id": contractor.id,
-                    "name": contractor.name,
-                    "inn": contractor.inn,
-                },
-            }
-        return {"found": False}
-    finally:
-        session.close()
+def get_contractor_by_name(name: str, session: Session = Depends(get_db)):
+    normalized_name = normalize_contractor_name(name)
+    contractor = (
+        session.query(Contractor).filter(Contractor.name == normalized_name).first()
+    )
+    if contractor:
+        return {
+            "found": True,
+            "contractor": {
+                "id": contractor.id,
+                "name": contractor.name,
+                "inn": contractor.inn,
+            },
+        }
+    return {"found": False}
 
 
 @app.post("/act/add")
@@ -1646,8 +2761,8 @@ def add_act(
     amount: Optional[str] = Form(None),
     responsible_manager: Optional[str] = Form(None),
     invoice_id: Optional[str] = Form(None),
+    session: Session = Depends(get_db),
 ):
-    session = get_session()
     try:
         contractor = None
         if contractor_name and contractor_name.strip():
@@ -1694,13 +2809,14 @@ def add_act(
     except Exception as e:
         session.rollback()
         return {"success": False, "error": f"Ошибка при добавлении акта: {str(e)}"}
-    finally:
-        session.close()
 
 
 @app.post("/contractor/update-inn/{contractor_id}")
-def update_contractor_inn(contractor_id: int, inn: Optional[str] = Form(None)):
-    session = get_session()
+def update_contractor_inn(
+    contractor_id: int,
+    inn: Optional[str] = Form(None),
+    session: Session = Depends(get_db),
+):
     try:
         contractor = (
             session.query(Contractor).filter(Contractor.id == contractor_id).first()
@@ -1713,13 +2829,12 @@ def update_contractor_inn(contractor_id: int, inn: Optional[str] = Form(None)):
     except Exception as e:
         session.rollback()
         return {"error": str(e), "success": False}
-    finally:
-        session.close()
 
 
 @app.post("/invoice/calculate-deadline/{invoice_id}")
-def calculate_deadline(invoice_id: int, days: int = Form(...)):
-    session = get_session()
+def calculate_deadline(
+    invoice_id: int, days: int = Form(...), session: Session = Depends(get_db)
+):
     try:
         invoice = session.query(Invoice).filter(Invoice.id == invoice_id).first()
 
@@ -1748,8 +2863,6 @@ def calculate_deadline(invoice_id: int, days: int = Form(...)):
     except Exception as e:
         session.rollback()
         return {"error": str(e), "success": False}
-    finally:
-        session.close()
 
 
 @app.get("/invoices/list")
@@ -1760,129 +2873,113 @@ def list_invoices_filtered(
     payment_date_to: Optional[str] = None,
     sort_by: Optional[str] = "date",
     sort_dir: Optional[str] = "desc",
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_db),
 ):
-    session = get_session()
-    try:
-        query = session.query(Invoice)
-
-        if contractor_id == "none":
-            query = query.filter(Invoice.contractor_id.is_(None))
-        elif contractor_id and contractor_id.isdigit():
-            query = query.filter(Invoice.contractor_id == int(contractor_id))
-
-        if motivated_person:
-            query = query.filter(Invoice.motivated_person == motivated_person)
-
-        if payment_date_from:
-            from_date = parse_date(payment_date_from)
-            if from_date:
-                query = query.filter(Invoice.payment_date >= from_date)
-
-        if payment_date_to:
-            to_date = parse_date(payment_date_to)
-            if to_date:
-                query = query.filter(Invoice.payment_date <= to_date)
-
-        sort_mapping = {
-            "date": Invoice.date,
-            "deadline": Invoice.deadline,
-            "contractor_name": Contractor.name,
-            "contractor_inn": Contractor.inn,
-            "responsible_import": Invoice.responsible_import,
-            "motivated_person": Invoice.motivated_person,
-            "payment_date": Invoice.payment_date,
-            "acts_count": Invoice.id,
-            "free_acts_count": Invoice.id,
-        }
-
-        sort_column = sort_mapping.get(sort_by, Invoice.deadline)
-
-        if sort_by in ["contractor_name", "contractor_inn"]:
-            query = query.join(Contractor, Invoice.contractor_id == Contractor.id)
-
-        if sort_by in ["acts_count", "free_acts_count"]:
-            invoices = query.options(joinedload(Invoice.contractor)).all()
-        elif sort_dir == "desc":
-            sort_column = sort_column.desc()
-            query = query.order_by(sort_column)
-            invoices = query.options(joinedload(Invoice.contractor)).all()
-        else:
-            query = query.order_by(sort_column)
-            invoices = query.options(joinedload(Invoice.contractor)).all()
-
-        invoice_ids = [inv.id for inv in invoices]
-        contractor_ids = [inv.contractor_id for inv in invoices]
-
-        all_linked_acts = (
-            session.query(Act).filter(Act.invoice_id.in_(invoice_ids)).all()
-            if invoice_ids
-            else []
+    limit = page_limit(limit)
+    acts_stats = (
+        session.query(
+            Act.invoice_id.label("invoice_id"),
+            func.count(Act.id).label("acts_count"),
+            func.sum(Act.amount).label("acts_sum"),
         )
-        acts_by_invoice = {}
-        for act in all_linked_acts:
-            if act.invoice_id not in acts_by_invoice:
-                acts_by_invoice[act.invoice_id] = []
-            acts_by_invoice[act.invoice_id].append(act)
-
-        all_free_acts = (
-            session.query(Act)
-            .filter(Act.contractor_id.in_(contractor_ids), Act.invoice_id is None)
-            .all()
-            if contractor_ids
-            else []
+        .filter(Act.invoice_id.isnot(None))
+        .group_by(Act.invoice_id)
+        .subquery()
+    )
+    free_acts_stats = (
+        session.query(
+            Act.contractor_id.label("contractor_id"),
+            func.count(Act.id).label("free_acts_count"),
         )
-        free_acts_by_contractor = {}
-        for act in all_free_acts:
-            if act.contractor_id not in free_acts_by_contractor:
-                free_acts_by_contractor[act.contractor_id] = []
-            free_acts_by_contractor[act.contractor_id].append(act)
-
-        result = []
-        for inv in invoices:
-            acts = acts_by_invoice.get(inv.id, [])
-            sum_acts = sum(a.amount for a in acts)
-
-            free_acts = free_acts_by_contractor.get(inv.contractor_id, [])
-            free_acts_count = len(free_acts)
-
-            contractor = inv.contractor
-
-            result.append(
-                {
-                    "id": inv.id,
-                    "number": inv.number,
-                    "date": inv.date.strftime("%d.%m.%Y") if inv.date else "",
-                    "amount": inv.amount,
-                    "contractor_id": inv.contractor_id,
-                    "contractor_name": contractor.name if contractor else "",
-                    "contractor_inn": contractor.inn if contractor else "",
-                    "justification": inv.justification or "",
-                    "payment_date": inv.payment_date.strftime("%Y-%m-%d")
-                    if inv.payment_date
-                    else "",
-                    "deadline": inv.deadline.strftime("%Y-%m-%d")
-                    if inv.deadline
-                    else "",
-                    "deadline_days": inv.deadline_days,
-                    "responsible_import": inv.responsible_import,
-                    "motivated_person": inv.motivated_person,
-                    "status": inv.status,
-                    "acts_count": len(acts),
-                    "acts_sum": sum_acts,
-                    "free_acts_count": free_acts_count,
-                }
-            )
-
-        if sort_by == "acts_count":
-            result.sort(key=lambda x: x["acts_count"], reverse=(sort_dir == "desc"))
-        elif sort_by == "free_acts_count":
-            result.sort(
-                key=lambda x: x["free_acts_count"], reverse=(sort_dir == "desc")
-            )
+        .filter(Act.invoice_id.is_(None))
+        .group_by(Act.contractor_id)
+        .subquery()
+    )
+    acts_count = func.coalesce(acts_stats.c.acts_count, 0)
+    acts_sum = func.coalesce(acts_stats.c.acts_sum, 0)
+    free_acts_count = func.coalesce(free_acts_stats.c.free_acts_count, 0)
+
+    query = session.query(Invoice)
+
+    if contractor_id == "none":
+        query = query.filter(Invoice.contractor_id.is_(None))
+    elif contractor_id and contractor_id.isdigit():
+        query = query.filter(Invoice.contractor_id == int(contractor_id))
+
+    if motivated_person:
+        query = query.filter(Invoice.motivated_person == motivated_person)
+
+    if payment_date_from:
+        from_date = parse_date(payment_date_from)
+        if from_date:
+            query = query.filter(Invoice.payment_date >= from_date)
+
+    if payment_date_to:
+        to_date = parse_date(payment_date_to)
+        if to_date:
+            query = query.filter(Invoice.payment_date <= to_date)
+
+    sort_mapping = {
+        "date": Invoice.date,
+        "deadline": Invoice.deadline,
+        "contractor_name": Contractor.name,
+        "contractor_inn": Contractor.inn,
+        "responsible_import": Invoice.responsible_import,
+        "motivated_person": Invoice.motivated_person,
+        "payment_date": Invoice.payment_date,
+        "acts_count": acts_count,
+        "free_acts_count": free_acts_count,
+    }
+
+    sort_column = sort_mapping.get(sort_by, Invoice.deadline)
+
+    if sort_by in ["contractor_name", "contractor_inn"]:
+        query = query.join(Contractor, Invoice.contractor_id == Contractor.id)
+
+    columns = {
+        "id": Invoice.id,
+        "number": Invoice.number,
+        "date": sql_date(Invoice.date),
+        "amount": Invoice.amount,
+        "contractor_id": Invoice.contractor_id,
+        "contractor_name": func.coalesce(Contractor.name, ""),
+        "contractor_inn": func.coalesce(Contractor.inn, ""),
+        "justification": func.coalesce(Invoice.justification, ""),
+        "payment_date": sql_date(Invoice.payment_date, "%Y-%m-%d"),
+        "deadline": sql_date(Invoice.deadline, "%Y-%m-%d"),
+        "deadline_days": Invoice.deadline_days,
+        "responsible_import": Invoice.responsible_import,
+        "motivated_person": Invoice.motivated_person,
+        "status": Invoice.status,
+        "acts_count": acts_count,
+        "acts_sum": acts_sum,
+        "free_acts_count": free_acts_count,
+    }
+    rows_query = project_rows(query, columns)
+    if sort_by not in ["contractor_name", "contractor_inn"]:
+        rows_query = rows_query.outerjoin(
+            Contractor, Invoice.contractor_id == Contractor.id
+        )
+    rows_query = rows_query.outerjoin(
+        acts_stats, acts_stats.c.invoice_id == Invoice.id
+    ).outerjoin(
+        free_acts_stats,
+        free_acts_stats.c.contractor_id == Invoice.contractor_id,
+    )
+    page = keyset_page(
+        rows_query, sort_column, Invoice.id, sort_dir == "desc", limit, cursor
+    )
+    if page is None:
+        return INVALID_CURSOR_ERROR
+    rows, next_cursor = page
 
-        return result
-    finally:
-        session.close()
+    result = projected_dicts(rows, columns)
+    if limit is None:
+        return json_response(result)
+    total = query.with_entities(func.count(Invoice.id)).scalar()
+    return json_response(list_page(result, next_cursor, total))
 
 
 @app.get("/contractors-list", response_class=HTMLResponse)
@@ -1891,133 +2988,203 @@ def contractors_list_page(request: Request):
 
 
 @app.get("/contractor/{contractor_id}", response_class=HTMLResponse)
-def contractor_page(request: Request, contractor_id: int):
-    session = get_session()
-    try:
-        contractor = (
-            session.query(Contractor).filter(Contractor.id == contractor_id).first()
-        )
-        if not contractor:
-            return HTMLResponse("Контрагент не найден", status_code=404)
-
-        invoices = (
-            session.query(Invoice)
-            .filter(Invoice.contractor_id == contractor_id)
-            .order_by(Invoice.date.desc())
-            .all()
-        )
+def contractor_page(
+    request: Request, contractor_id: int, session: Session = Depends(get_db)
+):
+    contractor = (
+        session.query(Contractor).filter(Contractor.id == contractor_id).first()
+    )
+    if not contractor:
+        return HTMLResponse("Контрагент не найден", status_code=404)
 
-        all_acts = (
-            session.query(Act)
-            .filter(Act.contractor_id == contractor_id)
-            .options(joinedload(Act.invoice))
-            .all()
-        )
+    invoices = (
+        session.query(Invoice)
+        .filter(Invoice.contractor_id == contractor_id)
+        .order_by(Invoice.date.desc())
+        .all()
+    )
 
-        unlinked_acts = [a for a in all_acts if a.invoice_id is None]
+    all_acts = (
+        session.query(Act)
+        .filter(Act.contractor_id == contractor_id)
+        .options(joinedload(Act.invoice))
+        .all()
+    )
 
-        invoices_data = []
-        free_acts_count = len(unlinked_acts)
-        for inv in invoices:
-            acts = [a for a in inv.acts] if inv.acts else []
-            linked_acts_sum = sum(a.amount for a in acts) if acts else 0
-            invoices_data.append(
-                {
-                    "id": inv.id,
-                    "number": inv.number,
-                    "date": inv.date.strftime("%d.%m.%Y") if inv.date else "",
-                    "amount": inv.amount,
-                    "contractor_id": inv.contractor_id,
-                    "payment_date": inv.payment_date.strftime("%Y-%m-%d")
-                    if inv.payment_date
-                    else "",
-                    "deadline": inv.deadline.strftime("%Y-%m-%d")
-                    if inv.deadline
-                    else "",
-                    "deadline_days": inv.deadline_days,
-                    "responsible_import": inv.responsible_import,
-                    "motivated_person": inv.motivated_person,
-                    "status": inv.status,
-                    "acts_count": len(acts),
-                    "acts_sum": linked_acts_sum,
-                    "free_acts_count": free_acts_count,
-                }
-            )
+    unlinked_acts = [a for a in all_acts if a.invoice_id is None]
 
-        unlinked_acts_data = []
-        for act in unlinked_acts:
-            unlinked_acts_data.append(
-                {
-                    "id": act.id,
-                    "number": act.number,
-                    "signing_date": act.signing_date.strftime("%d.%m.%Y")
-                    if act.signing_date
-                    else "",
-                    "amount": act.amount,
-                    "contractor_id": act.contractor_id,
-                    "responsible_manager": act.responsible_manager,
-                }
-            )
+    invoices_data = []
+    free_acts_count = len(unlinked_acts)
+    for inv in invoices:
+        acts = [a for a in inv.acts] if inv.acts else []
+        linked_acts_sum = sum(a.amount for a in acts) if acts else 0
+        invoices_data.append(
+            {
+                "id": inv.id,
+                "number": inv.number,
+                "date": inv.date.strftime("%d.%m.%Y") if inv.date else "",
+                "amount": inv.amount,
+                "contractor_id": inv.contractor_id,
+                "payment_date": inv.payment_date.strftime("%Y-%m-%d")
+                if inv.payment_date
+                else "",
+                "deadline": inv.deadline.strftime("%Y-%m-%d") if inv.deadline else "",
+                "deadline_days": inv.deadline_days,
+                "responsible_import": inv.responsible_import,
+                "motivated_person": inv.motivated_person,
+                "status": inv.status,
+                "acts_count": len(acts),
+                "acts_sum": linked_acts_sum,
+                "free_acts_count": free_acts_count,
+            }
+        )
 
-        return templates.TemplateResponse(
-            "contractor.html",
+    unlinked_acts_data = []
+    for act in unlinked_acts:
+        unlinked_acts_data.append(
             {
-                "request": request,
-                "contractor": contractor,
-                "invoices": invoices_data,
-                "unlinked_acts": unlinked_acts_data,
-            },
+                "id": act.id,
+                "number": act.number,
+                "signing_date": act.signing_date.strftime("%d.%m.%Y")
+                if act.signing_date
+                else "",
+                "amount": act.amount,
+                "contractor_id": act.contractor_id,
+                "responsible_manager": act.responsible_manager,
+            }
         )
-    finally:
-        session.close()
+
+    return templates.TemplateResponse(
+        "contractor.html",
+        {
+            "request": request,
+            "contractor": contractor,
+            "invoices": invoices_data,
+            "unlinked_acts": unlinked_acts_data,
+        },
+    )
 
 
 @app.get("/contractors/list")
-def list_contractors():
-    session = get_session()
-    try:
-        contractors = session.query(Contractor).all()
-        return [{"id": c.id, "name": c.name, "inn": c.inn} for c in contractors]
-    finally:
-        session.close()
+def list_contractors(session: Session = Depends(get_db)):
+    contractors = session.query(Contractor).all()
+    return [{"id": c.id, "name": c.name, "inn": c.inn} for c in contractors]
 
 
 @app.get("/contractors/list-full")
-def list_contractors_full():
-    session = get_session()
-    try:
-        contractors = (
-            session.query(Contractor)
-            .options(joinedload(Contractor.invoices), joinedload(Contractor.acts))
-            .all()
+def list_contractors_full(
+    name: Optional[str] = None,
+    inn: Optional[str] = None,
+    sort_by: Optional[str] = None,
+    sort_dir: str = "asc",
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_db),
+):
+    limit = page_limit(limit)
+    query = session.query(Contractor)
+    if name and name.strip():
+        query = query.filter(
+            Contractor.name.contains(name.strip().lower(), autoescape=True)
         )
-        result = []
-        for c in contractors:
-            invoices_count = len(c.invoices)
-            linked_acts = [a for a in c.acts if a.invoice_id is not None]
-            free_acts = [a for a in c.acts if a.invoice_id is None]
-            result.append(
-                {
-                    "id": c.id,
-                    "name": c.name,
-                    "inn": c.inn or "",
-                    "invoices_count": invoices_count,
-                    "linked_acts_count": len(linked_acts),
-                    "free_acts_count": len(free_acts),
-                }
-            )
+    if inn and inn.strip():
+        query = query.filter(
+            func.coalesce(Contractor.inn, "").contains(inn.strip(), autoescape=True)
+        )
+
+    invoices_stats = (
+        session.query(
+            Invoice.contractor_id.label("contractor_id"),
+            func.count(Invoice.id).label("invoices_count"),
+            func.sum(Invoice.amount).label("invoices_sum"),
+        )
+        .group_by(Invoice.contractor_id)
+        .subquery()
+    )
+    is_linked = Act.invoice_id.isnot(None)
+    acts_stats = (
+        session.query(
+            Act.contractor_id.label("contractor_id"),
+            func.sum(case((is_linked, 1), else_=0)).label("linked_acts_count"),
+            func.sum(case((is_linked, Act.amount))).label("linked_acts_sum"),
+            func.sum(case((is_linked, 0), else_=1)).label("free_acts_count"),
+            func.sum(case((is_linked, None), else_=Act.amount)).label("free_acts_sum"),
+        )
+        .group_by(Act.contractor_id)
+        .subquery()
+    )
+
+    invoices_count = func.coalesce(invoices_stats.c.invoices_count, 0)
+    linked_acts_count = func.coalesce(acts_stats.c.linked_acts_count, 0)
+    free_acts_count = func.coalesce(acts_stats.c.free_acts_count, 0)
+    sort_mapping = {
+        "name": Contractor.name,
+        "inn": func.coalesce(Contractor.inn, ""),
+        "invoices_count": invoices_count,
+        "linked_acts_count": linked_acts_count,
+        "free_acts_count": free_acts_count,
+    }
+
+    rows_query = (
+        query.with_entities(
+            Contractor.id,
+            Contractor.name,
+            Contractor.inn,
+            invoices_count,
+            func.coalesce(invoices_stats.c.invoices_sum, 0),
+            linked_acts_count,
+            func.coalesce(acts_stats.c.linked_acts_sum, 0),
+            free_acts_count,
+            func.coalesce(acts_stats.c.free_acts_sum, 0),
+        )
+        .outerjoin(invoices_stats, invoices_stats.c.contractor_id == Contractor.id)
+        .outerjoin(acts_stats, acts_stats.c.contractor_id == Contractor.id)
+    )
+    page = keyset_page(
+        rows_query,
+        sort_mapping.get(sort_by),
+        Contractor.id,
+        sort_dir == "desc",
+        limit,
+        cursor,
+    )
+    if page is None:
+        return INVALID_CURSOR_ERROR
+    rows, next_cursor = page
+
+    result = [
+        {
+            "id": contractor_id,
+            "name": name,
+            "inn": inn or "",
+            "invoices_count": invoices_count,
+            "invoices_sum": invoices_sum,
+            "linked_acts_count": linked_acts_count,
+            "linked_acts_sum": linked_acts_sum,
+            "free_acts_count": free_acts_count,
+            "free_acts_sum": free_acts_sum,
+        }
+        for (
+            contractor_id,
+            name,
+            inn,
+            invoices_count,
+            invoices_sum,
+            linked_acts_count,
+            linked_acts_sum,
+            free_acts_count,
+            free_acts_sum,
+        ) in rows
+    ]
+    if limit is None:
         return result
-    finally:
-        session.close()
+    total = query.with_entities(func.count(Contractor.id)).scalar()
+    return list_page(result, next_cursor, total)
 
 
 @app.get("/settings", response_class=HTMLResponse)
-def settings_page(request: Request):
-    session = get_session()
-    try:
-        settings = {s.key: s.value for s in session.query(Settings).all()}
-    finally:
-        session.close()
+def settings_page(request: Request, session: Session = Depends(get_db)):
+    settings = {s.key: s.value for s in session.query(Settings).all()}
     return templates.TemplateResponse(
         "settings.html", {"request": request, "settings": settings}
     )
@@ -2027,8 +3194,8 @@ def settings_page(request: Request):
 def save_settings(
     skip_delete_question: Optional[str] = Form(None),
     delete_action: Optional[str] = Form(None),
+    session: Session = Depends(get_db),
 ):
-    session = get_session()
     try:
         skip_value = "true" if skip_delete_question else "false"
         setting = (
@@ -2061,23 +3228,20 @@ def save_settings(
     except Exception as e:
         session.rollback()
         return {"error": str(e), "success": False}
-    finally:
-        session.close()
 
 
 @app.get("/settings/data")
-def get_settings():
-    session = get_session()
-    try:
-        settings = {s.key: s.value for s in session.query(Settings).all()}
-        return settings
-    finally:
-        session.close()
+def get_settings(session: Session = Depends(get_db)):
+    settings = {s.key: s.value for s in session.query(Settings).all()}
+    return settings
 
 
 @app.post("/contractor/delete/{contractor_id}")
-def delete_contractor(contractor_id: int, action: Optional[str] = Form(None)):
-    session = get_session()
+def delete_contractor(
+    contractor_id: int,
+    action: Optional[str] = Form(None),
+    session: Session = Depends(get_db),
+):
     try:
         contractor = (
             session.query(Contractor).filter(Contractor.id == contractor_id).first()
@@ -2105,13 +3269,12 @@ def delete_contractor(contractor_id: int, action: Optional[str] = Form(None)):
     except Exception as e:
         session.rollback()
         return {"error": str(e), "success": False}
-    finally:
-        session.close()
 
 
 @app.post("/contractors/bulk-delete")
-def bulk_delete_contractors(data: Dict[str, Any] = Body(...)):
-    session = get_session()
+def bulk_delete_contractors(
+    data: Dict[str, Any] = Body(...), session: Session = Depends(get_db)
+):
     try:
         ids = data.get("ids", [])
         if not ids:
@@ -2135,5 +3298,145 @@ def bulk_delete_contractors(data: Dict[str, Any] = Body(...)):
     except Exception as e:
         session.rollback()
         return {"error": str(e), "success": False}
-    finally:
-        session.close()
+
+
+IMPORT_WATCH_DIR = os.environ.get("IMPORT_WATCH_DIR", "")
+IMPORT_WATCH_SOURCE = os.environ.get("IMPORT_WATCH_SOURCE", "auto")
+IMPORT_WATCH_INTERVAL = float(os.environ.get("IMPORT_WATCH_INTERVAL", "5"))
+IMPORT_WATCH_SETTLE = float(os.environ.get("IMPORT_WATCH_SETTLE", "10"))
+
+
+class ImportFolderWatcher:
+    def __init__(
+        self,
+        directory: str,
+        source: str = IMPORT_WATCH_SOURCE,
+        interval: float = IMPORT_WATCH_INTERVAL,
+        settle: float = IMPORT_WATCH_SETTLE,
+    ):
+        self.directory = directory
+        self.source = source
+        self.interval = interval
+        self.settle = settle
+        self._candidates = {}
+        self._queued = {}
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def scan(self, now: Optional[float] = None) -> list:
+        now = time.monotonic() if now is None else now
+        ready = []
+        seen = set()
+        for entry in os.scandir(self.directory):
+            name = entry.name
+            if not entry.is_file() or name.startswith("~$"):
+                continue
+            if not name.lower().endswith(".xlsx"):
+                continue
+            stat = entry.stat()
+            signature = (stat.st_size, stat.st_mtime_ns)
+            seen.add(entry.path)
+            if self._queued.get(entry.path) == signature:
+                continue
+            candidate = self._candidates.get(entry.path)
+            if candidate is None or candidate[0] != signature:
+                self._candidates[entry.path] = (signature, now)
+            elif now - candidate[1] >= self.settle:
+                del self._candidates[entry.path]
+                self._queued[entry.path] = signature
+                ready.append(entry.path)
+
+        for tracked in (self._candidates, self._queued):
+            for path in [path for path in tracked if path not in seen]:
+                del tracked[path]
+        return sorted(ready)
+
+    def queue(self, path: str) -> Optional[int]:
+        filename = os.path.basename(path)
+        with open(path, "rb") as f:
+            spooled = spool_file(f)
+        session = get_session()
+        try:
+            source = self.source
+            if source == "auto":
+                rows = iter_xlsx_rows(spooled)
+                try:
+                    source = detect_import_source(next(rows, None) or ())
+                except Exception:
+                    source = None
+                finally:
+                    rows.close()
+                spooled.seek(0)
+            if source is None:
+                spooled.close()
+                session.add(
+                    ImportJob(
+                        filename=filename,
+                        status="failed",
+                        error="Не удалось определить тип файла",
+                        finished_at=datetime.now(),
+                    )
+                )
+                session.commit()
+                return None
+
+            if find_imported_file(session, source, file_content_hash(spooled)):
+                spooled.close()
+                return None
+            job_id = create_import_job(session, source, filename)
+        except Exception:
+            session.rollback()
+            spooled.close()
+            raise
+        finally:
+            session.close()
+        start_import_job(job_id, source, spooled)
+        return job_id
+
+    def poll(self) -> list:
+        job_ids = []
+        for path in self.scan():
+            try:
+                job_id = self.queue(path)
+            except Exception:
+                logger.exception("Не удалось поставить в очередь файл %s", path)
+                self._queued.pop(path, None)
+                continue
+            if job_id is not None:
+                job_ids.append(job_id)
+        return job_ids
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Не удалось проверить папку %s", self.directory)
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="import-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+_import_watcher = None
+
+
+def start_import_watcher():
+    global _import_watcher
+    if IMPORT_WATCH_DIR and _import_watcher is None:
+        _import_watcher = ImportFolderWatcher(IMPORT_WATCH_DIR)
+        _import_watcher.start()
+
+
+def stop_import_watcher():
+    global _import_watcher
+    watcher, _import_watcher = _import_watcher, None
+    if watcher is not None:
+        watcher.stop()
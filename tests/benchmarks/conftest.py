@@ -0,0 +1,47 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from src.database import Act, Contractor, Invoice
+
+
+@pytest.fixture
+def seeded(test_session, request):
+    contractors, invoices, acts = request.param
+    test_session.execute(
+        insert(Contractor.__table__),
+        [
+            {"id": i + 1, "name": f"контрагент {i}", "inn": f"77{i:08d}"}
+            for i in range(contractors)
+        ],
+    )
+    test_session.execute(
+        insert(Invoice.__table__),
+        [
+            {
+                "id": i + 1,
+                "number": f"С-{i}",
+                "date": date(2024, 1, 1) + timedelta(days=i % 365),
+                "amount": 1000 + i,
+                "contractor_id": i % contractors + 1,
+                "status": "Не оплачен",
+            }
+            for i in range(invoices)
+        ],
+    )
+    test_session.execute(
+        insert(Act.__table__),
+        [
+            {
+                "number": f"А-{i}",
+                "signing_date": datetime(2024, 1, 1) + timedelta(minutes=i),
+                "amount": 100 + i % 50,
+                "contractor_id": i % contractors + 1,
+                "invoice_id": i * invoices // acts + 1 if i % 4 else None,
+            }
+            for i in range(acts)
+        ],
+    )
+    test_session.commit()
+    return test_session
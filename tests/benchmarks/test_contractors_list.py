@@ -0,0 +1,34 @@
+import os
+import time
+
+import pytest
+
+
+BENCH_CONTRACTORS = int(os.environ.get("BENCH_CONTRACTORS", "5000"))
+BENCH_ACTS = int(os.environ.get("BENCH_CONTRACTOR_ACTS", "200000"))
+BENCH_INVOICES = BENCH_ACTS // 5
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize(
+    "seeded", [(BENCH_CONTRACTORS, BENCH_INVOICES, BENCH_ACTS)], indirect=True
+)
+class TestContractorsListBenchmark:
+    """Замеры полного списка контрагентов со счётчиками"""
+
+    def test_list_full(self, client, seeded):
+        started = time.perf_counter()
+        response = client.get("/contractors/list-full")
+        elapsed = time.perf_counter() - started
+        assert response.status_code == 200
+        data = response.json()
+        print(
+            f"\n[contractors/list-full] contractors={BENCH_CONTRACTORS} "
+            f"invoices={BENCH_INVOICES} acts={BENCH_ACTS} time={elapsed:.3f}s"
+        )
+        assert len(data) == BENCH_CONTRACTORS
+        assert sum(c["invoices_count"] for c in data) == BENCH_INVOICES
+        assert (
+            sum(c["linked_acts_count"] + c["free_acts_count"] for c in data)
+            == BENCH_ACTS
+        )
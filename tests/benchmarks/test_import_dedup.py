@@ -0,0 +1,64 @@
+import os
+import time
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from src.database import Invoice
+from src.main import load_invoice_keys
+
+
+BENCH_SIZES = [
+    int(size) for size in os.environ.get("BENCH_DEDUP_SIZES", "2000").split(",")
+]
+
+
+def _rows(count):
+    start = date(2024, 1, 1)
+    return [
+        {
+            "number": f"С-{i}",
+            "date": start + timedelta(days=i % 365),
+            "amount": float(i),
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.benchmark
+class TestDuplicateDetectionBenchmark:
+    """Сравнение проверки дубликатов: запрос на строку и множество ключей"""
+
+    @pytest.mark.parametrize("size", BENCH_SIZES)
+    def test_per_row_query_vs_key_set(self, test_session, size):
+        rows = _rows(size)
+        test_session.execute(insert(Invoice), rows)
+        test_session.flush()
+
+        started = time.perf_counter()
+        per_row = 0
+        for row in rows:
+            existing = (
+                test_session.query(Invoice.id)
+                .filter(
+                    Invoice.number == row["number"],
+                    Invoice.date == row["date"],
+                    Invoice.amount == row["amount"],
+                )
+                .first()
+            )
+            per_row += existing is not None
+        per_row_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        keys = load_invoice_keys(test_session, [row["date"] for row in rows])
+        key_set = sum(
+            (row["number"], row["date"], row["amount"]) in keys for row in rows
+        )
+        key_set_s = time.perf_counter() - started
+
+        print(
+            f"\n[dedup] rows={size} per_row={per_row_s:.3f}s key_set={key_set_s:.3f}s"
+        )
+        assert per_row == key_set == size
@@ -0,0 +1,94 @@
+import os
+import time
+
+import pytest
+
+
+BENCH_INVOICES = int(os.environ.get("BENCH_LIST_INVOICES", "2000"))
+BENCH_CONTRACTORS = max(BENCH_INVOICES // 20, 1)
+BENCH_PAGE_LIMIT = int(os.environ.get("BENCH_LIST_PAGE_LIMIT", "50"))
+
+
+def _timed(client, url, params=None):
+    started = time.perf_counter()
+    response = client.get(url, params=params)
+    elapsed = time.perf_counter() - started
+    assert response.status_code == 200
+    return response.json(), elapsed
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize(
+    "seeded", [(BENCH_CONTRACTORS, BENCH_INVOICES, BENCH_INVOICES * 3)], indirect=True
+)
+class TestListEndpointsBenchmark:
+    """Замеры списочных эндпоинтов на заполненной базе"""
+
+    @pytest.mark.parametrize("sort_by", ["date", "acts_count", "free_acts_count"])
+    def test_invoices_list(self, client, seeded, sort_by):
+        data, elapsed = _timed(
+            client, "/invoices/list", {"sort_by": sort_by, "sort_dir": "desc"}
+        )
+        print(
+            f"\n[invoices/list] invoices={BENCH_INVOICES} sort_by={sort_by} "
+            f"time={elapsed:.3f}s"
+        )
+        assert len(data) == BENCH_INVOICES
+
+    @pytest.mark.parametrize(
+        "url,sort_by",
+        [
+            ("/invoices/list", "date"),
+            ("/invoices/list", "acts_count"),
+            ("/acts/linked", "signing_date"),
+            ("/acts/unlinked", "amount"),
+            ("/acts/unlinked", "has_available_invoices"),
+            ("/contractors/list-full", None),
+        ],
+    )
+    def test_first_page(self, client, seeded, url, sort_by):
+        params = {"limit": BENCH_PAGE_LIMIT}
+        if sort_by:
+            params.update(sort_by=sort_by, sort_dir="desc")
+        page, elapsed = _timed(client, url, params)
+        _, next_elapsed = _timed(client, url, dict(params, cursor=page["next_cursor"]))
+        print(
+            f"\n[{url} limit={BENCH_PAGE_LIMIT}] invoices={BENCH_INVOICES} "
+            f"sort_by={sort_by} total={page['total']} first={elapsed:.3f}s "
+            f"next={next_elapsed:.3f}s"
+        )
+        assert len(page["items"]) == min(BENCH_PAGE_LIMIT, page["total"])
+
+    def test_unlinked_acts_has_available(self, client, seeded):
+        data, elapsed = _timed(
+            client,
+            "/acts/unlinked",
+            {"sort_by": "has_available_invoices", "sort_dir": "desc"},
+        )
+        print(
+            f"\n[acts/unlinked] acts={BENCH_INVOICES * 3} "
+            f"sort_by=has_available_invoices time={elapsed:.3f}s"
+        )
+        assert len(data) == BENCH_INVOICES * 3 // 4
+
+    @pytest.mark.parametrize(
+        "url,expected",
+        [
+            ("/acts/linked", BENCH_INVOICES * 3 - BENCH_INVOICES * 3 // 4),
+            ("/acts/unlinked", BENCH_INVOICES * 3 // 4),
+        ],
+    )
+    def test_acts_list(self, client, seeded, url, expected):
+        data, elapsed = _timed(
+            client, url, {"sort_by": "signing_date", "sort_dir": "desc"}
+        )
+        print(f"\n[{url}] acts={len(data)} time={elapsed:.3f}s")
+        assert len(data) == expected
+
+    def test_acts_by_invoice(self, client, seeded):
+        calls = min(BENCH_INVOICES, 500)
+        started = time.perf_counter()
+        for invoice_id in range(1, calls + 1):
+            assert client.get(f"/acts/by-invoice/{invoice_id}").status_code == 200
+        elapsed = time.perf_counter() - started
+        print(f"\n[acts/by-invoice] calls={calls} time={elapsed:.3f}s")
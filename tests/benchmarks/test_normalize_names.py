@@ -0,0 +1,47 @@
+import os
+import time
+
+import pytest
+
+from src.main import normalize_contractor_name, normalize_contractor_names
+
+
+BENCH_ROWS = int(os.environ.get("BENCH_NORMALIZE_ROWS", "50000"))
+BENCH_DISTINCT = int(os.environ.get("BENCH_NORMALIZE_DISTINCT", "2000"))
+
+
+def _names(rows, distinct):
+    forms = ["ООО", "АО", "ИП", "ПАО"]
+    return [
+        f'{forms[i % len(forms)]} "Контрагент {i % distinct}" (филиал)'
+        for i in range(rows)
+    ]
+
+
+@pytest.mark.benchmark
+class TestNormalizeNamesBenchmark:
+    """Замеры нормализации имён контрагентов для столбца импорта"""
+
+    def test_uncached_vs_cached_vs_batch(self):
+        names = _names(BENCH_ROWS, BENCH_DISTINCT)
+        uncached = normalize_contractor_name.__wrapped__
+
+        started = time.perf_counter()
+        expected = [uncached(name) for name in names]
+        uncached_s = time.perf_counter() - started
+
+        normalize_contractor_name.cache_clear()
+        started = time.perf_counter()
+        cached = [normalize_contractor_name(name) for name in names]
+        cached_s = time.perf_counter() - started
+
+        normalize_contractor_name.cache_clear()
+        started = time.perf_counter()
+        batch = normalize_contractor_names(names)
+        batch_s = time.perf_counter() - started
+
+        print(
+            f"\n[normalize] rows={BENCH_ROWS} distinct={BENCH_DISTINCT} "
+            f"uncached={uncached_s:.3f}s cached={cached_s:.3f}s batch={batch_s:.3f}s"
+        )
+        assert cached == batch == expected
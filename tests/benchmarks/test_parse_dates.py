@@ -0,0 +1,39 @@
+import os
+import time
+
+import pytest
+
+from src.main import parse_datetime, parse_datetime_column
+
+
+BENCH_ROWS = int(os.environ.get("BENCH_PARSE_DATES_ROWS", "50000"))
+
+
+@pytest.mark.benchmark
+class TestParseDatesBenchmark:
+    """Замеры разбора столбца «Завершено» построчно и целиком"""
+
+    @pytest.mark.parametrize(
+        "make_value",
+        [
+            lambda i: f"{i % 24:02d}:{i % 60:02d} {i % 28 + 1:02d}.03.2024",
+            lambda i: 45000 + i % 365,
+        ],
+        ids=["sbis_string", "excel_serial"],
+    )
+    def test_per_cell_vs_column(self, make_value):
+        values = [make_value(i) for i in range(BENCH_ROWS)]
+
+        started = time.perf_counter()
+        expected = [parse_datetime(value) for value in values]
+        per_cell_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        column = parse_datetime_column(values)
+        column_s = time.perf_counter() - started
+
+        print(
+            f"\n[parse_dates] rows={BENCH_ROWS} per_cell={per_cell_s:.3f}s "
+            f"column={column_s:.3f}s"
+        )
+        assert column == expected
@@ -0,0 +1,47 @@
+import os
+import time
+
+import pytest
+
+from src.main import run_import_sbis
+from tests.integration.test_api import HEADERS_SBIS, make_xlsx
+
+
+BENCH_ROWS = int(os.environ.get("BENCH_SBIS_ROWS", "2000"))
+
+
+def _rows(count):
+    return [
+        [
+            "ЭДОСч" if i % 10 == 0 else "Акт",
+            "",
+            "Выполнение завершено успешно",
+            1000 + i,
+            f"{i % 24:02d}:{i % 60:02d} {i % 28 + 1:02d}.03.2024",
+            f"А-{i}",
+            f"ООО Контрагент {i % 500}",
+            f"77{i % 500:08d}/770101001",
+            "Наша",
+            f"a{i}.xml",
+        ]
+        for i in range(count)
+    ]
+
+
+@pytest.mark.benchmark
+class TestSbisPipelineBenchmark:
+    """Замеры конвейера импорта СБИС в обоих режимах ИНН"""
+
+    @pytest.mark.parametrize("force_inn", [False, True], ids=["sbis", "force_inn"])
+    def test_import(self, test_session, force_inn):
+        buffer = make_xlsx(HEADERS_SBIS, _rows(BENCH_ROWS))
+
+        started = time.perf_counter()
+        result = run_import_sbis(test_session, buffer, force_inn=force_inn)
+        elapsed = time.perf_counter() - started
+
+        print(
+            f"\n[sbis] rows={BENCH_ROWS} force_inn={force_inn} "
+            f"time={elapsed:.3f}s rows_per_sec={BENCH_ROWS / elapsed:.0f}"
+        )
+        assert result["added"] == BENCH_ROWS - BENCH_ROWS // 10
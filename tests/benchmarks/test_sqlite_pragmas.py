@@ -0,0 +1,107 @@
+import os
+import sqlite3
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import NullPool
+
+from src.database import Base, SQLITE_PRAGMAS, apply_sqlite_pragmas
+
+
+BENCH_ROWS = int(os.environ.get("BENCH_IMPORT_ROWS", "5000"))
+
+DEFAULT_PROFILE = {"journal_mode": "DELETE", "synchronous": "FULL", "busy_timeout": "0"}
+
+
+def _make_engine(db_path, pragmas):
+    engine = create_engine(
+        f"sqlite:///{db_path}",
+        connect_args={"check_same_thread": False, "timeout": 0},
+        poolclass=NullPool,
+    )
+    event.listen(
+        engine, "connect", lambda conn, rec: apply_sqlite_pragmas(conn, pragmas)
+    )
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def _run_import_with_readers(engine, rows):
+    latencies = []
+    errors = 0
+    done = threading.Event()
+
+    def reader():
+        nonlocal errors
+        while not done.is_set():
+            started = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT COUNT(*) FROM acts")).scalar()
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                errors += 1
+            time.sleep(0.001)
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    started = time.perf_counter()
+    try:
+        with engine.begin() as conn:
+            for start in range(0, rows, 1000):
+                conn.execute(
+                    text(
+                        "INSERT INTO acts (number, filename, amount, contractor_id) "
+                        "VALUES (:number, :filename, :amount, NULL)"
+                    ),
+                    [
+                        {"number": f"A-{i}", "filename": f"f{i}.xml", "amount": i}
+                        for i in range(start, min(start + 1000, rows))
+                    ],
+                )
+    finally:
+        elapsed = time.perf_counter() - started
+        done.set()
+        thread.join()
+
+    latencies.sort()
+    return {
+        "import_s": elapsed,
+        "reads": len(latencies),
+        "read_errors": errors,
+        "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else None,
+        "max_ms": latencies[-1] * 1000 if latencies else None,
+    }
+
+
+@pytest.mark.benchmark
+class TestSqlitePragmaBenchmark:
+    """Задержка чтения во время крупного импорта: профиль по умолчанию и WAL"""
+
+    def test_reader_latency_during_import(self, tmp_path):
+        results = {}
+        for name, profile in [("default", DEFAULT_PROFILE), ("tuned", SQLITE_PRAGMAS)]:
+            engine = _make_engine(tmp_path / f"{name}.db", profile)
+            try:
+                results[name] = _run_import_with_readers(engine, BENCH_ROWS)
+            finally:
+                engine.dispose()
+
+        for name, stats in results.items():
+            print(f"\n[{name}] rows={BENCH_ROWS} {stats}")
+
+        assert results["tuned"]["read_errors"] == 0
+        assert results["tuned"]["reads"] > 0
+
+    def test_pragmas_applied_on_connect(self, tmp_path):
+        conn = sqlite3.connect(tmp_path / "pragmas.db")
+        try:
+            apply_sqlite_pragmas(conn)
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+            assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2
+        finally:
+            conn.close()
@@ -40,16 +40,16 @@ def test_session(test_engine):
 @pytest.fixture(scope="function")
 def client(test_session):
     from src.main import app
-    from src.database import get_session
+    from src.database import get_db
     from fastapi.testclient import TestClient
 
-    def override_get_session():
+    def override_get_db():
         try:
             yield test_session
         finally:
             pass
 
-    app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_db] = override_get_db
 
     with patch("src.main.get_session", return_value=test_session):
         with TestClient(app) as test_client:
@@ -3,6 +3,47 @@ from datetime import date, datetime
 import json
 
 
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+HEADERS_1C = [
+    "№ п/п",
+    "Дата",
+    "Номер",
+    "Сумма",
+    "Контрагент",
+    "Ответственный",
+    "Комментарий",
+    "Организация",
+]
+
+HEADERS_SBIS = [
+    "Тип документа",
+    "Тип пакета",
+    "Статус",
+    "Сумма",
+    "Завершено",
+    "Номер",
+    "Контрагент",
+    "ИНН/КПП",
+    "Организация",
+    "Имя файла",
+]
+
+
+def make_xlsx(headers, rows):
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws.append(headers)
+    for row in rows:
+        ws.append(row)
+    buffer = BytesIO()
+    wb.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
 class TestEmployeesAPI:
     """Интеграционные тесты для API сотрудников"""
 
@@ -229,6 +270,43 @@ class TestContractorsAPI:
         )
         assert response.status_code == 200
 
+    def test_list_contractors_full_counts(self, client, test_session):
+        from src.database import Act, Contractor, Invoice
+
+        busy = Contractor(name="счётчики", inn="7700000001")
+        empty = Contractor(name="без документов")
+        test_session.add_all([busy, empty])
+        test_session.flush()
+        first = Invoice(number="1", amount=1000, contractor_id=busy.id)
+        second = Invoice(number="2", amount=500, contractor_id=busy.id)
+        test_session.add_all([first, second])
+        test_session.flush()
+        test_session.add_all(
+            [
+                Act(number="1", amount=300, contractor_id=busy.id, invoice_id=first.id),
+                Act(number="2", amount=200, contractor_id=busy.id, invoice_id=first.id),
+                Act(number="3", amount=50, contractor_id=busy.id),
+            ]
+        )
+        test_session.commit()
+
+        contractors = {c["id"]: c for c in client.get("/contractors/list-full").json()}
+        assert contractors[busy.id] == {
+            "id": busy.id,
+            "name": "счётчики",
+            "inn": "7700000001",
+            "invoices_count": 2,
+            "invoices_sum": 1500,
+            "linked_acts_count": 2,
+            "linked_acts_sum": 500,
+            "free_acts_count": 1,
+            "free_acts_sum": 50,
+        }
+        assert contractors[empty.id]["inn"] == ""
+        assert contractors[empty.id]["invoices_count"] == 0
+        assert contractors[empty.id]["invoices_sum"] == 0
+        assert contractors[empty.id]["free_acts_count"] == 0
+
 
 class TestInvoicesAPI:
     """Интеграционные тесты для API счетов"""
@@ -259,6 +337,58 @@ class TestInvoicesAPI:
             )
             assert response.status_code == 200
 
+    def test_list_invoices_act_aggregates(self, client, test_session):
+        from src.database import Act, Contractor, Invoice
+
+        first = Contractor(name="агрегаты а")
+        second = Contractor(name="агрегаты б")
+        test_session.add_all([first, second])
+        test_session.flush()
+        inv_a = Invoice(number="A", date=date(2024, 3, 1), amount=900)
+        inv_b = Invoice(number="B", date=date(2024, 3, 2), amount=500)
+        inv_c = Invoice(number="C", date=date(2024, 3, 3), amount=100)
+        inv_a.contractor_id = inv_b.contractor_id = first.id
+        inv_c.contractor_id = second.id
+        test_session.add_all([inv_a, inv_b, inv_c])
+        test_session.flush()
+        test_session.add_all(
+            [
+                Act(
+                    number="1", amount=300, contractor_id=first.id, invoice_id=inv_a.id
+                ),
+                Act(
+                    number="2", amount=200, contractor_id=first.id, invoice_id=inv_a.id
+                ),
+                Act(
+                    number="3", amount=500, contractor_id=first.id, invoice_id=inv_b.id
+                ),
+                Act(number="4", amount=50, contractor_id=first.id),
+                Act(number="5", amount=60, contractor_id=second.id),
+                Act(number="6", amount=70, contractor_id=second.id),
+            ]
+        )
+        test_session.commit()
+
+        invoices = {inv["number"]: inv for inv in client.get("/invoices/list").json()}
+        assert invoices["A"]["acts_count"] == 2
+        assert invoices["A"]["acts_sum"] == 500
+        assert invoices["A"]["free_acts_count"] == 1
+        assert invoices["C"]["acts_count"] == 0
+        assert invoices["C"]["acts_sum"] == 0
+        assert invoices["C"]["free_acts_count"] == 2
+
+        by_acts = client.get(
+            "/invoices/list", params={"sort_by": "acts_count", "sort_dir": "desc"}
+        ).json()
+        assert [inv["number"] for inv in by_acts] == ["A", "B", "C"]
+        by_free = client.get(
+            "/invoices/list", params={"sort_by": "free_acts_count", "sort_dir": "asc"}
+        ).json()
+        assert [inv["number"] for inv in by_free] == ["A", "B", "C"]
+
+        free = client.get(f"/acts/free/{second.id}").json()
+        assert sorted(a["number"] for a in free) == ["5", "6"]
+
     def test_delete_invoice_not_found(self, client):
         response = client.post("/invoice/delete/999999")
         assert response.status_code == 200
@@ -406,6 +536,56 @@ class TestActsAPI:
         data = response.json()
         assert data.get("success") is False
 
+    def test_unlinked_acts_has_available_invoices(self, client, test_session):
+        from src.database import Act, Contractor, Invoice
+
+        unpaid = Contractor(name="есть неоплаченный")
+        paid = Contractor(name="всё оплачено")
+        test_session.add_all([unpaid, paid])
+        test_session.flush()
+        test_session.add_all(
+            [
+                Invoice(number="Н-1", contractor_id=unpaid.id, status="Частично"),
+                Invoice(number="О-1", contractor_id=paid.id, status="Оплачен"),
+                Act(number="1", amount=10, contractor_id=paid.id),
+                Act(number="2", amount=10, contractor_id=unpaid.id),
+                Act(number="3", amount=10),
+                Act(number="4", amount=10, contractor_id=unpaid.id),
+            ]
+        )
+        test_session.commit()
+
+        acts = client.get(
+            "/acts/unlinked",
+            params={"sort_by": "has_available_invoices", "sort_dir": "desc"},
+        ).json()
+        assert [a["number"] for a in acts] == ["4", "2", "3", "1"]
+        assert acts[0]["has_available_invoices"] is True
+        assert acts[1]["has_available_invoices"] is True
+        assert acts[2]["has_available_invoices"] is False
+        assert acts[3]["has_available_invoices"] is False
+
+        page = client.get(
+            "/acts/unlinked",
+            params={
+                "sort_by": "has_available_invoices",
+                "sort_dir": "asc",
+                "limit": 3,
+            },
+        ).json()
+        assert [a["has_available_invoices"] for a in page["items"]] == [
+            False,
+            False,
+            True,
+        ]
+        assert all(type(a["has_available_invoices"]) is bool for a in page["items"])
+
+        acts = client.get(
+            "/acts/unlinked",
+            params={"sort_by": "has_available_invoices", "sort_dir": "asc"},
+        ).json()
+        assert [a["number"] for a in acts] == ["1", "3", "2", "4"]
+
 
 class TestImportExcel:
     """Интеграционные тесты для импорта из Excel"""
@@ -470,6 +650,344 @@ class TestImportExcel:
         assert "error" in data
         assert "Missing column" in data["error"]
 
+    def test_import_1c_reads_request_upload(self, client, test_session, monkeypatch):
+        import tempfile
+        from src import main
+        from src.database import Employee
+
+        test_session.add(Employee(last_name="Петров", first_name="Иван"))
+        test_session.commit()
+        received = []
+        original = main.run_import
+
+        def run_import(session, source, fileobj, *args, **kwargs):
+            received.append(fileobj)
+            return original(session, source, fileobj, *args, **kwargs)
+
+        monkeypatch.setattr(main, "run_import", run_import)
+        buffer = make_xlsx(
+            HEADERS_1C,
+            [[1, "15.03.2024", "С-1", 1000, "ООО Ромашка", "Иван Петров", "", "Орг"]],
+        )
+        response = client.post(
+            "/import-1c", files={"file": ("1c.xlsx", buffer, XLSX_MIME)}
+        )
+        assert response.json()["added"] == 1
+        assert isinstance(received[0], tempfile.SpooledTemporaryFile)
+
+    def test_import_1c_success(self, client, test_session):
+        from src.database import Employee, Invoice
+
+        test_session.add(Employee(last_name="Петров", first_name="Иван"))
+        test_session.commit()
+
+        buffer = make_xlsx(
+            HEADERS_1C,
+            [
+                [1, "15.03.2024", "С-1", 1000, "ООО Ромашка", "Иван Петров", "", "Орг"],
+                [2, "16.03.2024", "С-2", 0, "ООО Ромашка", "Иван Петров", "", "Орг"],
+                [
+                    3,
+                    "17.03.2024",
+                    "С-3",
+                    500,
+                    "ООО Ромашка",
+                    "Анна Смирнова",
+                    "",
+                    "Орг",
+                ],
+            ],
+        )
+        response = client.post(
+            "/import-1c", files={"file": ("1c.xlsx", buffer, XLSX_MIME)}
+        )
+        data = response.json()
+        assert data["success"] is True
+        assert data["added"] == 1
+        assert data["skipped_zero"] == 1
+        assert data["skipped_responsible"] == 1
+        assert "rows_detail" not in data
+        page = client.get(f"/import-files/{data['import_id']}/rows").json()
+        assert page["total"] == 2
+        assert [r["row"] for r in page["rows"]] == [3, 4]
+        assert page["outcomes"] == {"imported": 1, "skipped": 2}
+        assert test_session.query(Invoice).filter_by(number="С-1").count() == 1
+
+        buffer.seek(0)
+        response = client.post(
+            "/import-1c",
+            data={"reimport": "true"},
+            files={"file": ("1c.xlsx", buffer, XLSX_MIME)},
+        )
+        data = response.json()
+        assert data["added"] == 0
+        assert data["skipped_duplicate"] == 1
+
+    def test_import_1c_duplicate_within_file(self, client, test_session):
+        from src.database import Employee, Invoice
+
+        test_session.add(Employee(last_name="Петров", first_name="Иван"))
+        test_session.commit()
+
+        row = ["15.03.2024", "С-1", 1000, "ООО Ромашка", "Иван Петров", "", "Орг"]
+        buffer = make_xlsx(HEADERS_1C, [[1] + row, [2] + row])
+        response = client.post(
+            "/import-1c", files={"file": ("1c.xlsx", buffer, XLSX_MIME)}
+        )
+        data = response.json()
+        assert data["added"] == 1
+        assert data["skipped_duplicate"] == 1
+        assert test_session.query(Invoice).filter_by(number="С-1").count() == 1
+
+    def test_import_1c_reimport_dateless_row(self, client, test_session):
+        from src.database import Employee, Invoice
+
+        test_session.add(Employee(last_name="Петров", first_name="Иван"))
+        test_session.commit()
+
+        row = [1, None, "С-7", 1000, "ООО Ромашка", "Иван Петров", "", "Орг"]
+        for reimport, added in [("false", 1), ("true", 0)]:
+            response = client.post(
+                "/import-1c",
+                data={"reimport": reimport},
+                files={"file": ("1c.xlsx", make_xlsx(HEADERS_1C, [row]), XLSX_MIME)},
+            )
+            data = response.json()
+            assert data["added"] == added
+        assert data["skipped_duplicate"] == 1
+        assert test_session.query(Invoice).filter_by(number="С-7").count() == 1
+
+    def test_import_1c_parses_file_once(self, client, test_session, monkeypatch):
+        from src import main
+        from src.database import Employee, Invoice
+
+        test_session.add(Employee(last_name="Петров", first_name="Иван"))
+        test_session.commit()
+
+        loads = []
+        original = main.load_workbook
+
+        def counting(*args, **kwargs):
+            loads.append(args)
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(main, "load_workbook", counting)
+        rows = [
+            [i, "15.03.2024", f"С-{i}", 100 + i, "ООО А", "Иван Петров", "", "О"]
+            for i in range(1, 4)
+        ]
+        response = client.post(
+            "/import-1c",
+            files={"file": ("1c.xlsx", make_xlsx(HEADERS_1C, rows), XLSX_MIME)},
+        )
+        assert response.json()["added"] == 3
+        assert len(loads) == 1
+        assert test_session.query(Invoice).count() == 3
+
+    def test_import_1c_duplicates_across_key_chunks(
+        self, client, test_session, monkeypatch
+    ):
+        from src import main
+        from src.database import Employee, Invoice
+
+        test_session.add(Employee(last_name="Петров", first_name="Иван"))
+        test_session.commit()
+        monkeypatch.setattr(main, "IMPORT_KEYS_CHUNK_SIZE", 2)
+
+        def row(i, day, number):
+            date = f"{day:02d}.03.2024"
+            return [i, date, number, 100, "ООО А", "Иван Петров", "", "О"]
+
+        first = [row(1, 1, "С-1"), row(2, 20, "С-2"), row(3, 5, "С-3")]
+        client.post(
+            "/import-1c",
+            files={"file": ("a.xlsx", make_xlsx(HEADERS_1C, first), XLSX_MIME)},
+        )
+        second = [
+            row(1, 10, "С-4"),
+            row(2, 11, "С-5"),
+            row(3, 20, "С-2"),
+            row(4, 1, "С-1"),
+            row(5, 10, "С-4"),
+        ]
+        data = client.post(
+            "/import-1c",
+            files={"file": ("b.xlsx", make_xlsx(HEADERS_1C, second), XLSX_MIME)},
+        ).json()
+        assert data["added"] == 2
+        assert data["skipped_duplicate"] == 3
+        assert test_session.query(Invoice).count() == 5
+
+    def test_import_1c_stop_words_and_comment_surname(
+        self, client, test_session, monkeypatch
+    ):
+        import src.main as main
+        from src.database import Employee, StopWord
+
+        monkeypatch.setattr(main, "IMPORT_ROWS_STORE_IMPORTED", True)
+        test_session.add(Employee(last_name="Петров", first_name="Иван"))
+        test_session.add_all([StopWord(word="тест"), StopWord(word="тестовый")])
+        test_session.commit()
+
+        buffer = make_xlsx(
+            HEADERS_1C,
+            [
+                [
+                    1,
+                    "15.03.2024",
+                    "С-1",
+                    100,
+                    "ООО А",
+                    "Анна Смирнова",
+                    "для Петрова",
+                    "О",
+                ],
+                [2, "15.03.2024", "С-2", 200, "ООО А", "Иван Петров", "Тестовый", "О"],
+            ],
+        )
+        response = client.post(
+            "/import-1c", files={"file": ("1c.xlsx", buffer, XLSX_MIME)}
+        )
+        data = response.json()
+        assert data["added"] == 1
+        assert data["skipped_stopwords"] == 1
+        rows = client.get(f"/import-files/{data['import_id']}/rows").json()["rows"]
+        assert "петров" in rows[0]["reasons"][0]
+        assert "Найдены стоп-слова: тест, тестовый" in rows[1]["reasons"]
+
+    def test_import_sbis_missing_signing_date_column(self, client, test_session):
+        from src.database import Act, ImportFile
+
+        headers = [h for h in HEADERS_SBIS if h != "Завершено"]
+        row = ["Акт", "", "Выполнение завершено успешно", 500, "А-1", "ООО А", "", "Н"]
+        response = client.post(
+            "/import-sbis",
+            files={
+                "file": ("s.xlsx", make_xlsx(headers, [row + ["a.xml"]]), XLSX_MIME)
+            },
+        )
+        data = response.json()
+        assert data == {"error": "Missing column: Завершено"}
+        assert test_session.query(Act).count() == 0
+        assert test_session.query(ImportFile).count() == 0
+
+    def test_import_sbis_success(self, client, test_session):
+        from src.database import Act, Contractor
+
+        ok = "Выполнение завершено успешно"
+        buffer = make_xlsx(
+            HEADERS_SBIS,
+            [
+                [
+                    "Акт",
+                    "",
+                    ok,
+                    1000,
+                    "10:15 20.03.2024",
+                    "А-1",
+                    "ООО Ромашка",
+                    "7701234567/770101001",
+                    "Наша",
+                    "a1.xml",
+                ],
+                [
+                    "ЭДОСч",
+                    "",
+                    ok,
+                    1000,
+                    "10:15 20.03.2024",
+                    "А-2",
+                    "ООО Ромашка",
+                    "",
+                    "Наша",
+                    "a2.xml",
+                ],
+                [
+                    "Акт",
+                    "ДокОтгрИсх",
+                    ok,
+                    0,
+                    "11:00 21.03.2024",
+                    "А-3",
+                    "ООО Ромашка",
+                    "",
+                    "Наша",
+                    "a3.xml",
+                ],
+                [
+                    "Акт",
+                    "",
+                    "Отклонён",
+                    700,
+                    "11:00 21.03.2024",
+                    "А-4",
+                    "ООО Ромашка",
+                    "",
+                    "Наша",
+                    "a4.xml",
+                ],
+            ],
+        )
+        response = client.post(
+            "/import-sbis", files={"file": ("sbis.xlsx", buffer, XLSX_MIME)}
+        )
+        data = response.json()
+        assert data["success"] is True
+        assert data["added"] == 2
+        assert data["skipped_type"] == 1
+        assert data["skipped_status"] == 1
+        act = test_session.query(Act).filter_by(number="А-1").one()
+        assert act.signing_date == datetime(2024, 3, 20, 10, 15)
+        contractor = (
+            test_session.query(Contractor).filter_by(id=act.contractor_id).one()
+        )
+        assert contractor.inn == "7701234567"
+
+        buffer.seek(0)
+        response = client.post(
+            "/import-sbis",
+            data={"reimport": "true"},
+            files={"file": ("sbis.xlsx", buffer, XLSX_MIME)},
+        )
+        assert response.json()["skipped_duplicate"] == 1
+
+    def test_import_sbis_force_inn_updates_duplicate_contractor(
+        self, client, test_session
+    ):
+        from src.database import Contractor
+
+        ok = "Выполнение завершено успешно"
+        row = [
+            "Акт",
+            "",
+            ok,
+            1000,
+            "10:15 20.03.2024",
+            "А-1",
+            "ООО Ромашка",
+            "7701234567/770101001",
+            "Наша",
+            "a1.xml",
+        ]
+        client.post(
+            "/import-sbis-force-inn",
+            files={"file": ("sbis.xlsx", make_xlsx(HEADERS_SBIS, [row]), XLSX_MIME)},
+        )
+
+        row[7] = "7709999999/770901001"
+        response = client.post(
+            "/import-sbis-force-inn",
+            files={"file": ("sbis.xlsx", make_xlsx(HEADERS_SBIS, [row]), XLSX_MIME)},
+        )
+        data = response.json()
+        assert data["skipped_duplicate"] == 1
+        rows = client.get(f"/import-files/{data['import_id']}/rows").json()["rows"]
+        assert "ИНН контрагента обновлён" in rows[0]["reasons"][0]
+        assert rows[0]["reason_codes"] == ["duplicate_act_inn_updated"]
+        contractor = test_session.query(Contractor).one()
+        test_session.refresh(contractor)
+        assert contractor.inn == "7709999999"
+
 
 class TestBusinessLogic:
     """Тесты бизнес-логики"""
@@ -566,3 +1084,819 @@ class TestBusinessLogic:
 
         response = client.get(f"/contractor/{contractor.id}")
         assert response.status_code == 200
+
+
+class TestImportLedger:
+    """Интеграционные тесты для журнала загруженных файлов"""
+
+    def _file_sbis(self, rows):
+        return make_xlsx(
+            HEADERS_SBIS,
+            [
+                [
+                    "Акт",
+                    "",
+                    "Выполнение завершено успешно",
+                    500,
+                    signed,
+                    number,
+                    "ООО А",
+                    "",
+                    "Наша",
+                    f"{number}.xml",
+                ]
+                for number, signed in rows
+            ],
+        )
+
+    def test_identical_file_short_circuits(self, client, test_session):
+        from src.database import ImportFile
+
+        content = self._file_sbis(
+            [("А-1", "10:15 20.03.2024"), ("А-2", "10:15 25.03.2024")]
+        ).getvalue()
+        first = client.post(
+            "/import-sbis", files={"file": ("a.xlsx", BytesIO(content), XLSX_MIME)}
+        ).json()
+        assert first["added"] == 2
+        assert first["overlaps"] == []
+
+        entry = test_session.query(ImportFile).one()
+        assert entry.source == "sbis"
+        assert entry.filename == "a.xlsx"
+        assert entry.rows_total == 2
+        assert entry.rows_added == 2
+        assert entry.date_from == datetime(2024, 3, 20, 10, 15)
+        assert entry.date_to == datetime(2024, 3, 25, 10, 15)
+
+        second = client.post(
+            "/import-sbis", files={"file": ("b.xlsx", BytesIO(content), XLSX_MIME)}
+        ).json()
+        assert second["already_imported"] is True
+        assert second["added"] == 0
+        assert second["skipped_duplicate"] == 2
+        assert second["import_id"] == first["import_id"]
+        assert test_session.query(ImportFile).count() == 1
+
+    def test_same_file_other_source_not_short_circuited(self, client, test_session):
+        content = self._file_sbis([("А-1", "10:15 20.03.2024")]).getvalue()
+        client.post(
+            "/import-sbis", files={"file": ("a.xlsx", BytesIO(content), XLSX_MIME)}
+        )
+        data = client.post(
+            "/import-sbis-force-inn",
+            files={"file": ("a.xlsx", BytesIO(content), XLSX_MIME)},
+        ).json()
+        assert "already_imported" not in data
+        assert data["skipped_duplicate"] == 1
+
+    def test_overlapping_file_reported(self, client, test_session):
+        client.post(
+            "/import-sbis",
+            files={
+                "file": (
+                    "march.xlsx",
+                    self._file_sbis([("А-1", "10:15 20.03.2024")]),
+                    XLSX_MIME,
+                )
+            },
+        )
+        client.post(
+            "/import-sbis",
+            files={
+                "file": (
+                    "may.xlsx",
+                    self._file_sbis([("А-9", "10:15 20.05.2024")]),
+                    XLSX_MIME,
+                )
+            },
+        )
+        data = client.post(
+            "/import-sbis",
+            files={
+                "file": (
+                    "march-april.xlsx",
+                    self._file_sbis(
+                        [("А-1", "10:15 20.03.2024"), ("А-2", "10:15 10.04.2024")]
+                    ),
+                    XLSX_MIME,
+                )
+            },
+        ).json()
+        assert data["added"] == 1
+        assert [o["filename"] for o in data["overlaps"]] == ["march.xlsx"]
+        assert data["overlaps"][0]["date_from"] == "20.03.2024"
+
+    def test_identical_file_in_batch(self, client, test_session):
+        content = self._file_sbis([("А-1", "10:15 20.03.2024")]).getvalue()
+        data = client.post(
+            "/imports/batch",
+            files=[
+                ("files", ("a.xlsx", BytesIO(content), XLSX_MIME)),
+                ("files", ("copy.xlsx", BytesIO(content), XLSX_MIME)),
+            ],
+        ).json()
+        assert [f.get("already_imported", False) for f in data["files"]] == [
+            False,
+            True,
+        ]
+        assert data["totals"]["added"] == 1
+
+
+class TestImportRowsReport:
+    """Интеграционные тесты для постраничного отчёта о строках импорта"""
+
+    def _import_sbis(self, client):
+        ok = "Выполнение завершено успешно"
+        rows = [
+            ["Акт", "", ok, 500, "10:15 20.03.2024", "А-1", "ООО Ромашка", "", "Н", ""],
+            ["ЭДОСч", "", ok, 500, "10:15 21.03.2024", "А-2", "ООО Лютик", "", "Н", ""],
+            [
+                "Акт",
+                "",
+                "Ошибка",
+                700,
+                "10:15 22.03.2024",
+                "А-3",
+                "ИП Иванов",
+                "",
+                "Н",
+                "",
+            ],
+            ["Акт", "", ok, 0, "10:15 23.03.2024", "А-4", "ООО Ромашка", "", "Н", ""],
+        ]
+        response = client.post(
+            "/import-sbis",
+            files={"file": ("s.xlsx", make_xlsx(HEADERS_SBIS, rows), XLSX_MIME)},
+        )
+        return response.json()
+
+    def test_response_has_counters_only(self, client):
+        data = self._import_sbis(client)
+        assert data["added"] == 1
+        assert data["skipped_type"] == 1
+        assert "rows_detail" not in data
+        assert isinstance(data["import_id"], int)
+
+    def test_rows_rendered_from_reason_codes(self, client):
+        data = self._import_sbis(client)
+        page = client.get(f"/import-files/{data['import_id']}/rows").json()
+
+        assert page["total"] == 3
+        assert [r["row"] for r in page["rows"]] == [3, 4, 5]
+        assert page["rows"][0]["status"] == "Пропущен"
+        assert page["rows"][0]["reasons"] == ["Тип документа: ЭДОСч"]
+        assert page["rows"][1]["reasons"] == [
+            "Статус документа: 'Ошибка' (ожидается 'Выполнение завершено успешно')"
+        ]
+        assert page["rows"][2]["reason_codes"] == ["zero_amount"]
+        assert page["outcomes"] == {"imported": 1, "skipped": 3}
+        assert {r["code"]: r["count"] for r in page["reasons"]} == {
+            "doc_type": 1,
+            "doc_status": 1,
+            "zero_amount": 1,
+        }
+
+    def test_stores_only_render_values(self, client, test_session):
+        from src.database import ImportRow
+
+        self._import_sbis(client)
+        rows = test_session.query(ImportRow).order_by(ImportRow.row_index).all()
+        assert [r.details for r in rows] == [
+            '{"doc_type": "ЭДОСч"}',
+            '{"doc_status": "Ошибка"}',
+            None,
+        ]
+
+    def test_imported_rows_stored_when_enabled(self, client, monkeypatch):
+        import src.main as main
+
+        monkeypatch.setattr(main, "IMPORT_ROWS_STORE_IMPORTED", True)
+        data = self._import_sbis(client)
+        url = f"/import-files/{data['import_id']}/rows"
+        page = client.get(url, params={"status": "imported"}).json()
+        assert page["total"] == 1
+        assert page["rows"][0]["row"] == 2
+        assert page["rows"][0]["status"] == "Импортирован"
+
+    def test_rows_of_old_imports_pruned(self, client, test_session, monkeypatch):
+        import src.main as main
+        from src.database import ImportRow
+
+        monkeypatch.setattr(main, "IMPORT_ROWS_KEEP_IMPORTS", 1)
+        first = self._import_sbis(client)
+        rows = [["ЭДОСч", "", "", 1, "10:15 20.03.2024", "Б-1", "ООО Б", "", "Н", ""]]
+        second = client.post(
+            "/import-sbis",
+            files={"file": ("b.xlsx", make_xlsx(HEADERS_SBIS, rows), XLSX_MIME)},
+        ).json()
+
+        assert {r.import_id for r in test_session.query(ImportRow)} == {
+            second["import_id"]
+        }
+        page = client.get(f"/import-files/{first['import_id']}/rows").json()
+        assert page["total"] == 0
+        assert page["outcomes"] == {"imported": 1}
+
+    def test_filters_and_sort(self, client):
+        data = self._import_sbis(client)
+        url = f"/import-files/{data['import_id']}/rows"
+
+        skipped = client.get(url, params={"status": "skipped"}).json()
+        assert [r["row"] for r in skipped["rows"]] == [3, 4, 5]
+
+        by_reason = client.get(url, params={"reason": "doc_status"}).json()
+        assert by_reason["total"] == 1
+        assert by_reason["rows"][0]["row"] == 4
+
+        by_reasons = client.get(
+            url, params={"sort": "reasons", "desc": "true", "limit": 2}
+        ).json()
+        assert by_reasons["total"] == 3
+        assert [r["row"] for r in by_reasons["rows"]] == [5, 3]
+
+    def test_row_errors_recorded(self, client):
+        row = ["Акт", "", "", 500, "10:15 20.03.2024", "А-1", "ООО А", "", "Н"]
+        data = client.post(
+            "/import-sbis",
+            files={"file": ("s.xlsx", make_xlsx(HEADERS_SBIS[:-1], [row]), XLSX_MIME)},
+        ).json()
+        page = client.get(
+            f"/import-files/{data['import_id']}/rows", params={"status": "error"}
+        ).json()
+        assert page["total"] == 1
+        assert page["rows"][0]["row"] == 2
+        assert page["rows"][0]["status"] == "Ошибка"
+        assert page["rows"][0]["reasons"] == ["Ошибка обработки строки: 'Имя файла'"]
+
+    def test_import_not_found(self, client):
+        assert client.get("/import-files/999999/rows").json()["success"] is False
+
+
+class TestImportCheckpoints:
+    """Интеграционные тесты для импорта с фиксацией по частям"""
+
+    def _file(self, session, rows):
+        from src.database import Employee
+
+        session.add(Employee(last_name="Петров", first_name="Иван"))
+        session.commit()
+        return make_xlsx(
+            HEADERS_1C,
+            [
+                [i, "15.03.2024", f"С-{i}", 100 + i, "ООО А", "Иван Петров", "", "О"]
+                for i in range(1, rows + 1)
+            ],
+        )
+
+    def _interrupt_at(self, row):
+        from src.main import ImportCancelled, ImportProgress
+
+        class InterruptedProgress(ImportProgress):
+            def tick(self, counters):
+                if self.rows_processed == row:
+                    raise ImportCancelled()
+                super().tick(counters)
+
+        return InterruptedProgress(0)
+
+    def test_chunked_import_completes(self, session_stub, monkeypatch):
+        import src.main as main
+        from src.database import ImportFile, ImportRow, Invoice
+        from src.main import run_import
+
+        monkeypatch.setattr(main, "IMPORT_ROWS_STORE_IMPORTED", True)
+        buffer = self._file(session_stub, 5)
+        result = run_import(session_stub, "1c", buffer, "1c.xlsx", chunk_size=2)
+
+        assert result["added"] == 5
+        assert "resumed_from" not in result
+        entry = session_stub.query(ImportFile).one()
+        assert entry.checkpoint_row is None
+        assert entry.rows_added == 5
+        assert session_stub.query(Invoice).count() == 5
+        assert session_stub.query(ImportRow).count() == 5
+
+    def test_interrupted_import_resumes_from_checkpoint(
+        self, session_stub, monkeypatch
+    ):
+        import pytest
+        import src.main as main
+        from src.database import ImportFile, ImportRow, Invoice
+        from src.main import ImportCancelled, ImportProgress, run_import
+
+        monkeypatch.setattr(main, "IMPORT_ROWS_STORE_IMPORTED", True)
+        buffer = self._file(session_stub, 7)
+        with pytest.raises(ImportCancelled):
+            run_import(
+                session_stub,
+                "1c",
+                buffer,
+                "1c.xlsx",
+                progress=self._interrupt_at(5),
+                chunk_size=2,
+            )
+
+        entry = session_stub.query(ImportFile).one()
+        entry_id = entry.id
+        assert entry.checkpoint_row == 4
+        assert session_stub.query(Invoice).count() == 4
+
+        buffer.seek(0)
+        progress = ImportProgress(0)
+        result = run_import(
+            session_stub, "1c", buffer, "1c.xlsx", progress=progress, chunk_size=2
+        )
+        assert result["resumed_from"] == 4
+        assert progress.rows_total == 3
+        assert progress.rows_processed == 3
+        assert result["added"] == 7
+        assert result["skipped_duplicate"] == 0
+        assert result["import_id"] == entry_id
+
+        entry = session_stub.get(ImportFile, entry_id)
+        assert entry.checkpoint_row is None
+        assert entry.rows_added == 7
+        assert session_stub.query(Invoice).count() == 7
+        rows = session_stub.query(ImportRow).order_by(ImportRow.row_index).all()
+        assert [r.row_index for r in rows] == list(range(2, 9))
+
+    def test_partial_import_not_short_circuited(self, session_stub):
+        import pytest
+        from src.main import ImportCancelled, run_import
+
+        buffer = self._file(session_stub, 3)
+        with pytest.raises(ImportCancelled):
+            run_import(
+                session_stub,
+                "1c",
+                buffer,
+                "1c.xlsx",
+                progress=self._interrupt_at(2),
+                chunk_size=1,
+            )
+
+        buffer.seek(0)
+        result = run_import(session_stub, "1c", buffer, "1c.xlsx")
+        assert "already_imported" not in result
+        assert result["resumed_from"] == 2
+        assert result["added"] == 3
+
+
+class TestBatchImport:
+    """Интеграционные тесты для пакетного импорта"""
+
+    def _rpo(self, test_session):
+        from src.database import Employee
+
+        test_session.add(Employee(last_name="Петров", first_name="Иван"))
+        test_session.commit()
+
+    def _file_1c(self, numbers):
+        return make_xlsx(
+            HEADERS_1C,
+            [
+                [i, "15.03.2024", number, 100, "ООО А", "Иван Петров", "", "О"]
+                for i, number in enumerate(numbers, 1)
+            ],
+        )
+
+    def _file_sbis(self, numbers):
+        return make_xlsx(
+            HEADERS_SBIS,
+            [
+                [
+                    "Акт",
+                    "",
+                    "Выполнение завершено успешно",
+                    500,
+                    "10:15 20.03.2024",
+                    number,
+                    "ООО А",
+                    "7701234567/770101001",
+                    "Наша",
+                    f"{number}.xml",
+                ]
+                for number in numbers
+            ],
+        )
+
+    def test_multiple_files_deduplicated_across_batch(self, client, test_session):
+        from src.database import Act, Contractor, Invoice
+
+        self._rpo(test_session)
+        response = client.post(
+            "/imports/batch",
+            files=[
+                ("files", ("a.xlsx", self._file_1c(["С-1", "С-2"]), XLSX_MIME)),
+                ("files", ("b.xlsx", self._file_1c(["С-2", "С-3"]), XLSX_MIME)),
+                ("files", ("c.xlsx", self._file_sbis(["А-1"]), XLSX_MIME)),
+            ],
+        )
+        data = response.json()
+        assert data["success"] is True
+        assert [f["source"] for f in data["files"]] == ["1c", "1c", "sbis"]
+        assert [f["added"] for f in data["files"]] == [2, 1, 1]
+        assert data["files"][1]["skipped_duplicate"] == 1
+        assert data["totals"]["added"] == 4
+        assert test_session.query(Invoice).count() == 3
+        assert test_session.query(Act).count() == 1
+        assert test_session.query(Contractor).count() == 1
+
+    def test_zip_archive(self, client, test_session):
+        import zipfile
+        from src.database import Invoice
+
+        self._rpo(test_session)
+        archive = BytesIO()
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("march/1c.xlsx", self._file_1c(["С-1"]).getvalue())
+            zf.writestr("march/readme.txt", "skip me")
+            zf.writestr("__MACOSX/march/._1c.xlsx", "junk")
+        archive.seek(0)
+
+        response = client.post(
+            "/imports/batch",
+            files=[("files", ("month.zip", archive, "application/zip"))],
+        )
+        data = response.json()
+        assert [f["filename"] for f in data["files"]] == ["month.zip/march/1c.xlsx"]
+        assert test_session.query(Invoice).count() == 1
+
+    def test_file_error_aborts_whole_batch(self, client, test_session):
+        from src.database import ImportFile, ImportRow, Invoice
+
+        self._rpo(test_session)
+        broken = make_xlsx(HEADERS_1C + [5], [[1, "15.03.2024", "С-9", 100]])
+        response = client.post(
+            "/imports/batch",
+            files=[
+                ("files", ("ok.xlsx", self._file_1c(["С-1"]), XLSX_MIME)),
+                ("files", ("broken.xlsx", broken, XLSX_MIME)),
+            ],
+        )
+        data = response.json()
+        assert "success" not in data
+        assert data["error"].startswith("broken.xlsx: ")
+        assert test_session.query(Invoice).count() == 0
+        assert test_session.query(ImportFile).count() == 0
+        assert test_session.query(ImportRow).count() == 0
+
+        response = client.post(
+            "/imports/batch",
+            files=[("files", ("ok.xlsx", self._file_1c(["С-1"]), XLSX_MIME))],
+        )
+        data = response.json()
+        assert data["files"][0]["added"] == 1
+        assert test_session.get(ImportFile, data["files"][0]["import_id"])
+        assert test_session.query(Invoice).count() == 1
+
+    def test_bad_file_reported_without_blocking_others(self, client, test_session):
+        from src.database import Invoice
+
+        self._rpo(test_session)
+        response = client.post(
+            "/imports/batch",
+            files=[
+                ("files", ("bad.xlsx", BytesIO(b"not excel"), XLSX_MIME)),
+                ("files", ("other.xlsx", make_xlsx(["A", "B"], [[1, 2]]), XLSX_MIME)),
+                ("files", ("ok.xlsx", self._file_1c(["С-1"]), XLSX_MIME)),
+            ],
+        )
+        files = response.json()["files"]
+        assert [f["success"] for f in files] == [False, False, True]
+        assert files[1]["error"] == "Не удалось определить тип файла"
+        assert test_session.query(Invoice).count() == 1
+
+    def test_explicit_source(self, client, test_session):
+        response = client.post(
+            "/imports/batch",
+            data={"source": "sbis-force-inn"},
+            files=[("files", ("c.xlsx", self._file_sbis(["А-1"]), XLSX_MIME))],
+        )
+        data = response.json()
+        assert data["files"][0]["source"] == "sbis-force-inn"
+        assert data["totals"]["added"] == 1
+
+    def test_unknown_source(self, client):
+        response = client.post(
+            "/imports/batch",
+            data={"source": "xml"},
+            files=[("files", ("c.xlsx", BytesIO(b"x"), XLSX_MIME))],
+        )
+        assert response.json()["success"] is False
+
+    def test_parsed_in_worker_processes(self, client, test_session, monkeypatch):
+        from src import main
+        from src.database import Invoice
+
+        monkeypatch.setattr(main, "IMPORT_PARSE_PROCESSES", 2)
+        self._rpo(test_session)
+        try:
+            response = client.post(
+                "/imports/batch",
+                files=[
+                    ("files", ("a.xlsx", self._file_1c(["С-1"]), XLSX_MIME)),
+                    ("files", ("b.xlsx", self._file_1c(["С-2"]), XLSX_MIME)),
+                ],
+            )
+        finally:
+            main.shutdown_import_executor()
+        assert response.json()["totals"]["added"] == 2
+        assert test_session.query(Invoice).count() == 2
+
+
+class TestImportJobs:
+    """Интеграционные тесты для фоновых задач импорта"""
+
+    def _wait(self, job_id):
+        import time
+        from src import main
+
+        deadline = time.monotonic() + 10
+        while job_id in main._active_imports and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def _rpo_file(self, test_session, rows):
+        from src.database import Employee
+
+        test_session.add(Employee(last_name="Петров", first_name="Иван"))
+        test_session.commit()
+        return make_xlsx(
+            HEADERS_1C,
+            [
+                [i, "15.03.2024", f"С-{i}", 100 + i, "ООО А", "Иван Петров", "", "О"]
+                for i in range(1, rows + 1)
+            ],
+        )
+
+    def test_submit_and_poll_job(self, client, test_session, monkeypatch):
+        import src.main as main
+
+        monkeypatch.setattr(main, "IMPORT_ROWS_STORE_IMPORTED", True)
+        buffer = self._rpo_file(test_session, 5)
+        response = client.post(
+            "/imports",
+            data={"source": "1c"},
+            files={"file": ("1c.xlsx", buffer, XLSX_MIME)},
+        )
+        data = response.json()
+        assert data["success"] is True
+        job_id = data["job_id"]
+        self._wait(job_id)
+
+        status = client.get(f"/imports/{job_id}").json()
+        assert status["status"] == "done"
+        assert status["rows_total"] == 5
+        assert status["rows_processed"] == 5
+        assert status["counters"]["added"] == 5
+
+        page = client.get(
+            f"/imports/{job_id}/rows", params={"offset": 2, "limit": 2}
+        ).json()
+        assert page["total"] == 5
+        assert [r["row"] for r in page["rows"]] == [4, 5]
+
+    def test_submit_unknown_source(self, client):
+        response = client.post(
+            "/imports",
+            data={"source": "xml"},
+            files={"file": ("x.xlsx", BytesIO(b"x"), XLSX_MIME)},
+        )
+        assert response.json()["success"] is False
+
+    def test_job_with_invalid_file_fails(self, client):
+        response = client.post(
+            "/imports",
+            data={"source": "sbis"},
+            files={"file": ("x.xlsx", BytesIO(b"not an excel file"), XLSX_MIME)},
+        )
+        job_id = response.json()["job_id"]
+        self._wait(job_id)
+        status = client.get(f"/imports/{job_id}").json()
+        assert status["status"] == "failed"
+        assert status["error"]
+
+    def test_cancelled_job_rolls_back(self, session_stub):
+        from src.database import ImportJob, Invoice
+        from src.main import ImportProgress, _run_import_job
+
+        buffer = self._rpo_file(session_stub, 3)
+        job = ImportJob(source="1c", filename="1c.xlsx")
+        session_stub.add(job)
+        session_stub.commit()
+        job_id = job.id
+
+        progress = ImportProgress(job_id)
+        progress.cancel_event.set()
+        _run_import_job(job_id, "1c", buffer, progress)
+
+        assert session_stub.get(ImportJob, job_id).status == "cancelled"
+        assert session_stub.query(Invoice).count() == 0
+
+    def test_cancel_finished_job(self, client):
+        response = client.post("/imports/999999/cancel")
+        assert response.json()["success"] is False
+
+    def test_job_not_found(self, client):
+        assert client.get("/imports/999999").json()["success"] is False
+        assert client.get("/imports/999999/rows").json()["success"] is False
+
+
+class TestImportFolderWatcher:
+    """Интеграционные тесты для наблюдения за папкой импорта"""
+
+    def _wait(self, job_id):
+        import time
+        from src import main
+
+        deadline = time.monotonic() + 10
+        while job_id in main._active_imports and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def _settled(self, watcher):
+        watcher.scan(now=0)
+        return watcher.scan(now=watcher.settle)
+
+    def test_new_file_queued_and_imported(self, client, test_session, tmp_path):
+        from src.database import Employee, ImportJob, Invoice
+        from src.main import ImportFolderWatcher
+
+        test_session.add(Employee(last_name="Петров", first_name="Иван"))
+        test_session.commit()
+        buffer = make_xlsx(
+            HEADERS_1C,
+            [[1, "15.03.2024", "С-1", 100, "ООО А", "Иван Петров", "", "О"]],
+        )
+        (tmp_path / "1c.xlsx").write_bytes(buffer.getvalue())
+
+        watcher = ImportFolderWatcher(str(tmp_path), settle=0)
+        watcher.scan()
+        job_ids = watcher.poll()
+        assert len(job_ids) == 1
+        self._wait(job_ids[0])
+
+        job = test_session.get(ImportJob, job_ids[0])
+        assert job.source == "1c"
+        assert job.status == "done"
+        assert test_session.query(Invoice).count() == 1
+        assert watcher.poll() == []
+
+    def test_already_imported_file_skipped(self, client, test_session, tmp_path):
+        from src.database import ImportJob
+        from src.main import ImportFolderWatcher
+
+        content = make_xlsx(HEADERS_SBIS, []).getvalue()
+        client.post(
+            "/import-sbis", files={"file": ("s.xlsx", BytesIO(content), XLSX_MIME)}
+        )
+        (tmp_path / "s.xlsx").write_bytes(content)
+
+        watcher = ImportFolderWatcher(str(tmp_path))
+        assert [watcher.queue(path) for path in self._settled(watcher)] == [None]
+        assert test_session.query(ImportJob).count() == 0
+
+    def test_unknown_file_recorded_as_failed_job(self, client, test_session, tmp_path):
+        from src.database import ImportJob
+        from src.main import ImportFolderWatcher
+
+        (tmp_path / "x.xlsx").write_bytes(make_xlsx(["A", "B"], []).getvalue())
+
+        watcher = ImportFolderWatcher(str(tmp_path))
+        assert [watcher.queue(path) for path in self._settled(watcher)] == [None]
+        job = test_session.query(ImportJob).one()
+        assert job.status == "failed"
+        assert job.filename == "x.xlsx"
+
+
+class TestListPagination:
+    """Тесты для постраничной выдачи списков по курсору"""
+
+    def _walk(self, client, url, params, limit):
+        items, cursor, totals = [], None, set()
+        while True:
+            page_params = dict(params, limit=limit)
+            if cursor:
+                page_params["cursor"] = cursor
+            page = client.get(url, params=page_params).json()
+            assert len(page["items"]) <= limit
+            items.extend(page["items"])
+            totals.add(page["total"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return items, totals
+
+    def _seed(self, test_session):
+        from src.database import Act, Contractor, Invoice
+
+        contractors = [Contractor(name=f"пагинация {i}", inn=None) for i in range(3)]
+        test_session.add_all(contractors)
+        test_session.flush()
+        dates = [date(2024, 1, 5), None, date(2024, 1, 5), date(2024, 2, 1), None]
+        invoices = []
+        for i, invoice_date in enumerate(dates):
+            invoice = Invoice(number=f"П-{i}", date=invoice_date, amount=100)
+            invoice.contractor_id = contractors[i % 2].id
+            invoices.append(invoice)
+        test_session.add_all(invoices)
+        test_session.flush()
+        for i in range(7):
+            test_session.add(
+                Act(
+                    number=f"А-{i}",
+                    amount=10 * (i % 3),
+                    signing_date=datetime(2024, 3, 1 + i % 2) if i % 4 else None,
+                    contractor_id=contractors[i % 3].id,
+                    invoice_id=invoices[i % 5].id if i % 2 else None,
+                )
+            )
+        test_session.commit()
+
+    def test_invoices_pages_match_full_list(self, client, test_session):
+        self._seed(test_session)
+
+        for sort_by in ["date", "acts_count", "contractor_name", "deadline"]:
+            for sort_dir in ["asc", "desc"]:
+                params = {"sort_by": sort_by, "sort_dir": sort_dir}
+                full = client.get("/invoices/list", params=params).json()
+                items, totals = self._walk(client, "/invoices/list", params, 2)
+                assert [inv["id"] for inv in items] == [inv["id"] for inv in full]
+                assert totals == {5}
+
+    def test_acts_pages_match_full_list(self, client, test_session):
+        self._seed(test_session)
+
+        for url in ["/acts/linked", "/acts/unlinked"]:
+            for sort_by in ["signing_date", "amount", "has_available_invoices"]:
+                for sort_dir in ["asc", "desc"]:
+                    params = {"sort_by": sort_by, "sort_dir": sort_dir}
+                    full = client.get(url, params=params).json()
+                    items, totals = self._walk(client, url, params, 3)
+                    assert [a["id"] for a in items] == [a["id"] for a in full]
+                    assert totals == {len(full)}
+
+    def test_contractors_and_employees_paged_by_id(self, client, test_session):
+        from src.database import Employee
+
+        self._seed(test_session)
+        test_session.add_all(
+            [Employee(last_name=f"Сотрудник{i}", first_name="И") for i in range(4)]
+        )
+        test_session.commit()
+
+        for url in ["/contractors/list-full", "/employees/list"]:
+            full = client.get(url).json()
+            items, totals = self._walk(client, url, {}, 2)
+            assert items == sorted(full, key=lambda item: item["id"])
+            assert totals == {len(full)}
+
+    def test_contractors_sorted_and_filtered_pages(self, client, test_session):
+        from src.database import Contractor
+
+        self._seed(test_session)
+        test_session.add(Contractor(name="другой", inn="7701"))
+        test_session.commit()
+
+        for sort_by in ["name", "inn", "invoices_count", "free_acts_count"]:
+            for sort_dir in ["asc", "desc"]:
+                params = {"sort_by": sort_by, "sort_dir": sort_dir}
+                full = client.get("/contractors/list-full", params=params).json()
+                items, totals = self._walk(client, "/contractors/list-full", params, 2)
+                assert items == full
+                assert totals == {4}
+                values = [c[sort_by] for c in full]
+                assert values == sorted(values, reverse=sort_dir == "desc")
+
+        page = client.get(
+            "/contractors/list-full", params={"name": "Пагинация", "limit": 2}
+        ).json()
+        assert page["total"] == 3
+        assert all(c["name"].startswith("пагинация") for c in page["items"])
+        page = client.get(
+            "/contractors/list-full", params={"inn": "77", "limit": 2}
+        ).json()
+        assert [c["name"] for c in page["items"]] == ["другой"]
+        assert page["total"] == 1
+
+    def test_filters_apply_to_total(self, client, test_session):
+        from src.database import Contractor
+
+        self._seed(test_session)
+        contractor = test_session.query(Contractor).filter_by(name="пагинация 0").one()
+
+        page = client.get(
+            "/invoices/list", params={"contractor_id": contractor.id, "limit": 1}
+        ).json()
+        assert page["total"] == 3
+        assert len(page["items"]) == 1
+        assert page["next_cursor"]
+
+    def test_invalid_cursor(self, client):
+        for url in ["/invoices/list", "/acts/linked", "/employees/list"]:
+            data = client.get(url, params={"limit": 5, "cursor": "не курсор"}).json()
+            assert data["success"] is False
+        data = client.get(
+            "/acts/unlinked",
+            params={"sort_by": "has_available_invoices", "limit": 5, "cursor": "e30"},
+        ).json()
+        assert data["success"] is False
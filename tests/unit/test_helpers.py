@@ -162,6 +162,46 @@ class TestCheckEmployeeInComment:
         assert result is True
 
 
+class TestKeywordMatcher:
+    """Тесты для многошаблонного поиска слов в комментарии"""
+
+    def test_find_all_in_pattern_order(self):
+        from src.main import KeywordMatcher
+
+        matcher = KeywordMatcher(["возврат", "тест", "петров"])
+        assert matcher.find_all("петров: тест, возврат") == [
+            "возврат",
+            "тест",
+            "петров",
+        ]
+
+    def test_overlapping_and_prefix_words(self):
+        from src.main import KeywordMatcher
+
+        matcher = KeywordMatcher(["тест", "тестовый", "овый"])
+        assert matcher.find_all("тестовый счёт") == ["тест", "тестовый", "овый"]
+
+    def test_regex_characters_escaped(self):
+        from src.main import KeywordMatcher
+
+        matcher = KeywordMatcher(["(тест)", "a.b"])
+        assert matcher.find_all("axb (тест)") == ["(тест)"]
+
+    def test_empty_words_ignored(self):
+        from src.main import KeywordMatcher
+
+        matcher = KeywordMatcher(["", None])
+        assert matcher.find_all("что угодно") == []
+        assert matcher.search("что угодно") is False
+
+    def test_matcher_cached_by_words(self):
+        from src.main import get_keyword_matcher
+
+        first = get_keyword_matcher(("иванов", "петров"))
+        assert get_keyword_matcher(("иванов", "петров")) is first
+        assert get_keyword_matcher(("иванов",)) is not first
+
+
 class TestDatabaseModels:
     """Тесты для моделей базы данных"""
 
@@ -268,3 +308,749 @@ class TestDatabaseModels:
         test_session.add(c2)
         with pytest.raises(Exception):
             test_session.commit()
+
+
+class TestEngineLifecycle:
+    """Тесты для общего движка и жизненного цикла сессий"""
+
+    def test_engine_is_shared(self):
+        from src.database import get_engine
+
+        assert get_engine() is get_engine()
+
+    def test_sessions_share_engine(self):
+        from src.database import get_engine, get_session
+
+        s1 = get_session()
+        s2 = get_session()
+        try:
+            assert s1 is not s2
+            assert s1.get_bind() is s2.get_bind() is get_engine()
+        finally:
+            s1.close()
+            s2.close()
+
+    def test_get_db_closes_session(self):
+        from unittest.mock import patch
+        from src.database import get_db
+
+        gen = get_db()
+        session = next(gen)
+        with patch.object(session, "close") as close:
+            with pytest.raises(StopIteration):
+                next(gen)
+            close.assert_called_once()
+
+    def test_dispose_engine_recreates(self):
+        from src.database import dispose_engine, get_engine
+
+        first = get_engine()
+        dispose_engine()
+        assert get_engine() is not first
+
+
+class TestIndexes:
+    """Тесты для вторичных индексов"""
+
+    def _legacy_engine(self, tmp_path):
+        from sqlalchemy import create_engine, text
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "CREATE TABLE acts (id INTEGER PRIMARY KEY, created_at DATETIME, "
+                    "number TEXT, filename TEXT, signing_date DATETIME, amount FLOAT, "
+                    "contractor_id INTEGER, invoice_id INTEGER, "
+                    "responsible_manager TEXT)"
+                )
+            )
+        return engine
+
+    def test_indexes_added_to_existing_database(self, tmp_path):
+        from sqlalchemy import inspect
+        from src.database import Base, _migrate
+
+        engine = self._legacy_engine(tmp_path)
+        Base.metadata.create_all(engine)
+        _migrate(engine)
+
+        act_indexes = {ix["name"] for ix in inspect(engine).get_indexes("acts")}
+        assert "ix_acts_invoice_id" in act_indexes
+        assert "ix_acts_contractor_id" in act_indexes
+        assert "ix_acts_number_signing_date_amount" in act_indexes
+        invoice_indexes = {ix["name"] for ix in inspect(engine).get_indexes("invoices")}
+        assert "ix_invoices_number_date_amount" in invoice_indexes
+        engine.dispose()
+
+    def test_duplicate_check_uses_index(self, test_engine):
+        from sqlalchemy import text
+
+        with test_engine.connect() as conn:
+            plan = conn.execute(
+                text(
+                    "EXPLAIN QUERY PLAN SELECT id FROM acts WHERE number = 'A' "
+                    "AND signing_date = '2024-01-01' AND amount = 1"
+                )
+            ).fetchall()
+        assert any("ix_acts_number_signing_date_amount" in row[-1] for row in plan)
+
+
+class TestMigrations:
+    """Тесты для версионированных миграций (PRAGMA user_version)"""
+
+    def _engine(self, tmp_path):
+        from sqlalchemy import create_engine
+
+        return create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+
+    def test_new_database_stamped_with_latest_version(self, tmp_path):
+        from unittest.mock import patch
+        from src.database import SCHEMA_VERSION, get_schema_version, init_db
+
+        engine = self._engine(tmp_path)
+        with patch("src.database.get_engine", return_value=engine):
+            with patch("src.database._migrate") as migrate:
+                init_db()
+        migrate.assert_not_called()
+        assert get_schema_version(engine) == SCHEMA_VERSION
+        engine.dispose()
+
+    def test_legacy_database_migrated(self, tmp_path):
+        from unittest.mock import patch
+        from sqlalchemy import inspect, text
+        from src.database import SCHEMA_VERSION, get_schema_version, init_db
+
+        engine = self._engine(tmp_path)
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "CREATE TABLE invoices (id INTEGER PRIMARY KEY, "
+                    "created_at DATETIME, number TEXT, date DATE, amount FLOAT, "
+                    "contractor_id INTEGER, organization_group TEXT, "
+                    "responsible_import TEXT, comment TEXT, deadline DATE, "
+                    "deadline_days INTEGER, payment_date DATE, "
+                    "motivated_person TEXT, status TEXT)"
+                )
+            )
+        with patch("src.database.get_engine", return_value=engine):
+            init_db()
+
+        columns = [c["name"] for c in inspect(engine).get_columns("invoices")]
+        assert "justification" in columns
+        assert get_schema_version(engine) == SCHEMA_VERSION
+        engine.dispose()
+
+    def test_imports_ledger_added_to_version_3(self, tmp_path):
+        from unittest.mock import patch
+        from sqlalchemy import inspect
+        from src.database import (
+            SCHEMA_VERSION,
+            Base,
+            ImportFile,
+            _set_schema_version,
+            get_schema_version,
+            init_db,
+        )
+
+        engine = self._engine(tmp_path)
+        Base.metadata.create_all(
+            engine,
+            tables=[
+                t for t in Base.metadata.sorted_tables if t is not ImportFile.__table__
+            ],
+        )
+        _set_schema_version(engine, 3)
+        with patch("src.database.get_engine", return_value=engine):
+            init_db()
+
+        assert inspect(engine).has_table("imports")
+        assert get_schema_version(engine) == SCHEMA_VERSION
+        engine.dispose()
+
+    def test_import_rows_compacted_in_version_7(self, tmp_path):
+        from unittest.mock import patch
+        from sqlalchemy import inspect, text
+        from src.database import (
+            Base,
+            ImportRow,
+            _set_schema_version,
+            init_db,
+        )
+
+        engine = self._engine(tmp_path)
+        Base.metadata.create_all(
+            engine,
+            tables=[
+                t for t in Base.metadata.sorted_tables if t is not ImportRow.__table__
+            ],
+        )
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "CREATE TABLE import_rows (id INTEGER PRIMARY KEY, "
+                    "import_id INTEGER NOT NULL, row_index INTEGER NOT NULL, "
+                    "outcome TEXT NOT NULL, reasons TEXT, number TEXT, "
+                    "contractor TEXT, doc_type TEXT, doc_status TEXT, details TEXT)"
+                )
+            )
+            conn.execute(
+                text(
+                    "INSERT INTO import_rows (import_id, row_index, outcome, "
+                    "reasons, number, contractor, doc_type, doc_status) VALUES "
+                    "(1, 2, 'skipped', ',doc_type,', 'А-1', 'ООО А', 'ЭДОСч', 'Ок'), "
+                    "(1, 3, 'skipped', ',doc_status,', 'А-2', 'ООО А', 'Акт', 'Ошибка')"
+                )
+            )
+        _set_schema_version(engine, 6)
+        with patch("src.database.get_engine", return_value=engine):
+            with patch("src.database.MIGRATION_BATCH_SIZE", 1):
+                init_db()
+
+        columns = [c["name"] for c in inspect(engine).get_columns("import_rows")]
+        assert columns == [
+            "id",
+            "import_id",
+            "row_index",
+            "outcome",
+            "reasons",
+            "details",
+        ]
+        with engine.connect() as conn:
+            details = conn.execute(
+                text("SELECT details FROM import_rows ORDER BY row_index")
+            ).scalars()
+            assert list(details) == ['{"doc_type":"ЭДОСч"}', '{"doc_status":"Ошибка"}']
+        engine.dispose()
+
+    def test_current_database_skips_introspection(self, tmp_path):
+        from unittest.mock import patch
+        from src.database import init_db
+
+        engine = self._engine(tmp_path)
+        with patch("src.database.get_engine", return_value=engine):
+            init_db()
+            with patch("src.database.inspect") as insp:
+                init_db()
+        insp.assert_not_called()
+        engine.dispose()
+
+    def test_backfill_in_batches(self, test_engine):
+        from sqlalchemy import text
+        from src.database import backfill_in_batches
+
+        with test_engine.begin() as conn:
+            conn.execute(
+                text("INSERT INTO invoices (number, status) VALUES (:n, NULL)"),
+                [{"n": str(i)} for i in range(25)],
+            )
+        updated = backfill_in_batches(
+            test_engine,
+            "invoices",
+            "status = :status",
+            "status IS NULL",
+            params={"status": "Не оплачен"},
+            batch_size=10,
+        )
+        assert updated == 25
+        with test_engine.connect() as conn:
+            remaining = conn.execute(
+                text("SELECT COUNT(*) FROM invoices WHERE status IS NULL")
+            ).scalar()
+        assert remaining == 0
+
+
+class TestDuplicateKeys:
+    """Тесты для предзагрузки ключей дубликатов"""
+
+    def test_load_invoice_keys_in_date_range(self, test_session):
+        from datetime import date
+        from src.database import Invoice
+        from src.main import load_invoice_keys
+
+        test_session.add_all(
+            [
+                Invoice(number="1", date=date(2024, 1, 10), amount=100.0),
+                Invoice(number="2", date=date(2024, 2, 10), amount=200.0),
+                Invoice(number="3", date=date(2024, 6, 10), amount=300.0),
+                Invoice(number="4", date=None, amount=400.0),
+            ]
+        )
+        test_session.flush()
+
+        keys = load_invoice_keys(test_session, [date(2024, 1, 1), date(2024, 3, 1)])
+        assert keys == {
+            ("1", date(2024, 1, 10), 100.0),
+            ("2", date(2024, 2, 10), 200.0),
+        }
+
+        keys = load_invoice_keys(
+            test_session, [date(2024, 1, 1), None, date(2024, 3, 1)]
+        )
+        assert ("4", None, 400.0) in keys
+        assert len(keys) == 3
+
+    def test_load_invoice_keys_no_dates(self, test_session):
+        from datetime import date
+        from src.database import Invoice
+        from src.main import load_invoice_keys
+
+        test_session.add_all(
+            [
+                Invoice(number="1", date=date(2024, 1, 10), amount=100.0),
+                Invoice(number="2", date=None, amount=200.0),
+            ]
+        )
+        test_session.flush()
+
+        assert load_invoice_keys(test_session, []) == set()
+        assert load_invoice_keys(test_session, [None, None]) == {("2", None, 200.0)}
+
+    def test_load_act_keys(self, test_session):
+        from datetime import datetime
+        from src.database import Act
+        from src.main import load_act_keys
+
+        signed = datetime(2024, 3, 20, 10, 15)
+        test_session.add(Act(number="А-1", signing_date=signed, amount=1000.0))
+        test_session.flush()
+
+        assert ("А-1", signed, 1000.0) in load_act_keys(test_session, [signed])
+
+
+class TestBulkImportWrite:
+    """Тесты для пакетной записи импортируемых строк"""
+
+    def test_resolve_creates_missing_once(self, test_session):
+        from src.database import Contractor
+        from src.main import ContractorResolver
+
+        test_session.add(Contractor(name="ромашка ооо", inn=""))
+        test_session.flush()
+
+        ids = ContractorResolver(test_session).resolve(
+            [
+                ('ООО "Ромашка"', "7701"),
+                ("ООО Лютик", None),
+                ("ооо  лютик", "7702"),
+            ],
+        )
+
+        assert ids['ООО "Ромашка"'] != ids["ООО Лютик"]
+        assert ids["ООО Лютик"] == ids["ооо  лютик"]
+        assert test_session.query(Contractor).count() == 2
+        romashka = test_session.get(Contractor, ids['ООО "Ромашка"'])
+        lyutik = test_session.get(Contractor, ids["ООО Лютик"])
+        assert romashka.inn == "7701"
+        assert lyutik.inn == "7702"
+
+    def test_resolve_keeps_inn_unless_forced(self, test_session):
+        from src.database import Contractor
+        from src.main import ContractorResolver
+
+        test_session.add(Contractor(name="ромашка ооо", inn="7701"))
+        test_session.flush()
+
+        ids = ContractorResolver(test_session).resolve([("ООО Ромашка", "7799")])
+        contractor = test_session.get(Contractor, ids["ООО Ромашка"])
+        assert contractor.inn == "7701"
+
+        ContractorResolver(test_session, force_update_inn=True).resolve(
+            [("ООО Ромашка", " 7799 ")]
+        )
+        test_session.refresh(contractor)
+        assert contractor.inn == "7799"
+
+    def test_resolve_normalizes_each_name_once(self, test_session, monkeypatch):
+        from src import main
+
+        calls = []
+        original = main.normalize_contractor_name
+        monkeypatch.setattr(
+            main,
+            "normalize_contractor_name",
+            lambda name: calls.append(name) or original(name),
+        )
+
+        resolver = main.ContractorResolver(test_session)
+        ids = resolver.resolve([("ООО Ромашка", None)] * 100)
+
+        assert calls == ["ООО Ромашка"]
+        assert list(ids) == ["ООО Ромашка"]
+
+    def test_resolve_ignores_concurrent_insert(self, test_session):
+        from src.database import Contractor
+        from src.main import ContractorResolver
+
+        resolver = ContractorResolver(test_session)
+        resolver.prefetch(["ООО Ромашка"])
+        test_session.add(Contractor(name="ромашка ооо", inn="7701"))
+        test_session.flush()
+
+        ids = resolver.resolve([("ООО Ромашка", "7799")])
+
+        assert test_session.query(Contractor).count() == 1
+        contractor = test_session.get(Contractor, ids["ООО Ромашка"])
+        assert contractor.inn == "7701"
+
+    def test_update_inn_for_existing_only(self, test_session):
+        from src.database import Contractor
+        from src.main import ContractorResolver
+
+        test_session.add(Contractor(name="ромашка ооо", inn="7701"))
+        test_session.flush()
+
+        resolver = ContractorResolver(test_session, force_update_inn=True)
+        assert resolver.update_inn("ООО Ромашка", "7701") is False
+        assert resolver.update_inn("ООО Ромашка", "7799") is True
+        assert resolver.update_inn("ООО Лютик", "7702") is False
+        resolver.flush()
+
+        contractor = test_session.query(Contractor).one()
+        test_session.refresh(contractor)
+        assert contractor.inn == "7799"
+
+    def test_write_import_rows_in_batches(self, test_session, monkeypatch):
+        from datetime import date
+        from src import main
+        from src.database import Invoice
+
+        monkeypatch.setattr(main, "IMPORT_BATCH_SIZE", 2)
+        pending = [
+            {
+                "number": str(i),
+                "date": date(2024, 1, 1),
+                "amount": float(i),
+                "contractor_name": f"ООО Контрагент {i % 2}",
+                "contractor_inn": None,
+                "status": "Не оплачен",
+            }
+            for i in range(5)
+        ]
+
+        main.write_import_rows(test_session, Invoice, pending)
+
+        invoices = test_session.query(Invoice).order_by(Invoice.amount).all()
+        assert [inv.number for inv in invoices] == ["0", "1", "2", "3", "4"]
+        assert len({inv.contractor_id for inv in invoices}) == 2
+        assert invoices[0].contractor.name == "контрагент 0 ооо"
+
+
+class TestSbisPipeline:
+    """Тесты для этапов импорта СБИС"""
+
+    HEADERS = [
+        "Тип документа",
+        "Тип пакета",
+        "Статус",
+        "Сумма",
+        "Завершено",
+        "Номер",
+        "Контрагент",
+        "ИНН/КПП",
+        "Организация",
+        "Имя файла",
+    ]
+
+    def test_resolve_columns(self):
+        from src.main import resolve_sbis_columns
+
+        columns = resolve_sbis_columns(self.HEADERS)
+        assert columns["doc_type"] == 0
+        assert columns["signing_date"] == 4
+        assert columns["inn"] == 7
+        assert columns["filename"] == 9
+
+    def test_inn_column_outside_contractor_block_ignored(self):
+        from src.main import resolve_sbis_columns
+
+        headers = ["ИНН"] + [h for h in self.HEADERS if h != "ИНН/КПП"]
+        columns = resolve_sbis_columns(headers)
+        assert columns["inn"] is None
+
+    def test_extract_row(self):
+        from datetime import datetime
+        from src.main import extract_sbis_row, resolve_sbis_columns
+
+        signed = datetime(2024, 3, 20, 10, 15)
+        row = (
+            " Акт ",
+            None,
+            "Выполнение завершено успешно",
+            "1 000,50",
+            "10:15 20.03.2024",
+            "А-1",
+            "ООО Ромашка",
+            "7701234567/770101001",
+            "Наша",
+            "a1.xml",
+        )
+        record = extract_sbis_row(row, resolve_sbis_columns(self.HEADERS), signed)
+        assert record["doc_type"] == "Акт"
+        assert record["package_type"] == ""
+        assert record["amount"] == 1000.5
+        assert record["inn"] == "7701234567"
+        assert record["signing_date"] == signed
+
+    def test_rules(self):
+        from src.main import SBIS_ROW_RULES
+
+        def failed(**overrides):
+            record = {
+                "doc_type": "Акт",
+                "package_type": "",
+                "status": "Выполнение завершено успешно",
+                "amount": 100.0,
+                "signing_date": object(),
+            }
+            record.update(overrides)
+            return [
+                counter for counter, predicate, _ in SBIS_ROW_RULES if predicate(record)
+            ]
+
+        assert failed() == []
+        assert failed(doc_type="ЭДОСч") == ["skipped_type"]
+        assert failed(status="Отклонён") == ["skipped_status"]
+        assert failed(amount=0) == ["skipped_empty"]
+        assert failed(amount=0, package_type="ДокОтгрИсх") == []
+        assert failed(signing_date=None) == ["skipped_empty"]
+
+
+class TestSpoolUpload:
+    """Тесты для буферизации загружаемых файлов"""
+
+    def _upload(self, data):
+        from io import BytesIO
+        from starlette.datastructures import UploadFile
+
+        upload = UploadFile(BytesIO(data), filename="file.xlsx")
+        upload.file.read()
+        return upload
+
+    def test_upload_rewound_without_copy(self):
+        from src import main
+
+        upload = self._upload(b"x" * 10)
+        with main.rewind_upload(upload) as spooled:
+            assert spooled is upload.file
+            assert spooled.read() == b"x" * 10
+        assert spooled.closed
+
+    def test_small_file_stays_in_memory(self, monkeypatch):
+        from src import main
+
+        monkeypatch.setattr(main, "IMPORT_SPOOL_MAX_SIZE", 1024)
+        with main.spool_file(self._upload(b"x" * 10).file) as spooled:
+            assert spooled._rolled is False
+            assert spooled.read() == b"x" * 10
+        assert spooled.closed
+
+    def test_large_file_rolls_to_disk(self, monkeypatch):
+        from src import main
+
+        monkeypatch.setattr(main, "IMPORT_SPOOL_MAX_SIZE", 16)
+        with main.spool_file(self._upload(b"x" * 100).file) as spooled:
+            assert spooled._rolled is True
+            assert spooled.read() == b"x" * 100
+        assert spooled.closed
+
+    def test_closed_when_copy_fails(self, monkeypatch):
+        import pytest
+        from src import main
+
+        created = []
+        original = main.tempfile.SpooledTemporaryFile
+
+        def factory(*args, **kwargs):
+            created.append(original(*args, **kwargs))
+            return created[-1]
+
+        def broken_copy(src, dst):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(main.tempfile, "SpooledTemporaryFile", factory)
+        monkeypatch.setattr(main.shutil, "copyfileobj", broken_copy)
+        with pytest.raises(OSError):
+            main.spool_file(self._upload(b"x").file)
+        assert created[0].closed
+
+    def test_concurrent_uploads_isolated(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from src import main
+
+        def spool(i):
+            with main.spool_file(self._upload(bytes([i]) * 1000).file) as spooled:
+                return set(spooled.read())
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(spool, range(32)))
+        assert results == [{i} for i in range(32)]
+
+
+class TestImportCli:
+    """Тесты для консольного импорта файлов из папки"""
+
+    def _write_1c(self, path, numbers):
+        from openpyxl import Workbook
+
+        wb = Workbook()
+        ws = wb.active
+        ws.append(
+            [
+                "№ п/п",
+                "Дата",
+                "Номер",
+                "Сумма",
+                "Контрагент",
+                "Ответственный",
+                "Комментарий",
+                "Организация",
+            ]
+        )
+        for i, number in enumerate(numbers, 1):
+            ws.append([i, "15.03.2024", number, 100, "ООО А", "Иван Петров", "", "О"])
+        wb.save(path)
+
+    def test_directory_imported(self, session_stub, tmp_path, capsys):
+        import import_files
+        from src.database import Employee, Invoice
+
+        session_stub.add(Employee(last_name="Петров", first_name="Иван"))
+        session_stub.commit()
+        self._write_1c(tmp_path / "a.xlsx", ["С-1", "С-2"])
+        self._write_1c(tmp_path / "b.xlsx", ["С-2", "С-3"])
+        (tmp_path / "notes.txt").write_text("skip")
+
+        code = import_files.run(str(tmp_path), batch_size=1)
+
+        assert code == import_files.EXIT_OK
+        assert session_stub.query(Invoice).count() == 3
+        output = capsys.readouterr().out
+        assert "Найдено файлов: 2" in output
+        assert "строк/с" in output
+
+    def test_file_errors_reported_in_exit_code(self, session_stub, tmp_path):
+        import import_files
+
+        (tmp_path / "broken.xlsx").write_bytes(b"not an excel file")
+
+        assert import_files.run(str(tmp_path)) == import_files.EXIT_FILE_ERRORS
+
+    def test_missing_directory(self, tmp_path):
+        import import_files
+
+        code = import_files.run(str(tmp_path / "missing"))
+
+        assert code == import_files.EXIT_FAILED
+
+
+class TestImportFolderWatcherScan:
+    """Тесты для отслеживания новых файлов в папке импорта"""
+
+    def test_file_ready_after_settle(self, tmp_path):
+        from src.main import ImportFolderWatcher
+
+        path = tmp_path / "a.xlsx"
+        path.write_bytes(b"x")
+        watcher = ImportFolderWatcher(str(tmp_path), settle=10)
+
+        assert watcher.scan(now=0) == []
+        assert watcher.scan(now=5) == []
+        assert watcher.scan(now=10) == [str(path)]
+        assert watcher.scan(now=20) == []
+
+    def test_growing_file_debounced(self, tmp_path):
+        import os
+        from src.main import ImportFolderWatcher
+
+        path = tmp_path / "a.xlsx"
+        path.write_bytes(b"x")
+        watcher = ImportFolderWatcher(str(tmp_path), settle=10)
+
+        watcher.scan(now=0)
+        path.write_bytes(b"xx")
+        os.utime(path, ns=(1, 1))
+        assert watcher.scan(now=10) == []
+        assert watcher.scan(now=20) == [str(path)]
+
+    def test_changed_file_queued_again(self, tmp_path):
+        import os
+        from src.main import ImportFolderWatcher
+
+        path = tmp_path / "a.xlsx"
+        path.write_bytes(b"x")
+        watcher = ImportFolderWatcher(str(tmp_path), settle=0)
+
+        watcher.scan(now=0)
+        assert watcher.scan(now=0) == [str(path)]
+        path.write_bytes(b"xy")
+        os.utime(path, ns=(2, 2))
+        watcher.scan(now=1)
+        assert watcher.scan(now=1) == [str(path)]
+
+    def test_ignores_other_and_temporary_files(self, tmp_path):
+        from src.main import ImportFolderWatcher
+
+        (tmp_path / "~$a.xlsx").write_bytes(b"x")
+        (tmp_path / "a.csv").write_bytes(b"x")
+        (tmp_path / "sub.xlsx").mkdir()
+        watcher = ImportFolderWatcher(str(tmp_path), settle=0)
+
+        watcher.scan(now=0)
+        assert watcher.scan(now=0) == []
+
+    def test_poll_survives_failing_file(self, tmp_path, caplog):
+        from src.main import ImportFolderWatcher
+
+        (tmp_path / "a.xlsx").write_bytes(b"x")
+        (tmp_path / "b.xlsx").write_bytes(b"x")
+        watcher = ImportFolderWatcher(str(tmp_path), settle=0)
+        queued = []
+
+        def queue(path):
+            if path.endswith("a.xlsx"):
+                raise ValueError("broken")
+            queued.append(path)
+            return len(queued)
+
+        watcher.queue = queue
+        watcher.scan(now=0)
+        assert watcher.poll() == [1]
+        assert queued == [str(tmp_path / "b.xlsx")]
+        assert "a.xlsx" in caplog.text
+        assert "broken" in caplog.text
+
+        watcher.scan()
+        assert watcher.scan() == [str(tmp_path / "a.xlsx")]
+
+    def test_run_logs_missing_directory(self, tmp_path, caplog):
+        from src.main import ImportFolderWatcher
+
+        missing = tmp_path / "missing"
+        watcher = ImportFolderWatcher(str(missing), interval=0)
+        original = watcher.poll
+
+        def poll():
+            watcher._stop_event.set()
+            return original()
+
+        watcher.poll = poll
+        watcher._run()
+        assert str(missing) in caplog.text
+        assert "FileNotFoundError" in caplog.text
+
+
+class TestJsonResponse:
+    """Тесты для сериализации списочных ответов"""
+
+    CONTENT = [{"id": 1, "name": "Контрагент", "amount": 10.5, "flag": True}]
+
+    def test_body_is_json(self):
+        import json
+
+        from src.main import json_response
+
+        response = json_response(self.CONTENT)
+        assert response.media_type == "application/json"
+        assert json.loads(response.body) == self.CONTENT
+        assert "Контрагент".encode("utf-8") in response.body
@@ -1,9 +1,13 @@
 from datetime import date, datetime
 from src.main import (
     normalize_contractor_name,
+    normalize_contractor_names,
     format_contractor_name,
     parse_datetime,
+    parse_datetime_column,
     parse_date,
+    parse_date_column,
+    excel_serial_to_datetime,
     parse_amount,
     add_business_days,
     get_russian_holidays,
@@ -76,6 +80,30 @@ class TestNormalizeContractorName:
         assert "," not in result
         assert ";" not in result
 
+    def test_cached(self):
+        normalize_contractor_name.cache_clear()
+        normalize_contractor_name("ООО Кэш")
+        normalize_contractor_name("ООО Кэш")
+        info = normalize_contractor_name.cache_info()
+        assert info.hits == 1
+        assert info.misses == 1
+
+
+class TestNormalizeContractorNames:
+    """Тесты для пакетной нормализации имён контрагентов"""
+
+    def test_matches_single_normalization(self):
+        names = ['ООО "Ромашка"', "ИП Иванов", None, "", 'ООО "Ромашка"']
+        assert normalize_contractor_names(names) == [
+            normalize_contractor_name(name) for name in names
+        ]
+
+    def test_accepts_iterator(self):
+        assert normalize_contractor_names(iter(["ООО Лютик"])) == ["лютик ооо"]
+
+    def test_empty(self):
+        assert normalize_contractor_names([]) == []
+
 
 class TestFormatContractorName:
     """Тесты для функции форматирования имени контрагента"""
@@ -192,6 +220,58 @@ class TestParseDatetime:
         assert result.hour == 14
 
 
+class TestParseDatetimeColumn:
+    """Тесты для разбора столбца дат с определением формата"""
+
+    def test_same_result_as_parse_datetime(self):
+        values = [
+            "10:15 20.03.2024",
+            "9:05 1.04.2024",
+            "10:15:30 20.03.2024",
+            "20.03.2024",
+            "2024-03-20",
+            "25:00 20.03.2024",
+            "10:15 31.02.2024",
+            "10:15 20.03.24",
+            "10:15  20.03.2024",
+            " 11:00 21.03.2024 ",
+            45305,
+            45305.75,
+            float("nan"),
+            date(2024, 3, 15),
+            datetime(2024, 3, 15, 14, 30),
+            None,
+            "",
+            "not-a-date",
+        ]
+        assert parse_datetime_column(values) == [parse_datetime(v) for v in values]
+
+    def test_switches_format_on_mismatch(self):
+        result = parse_datetime_column(
+            ["10:15 20.03.2024", "21.03.2024 11:00", "12:30 22.03.2024"]
+        )
+        assert result == [
+            datetime(2024, 3, 20, 10, 15),
+            datetime(2024, 3, 21, 11, 0),
+            datetime(2024, 3, 22, 12, 30),
+        ]
+
+    def test_short_year_century(self):
+        assert parse_datetime_column(["10:15 20.03.24", "10:15 20.03.70"]) == [
+            datetime(2024, 3, 20, 10, 15),
+            datetime(1970, 3, 20, 10, 15),
+        ]
+
+    def test_accepts_iterator(self):
+        values = iter(["20.03.2024"])
+        assert parse_date_column(values) == [date(2024, 3, 20)]
+
+    def test_excel_serial(self):
+        assert excel_serial_to_datetime(45305) == datetime(2024, 1, 14)
+        assert excel_serial_to_datetime(45305.9) == datetime(2024, 1, 14)
+        assert excel_serial_to_datetime(float("inf")) is None
+
+
 class TestParseDate:
     """Тесты для функции парсинга даты"""
 